@@ -6,16 +6,22 @@ import os
 import time
 from flask import Flask, jsonify
 from werkzeug.middleware.proxy_fix import ProxyFix
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import config, validate_required_secrets
 from extensions import db
 from rate_limiter import setup_rate_limiting
 from security_headers import setup_security_headers
+from json_provider import setup_json_provider
+from compression import setup_compression
+from metrics import setup_metrics
+from profiler import setup_profiling
+from server_timing import setup_server_timing
+from memory_accounting import setup_memory_tracking
+from tracing import setup_tracing
+from unit_of_work import setup_unit_of_work
 
 # Initialisation des extensions
-migrate = Migrate()
 jwt = JWTManager()
 
 
@@ -30,6 +36,8 @@ def create_app(config_name=None):
     # pour X-Forwarded-For/Proto — sinon en-tête client falsifiable (M1).
     app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1)
     app.config.from_object(config[config_name])
+    # Sérialisation JSON (orjson) et cache de fragments des listes
+    setup_json_provider(app)
 
     # Fail-fast : exiger les secrets depuis l'environnement (hors mode test).
     # L'app refuse de démarrer si un secret requis est absent, plutôt que
@@ -47,7 +55,11 @@ def create_app(config_name=None):
     
     # Initialisation des extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    # Flask-Migrate (Alembic, ~300 ms d'import) ne sert qu'aux commandes
+    # `flask db` : chargé sous la CLI flask seulement, ni workers ni tests.
+    if os.environ.get('FLASK_RUN_FROM_CLI'):
+        from flask_migrate import Migrate
+        Migrate(app, db)
     jwt.init_app(app)
     
     # Configuration CORS
@@ -55,19 +67,21 @@ def create_app(config_name=None):
          origins=app.config['CORS_ORIGINS'], 
          supports_credentials=True,
          allow_headers=['Content-Type', 'Authorization'],
-         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+         methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'])
     
     # Import des modèles (nécessaire pour les migrations)
-    from app.models import User, Password, AuditLog
+    from app.models import User, Password, PasswordTombstone, AuditLog
     
     # Enregistrement des blueprints
     from app.routes.auth import auth_bp
     from app.routes.passwords import passwords_bp
     from app.routes.users import users_bp
+    from app.routes.batch import batch_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(passwords_bp, url_prefix='/api/passwords')
     app.register_blueprint(users_bp, url_prefix='/api/users')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
     
     # Route de santé pour Docker
     # Route de base
@@ -104,11 +118,64 @@ def create_app(config_name=None):
     def handle_vault_locked(error):
         return jsonify({'error': str(error), 'code': 'vault_locked'}), 423
 
+    # Compaction des tombstones de synchronisation (cron : flask compact-tombstones)
+    @app.cli.command("compact-tombstones")
+    def compact_tombstones_command():
+        """Purger les tombstones plus anciens que SYNC_TOMBSTONE_RETENTION_DAYS."""
+        from app.services.sync_service import compact_tombstones
+
+        removed = compact_tombstones(app.config["SYNC_TOMBSTONE_RETENTION_DAYS"])
+        print(f"{removed} tombstone(s) compacted")
+
+    # Domaines enregistrables des entrées existantes (une fois après migration)
+    @app.cli.command("backfill-site-domains")
+    def backfill_site_domains_command():
+        """Dériver site_domain de site_url pour les entrées qui ne l'ont pas."""
+        from app.services.domain_service import backfill_site_domains
+
+        filled = backfill_site_domains()
+        print(f"{filled} entry(ies) updated")
+
+    # Rappels d'expiration (cron : flask scan-expiring, ou scan interne ci-dessous)
+    @app.cli.command("scan-expiring")
+    def scan_expiring_command():
+        """Calculer les rappels d'expiration dus et publier les listes par utilisateur."""
+        from app.services.expiry_service import scan_expiring
+
+        users, reminders = scan_expiring()
+        print(f"{reminders} reminder(s) for {users} user(s)")
+
+    # Sous gunicorn (gunicorn.conf.py), chaque worker lance ses threads après
+    # le fork : un thread démarré dans le maître (--preload) ne le survit pas.
+    from prefork import start_worker_threads, worker_threads_deferred
+
+    if not worker_threads_deferred():
+        start_worker_threads(app)
+
+    # X-Request-ID et traces (enregistré en premier : identifiant dès le premier log)
+    app = setup_tracing(app)
+
+    # Profilage échantillonné à la demande (englobe tous les autres middlewares)
+    app = setup_profiling(app)
+
+    # Métriques Prometheus (minuteur enregistré tôt : mesure tout le reste)
+    app = setup_metrics(app)
+    # Server-Timing et journal des requêtes lentes (après le COMMIT et les en-têtes)
+    app = setup_server_timing(app)
+    # Comptabilité mémoire par endpoint (tracemalloc + RSS, si activée)
+    app = setup_memory_tracking(app)
+
+    # Compression des réponses (s'applique après les autres middlewares)
+    app = setup_compression(app)
+
     # Configurer le rate limiting
     app = setup_rate_limiting(app)
     
     # Configurer les headers de sécurité
     app = setup_security_headers(app)
+
+    # Unité de travail par requête (enregistrée en dernier : COMMIT en premier)
+    app = setup_unit_of_work(app)
     
     # Health check endpoints
     @app.route('/health', methods=['GET'])
@@ -161,7 +228,9 @@ if __name__ == '__main__':
     import logging
     
     # Configuration du logging
-    logging.basicConfig(level=logging.INFO)
+    from tracing import LOG_FORMAT
+
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     logger = logging.getLogger(__name__)
     
     logger.info("🚀 Démarrage de l'application Password Manager...")
@@ -53,11 +53,16 @@ class Password(db.Model):
     # Informations du site/service
     site_name = db.Column(db.String(255), nullable=False, index=True)
     site_url = db.Column(db.String(500), nullable=True)
+    # Domaine enregistrable (eTLD+1) de site_url, dérivé à l'écriture (autofill)
+    site_domain = db.Column(db.String(255), nullable=True)
     username = db.Column(db.String(255), nullable=False)
     email = db.Column(db.String(255), nullable=True)
     
     # Mot de passe chiffré
     encrypted_password = db.Column(db.Text, nullable=False)
+    # Empreinte HMAC du mot de passe sous une clé dérivée de la VMK (détection de
+    # réutilisation sans déchiffrement). NULL = pas encore calculée (backfill en session).
+    password_fingerprint = db.Column(db.String(64), nullable=True)
     
     # Organisation et métadonnées
     category = db.Column(db.String(100), nullable=True, index=True)  # Personnel, Travail, Social, etc.
@@ -87,6 +92,19 @@ class Password(db.Model):
         db.Index('idx_user_category', 'user_id', 'category'),
         db.Index('idx_user_favorite', 'user_id', 'is_favorite'),
         db.Index('idx_user_site', 'user_id', 'site_name'),
+        # Synchronisation delta : parcours (user_id, updated_at) sans tri en mémoire
+        db.Index('idx_user_updated', 'user_id', 'updated_at'),
+        # Réutilisation : GROUP BY empreinte par utilisateur, servi par l'index
+        db.Index('idx_user_fingerprint', 'user_id', 'password_fingerprint'),
+        # Autofill : égalité (user_id, site_domain) au lieu d'un ILIKE sur site_url
+        db.Index('idx_user_domain', 'user_id', 'site_domain'),
+        # Rappels d'expiration : index partiel, seules les entrées datées y figurent
+        db.Index(
+            'idx_password_expiry',
+            'expires_at',
+            postgresql_where=db.text('expires_at IS NOT NULL'),
+            sqlite_where=db.text('expires_at IS NOT NULL'),
+        ),
     )
     
     def to_dict(self, include_password=False):
@@ -130,6 +148,33 @@ class Password(db.Model):
         return self.tags.split(',') if self.tags else []
 
 
+class PasswordTombstone(db.Model):
+    """Trace d'une entrée supprimée, pour la synchronisation delta multi-appareils.
+
+    `delete_password` supprime physiquement la ligne : sans tombstone, un client
+    ne pourrait apprendre une suppression qu'en re-téléchargeant tout le coffre.
+    Aucune donnée de l'entrée n'est conservée (seulement son id). Les tombstones
+    plus anciens que la rétention sont compactés (cf. sync_service).
+    """
+    
+    __tablename__ = 'password_tombstones'
+    
+    id = db.Column(db.String(36), primary_key=True)  # id de l'entrée supprimée
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('idx_tombstone_user_deleted', 'user_id', 'deleted_at'),
+    )
+    
+    def to_dict(self):
+        """Convertir en dictionnaire"""
+        return {
+            'id': self.id,
+            'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None
+        }
+
+
 class AuditLog(db.Model):
     """Journal d'audit pour tracer les opérations sensibles"""
     
@@ -144,6 +189,8 @@ class AuditLog(db.Model):
     user_agent = db.Column(db.Text, nullable=True)
     success = db.Column(db.Boolean, default=True, nullable=False)
     error_message = db.Column(db.Text, nullable=True)
+    details = db.Column(db.Text, nullable=True)  # Résumé JSON (opérations groupées)
+    request_id = db.Column(db.String(64), nullable=True, index=True)  # X-Request-ID (corrélation logs/traces)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     def to_dict(self):
@@ -158,5 +205,7 @@ class AuditLog(db.Model):
             'user_agent': self.user_agent,
             'success': self.success,
             'error_message': self.error_message,
+            'details': self.details,
+            'request_id': self.request_id,
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
\ No newline at end of file
@@ -3,19 +3,24 @@ Routes d'authentification
 """
 
 from flask import Blueprint, request, jsonify, g, current_app
+from sqlalchemy import or_
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta, timezone
 import re
 
-from zxcvbn import zxcvbn
-
 import uuid
 from app.models import User, AuditLog
 from app.services.encryption_service import EncryptionService
+from app.services.breach_filter import is_breached
+from app.services.password_generator import zxcvbn
 from extensions import db
 from ..services.jwt_service import JWTService, token_required
 from validators import validate_user_data as xss_validate_user, SecurityValidator
 from rate_limiter import rate_limit_middleware
+from compression import no_compression
+from server_timing import phase
+from tracing import current_request_id
+from unit_of_work import stage_audit, stage_write
 
 # Créer le blueprint d'authentification
 auth_bp = Blueprint("auth", __name__)
@@ -32,8 +37,9 @@ def validate_password(password):
 
     M6 : le master password est le point de défaillance unique du coffre — sans
     récupération possible. On exige donc une vraie robustesse, pas seulement de la
-    longueur : longueur minimale 12, les classes de caractères usuelles, ET un
-    score zxcvbn >= 3 (« fort ») qui capture la difficulté réelle à DEVINE
+    longueur : longueur minimale 12, les classes de caractères usuelles, absence
+    des listes de fuites (filtre de Bloom hors ligne), ET un score zxcvbn >= 3
+    (« fort ») qui capture la difficulté réelle à DEVINE
     (dictionnaires, motifs, séquences, leetspeak) — ce que « long mais prévisible »
     ne satisfait pas. Portée : master password seulement ; les entrées du coffre
     (données de l'utilisateur) ne sont jamais gatées. Ne jamais logguer le mot de passe.
@@ -53,7 +59,17 @@ def validate_password(password):
     if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
         return False, "Password must contain at least one special character"
 
-    if zxcvbn(password)["score"] < 3:
+    # Liste de fuites hors ligne (filtre de Bloom mmap) : un master password déjà
+    # publié est essayé en premier par tout attaquant, quel que soit son score.
+    if is_breached(password):
+        return (
+            False,
+            "Password appears in a list of breached passwords; choose another master password",
+        )
+
+    with phase("zxcvbn"):
+        score = zxcvbn(password)["score"]
+    if score < 3:
         return (
             False,
             "Password is too weak or predictable; choose a stronger master password",
@@ -65,41 +81,32 @@ def validate_password(password):
 def log_audit_event(
     user_id, action, success, ip_address, user_agent, error_message=None
 ):
-    """Enregistrer un événement d'audit avec session séparée"""
+    """Enregistrer un événement d'audit (committé avec l'unité de travail,
+    même si les écritures de la requête sont annulées)"""
     try:
-        # Utiliser une session séparée pour éviter les conflits
-        from extensions import db
-
         # Convertir user_id en string si c'est un UUID
         user_id_str = str(user_id) if user_id else None
 
-        # Créer une nouvelle session pour l'audit
-        audit_session = db.session
-
-        audit_log = AuditLog(
-            user_id=user_id_str,
-            action=action,
-            resource_type="USER",
-            ip_address=ip_address,
-            user_agent=user_agent,
-            success=success,
-            error_message=error_message,
+        stage_audit(
+            AuditLog(
+                user_id=user_id_str,
+                action=action,
+                resource_type="USER",
+                ip_address=ip_address,
+                user_agent=user_agent,
+                success=success,
+                error_message=error_message,
+                request_id=current_request_id(),
+            )
         )
 
-        audit_session.add(audit_log)
-        audit_session.commit()
-
     except Exception as e:
         # Ne pas faire échouer la requête principale pour un problème d'audit
-        try:
-            audit_session.rollback()
-        except:
-            pass
-        # Log l'erreur d'audit en mode silencieux
         print(f"Audit log error (non-critical): {str(e)}")
 
 
 @auth_bp.route("/register", methods=["POST"])
+@no_compression
 @rate_limit_middleware
 @xss_validate_user
 def register():
@@ -141,8 +148,12 @@ def register():
         # MASSE (rate-limit dédié du register) et on égalise le TIMING (waste_argon2 sur conflit,
         # comme le chemin succès qui paie provision_vault). Anti-énumération STRICTE (réponse
         # générique) = évolution future conditionnée à un service d'envoi d'email → Lot 6/futur.
-        existing_user = User.query.filter_by(email=email).first()
-        if existing_user:
+        # Unicité email ET username en une seule requête (les deux messages restent distincts)
+        conflicts = [User.email == email]
+        if username:
+            conflicts.append(User.username == username)
+        taken = User.query.with_entities(User.email, User.username).filter(or_(*conflicts)).all()
+        if any(row.email == email for row in taken):
             EncryptionService.waste_argon2()  # M2 : timing égalisé (conflit paie comme le succès)
             # Log de tentative d'inscription avec email existant
             log_audit_event(
@@ -156,7 +167,7 @@ def register():
             return jsonify({"error": "Email already registered"}), 409
 
         # Unicité du username (Q5) — message inchangé ; on ajoute juste le coût timing (M2)
-        if username and User.query.filter_by(username=username).first():
+        if taken:
             EncryptionService.waste_argon2()  # M2 : timing égalisé (conflit paie comme le succès)
             return jsonify({"error": "Username already taken"}), 409
 
@@ -166,7 +177,7 @@ def register():
         new_user.kdf_salt = kdf_salt
         new_user.wrapped_vault_key = wrapped_vmk
         db.session.add(new_user)
-        db.session.commit()
+        db.session.flush()  # unicité vérifiée ici, COMMIT en fin de requête
 
         # Créer la session stable + ancrer la VMK (jamais recopiée)
         session_id = str(uuid.uuid4())
@@ -218,6 +229,7 @@ def register():
 
 
 @auth_bp.route("/login", methods=["POST"])
+@no_compression
 @rate_limit_middleware
 @xss_validate_user
 def login():
@@ -293,15 +305,15 @@ def login():
             )
         except ValueError:
             # Mauvais master password → échec d'auth : compteur + verrouillage
-            try:
+            # Rejoué après le ROLLBACK de la réponse 401 (stage_write)
+            def count_failure():
                 user.failed_login_attempts += 1
                 if user.failed_login_attempts >= 5:
                     user.locked_until = datetime.now(timezone.utc) + timedelta(
                         minutes=30
                     )
-                db.session.commit()
-            except Exception:
-                db.session.rollback()
+
+            stage_write(count_failure)
             log_audit_event(
                 user_id=user.id,
                 action="LOGIN_FAILED",
@@ -316,7 +328,6 @@ def login():
         user.failed_login_attempts = 0
         user.locked_until = None
         user.last_login = datetime.now(timezone.utc)
-        db.session.commit()
 
         # Créer la session stable + ancrer la VMK (jamais recopiée)
         session_id = str(uuid.uuid4())
@@ -391,6 +402,7 @@ def logout(current_user_id):
 
 
 @auth_bp.route("/refresh", methods=["POST"])
+@no_compression
 @rate_limit_middleware
 def refresh():
     """Route de rafraîchissement de token"""
@@ -0,0 +1,136 @@
+"""
+Multiplexeur de requêtes JSON (POST /api/batch).
+
+Un client (mobile, extension) qui a besoin du profil, des catégories, des
+presets, de la première page et des statistiques envoie UN lot au lieu de cinq
+requêtes. Le token JWT, la session Redis et l'utilisateur sont validés une
+seule fois pour le lot ; chaque sous-requête est ensuite routée en interne vers
+les blueprints existants (mêmes vues, mêmes validations, même audit).
+
+- Statut par sous-requête : une erreur (400, 404, 423, 429...) n'interrompt pas
+  les suivantes. Chaque sous-requête est indépendante (sa propre unité de
+  travail : un COMMIT, ou un ROLLBACK si elle échoue en 5xx).
+- Rate limiting : chaque sous-requête passe par le limiteur de sa route ; le
+  coût du lot est donc exactement la somme de ses parties (le lot lui-même
+  n'est pas compté en plus).
+- Périmètre : routes /api/* hors authentification et hors /api/batch (pas
+  d'imbrication).
+- Format : l'en-tête Accept du lot est transmis aux sous-requêtes ; en
+  MessagePack/CBOR, le lot et les corps qui le supportent sont binaires.
+- Compression : si une sous-requête vise une route `@no_compression` (mot de
+  passe déchiffré...), le lot entier part non compressé (BREACH : le secret
+  voisinerait sinon avec des données contrôlées par l'attaquant).
+"""
+
+from flask import Blueprint, current_app, g, jsonify, request
+from werkzeug.exceptions import HTTPException
+
+from app.models import db
+from app.services.jwt_service import token_required
+from compression import skip_compression, view_opted_out
+from content_negotiation import CBOR, MSGPACK, decode, negotiated_response
+from unit_of_work import begin_unit, complete_unit
+
+batch_bp = Blueprint("batch", __name__)
+
+ALLOWED_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+BINARY_MIMETYPES = {MSGPACK, CBOR}
+_EXCLUDED_PREFIXES = ("/api/auth/", "/api/batch")
+
+
+def _validate_sub_request(sub):
+    """Message d'erreur pour une sous-requête invalide, None sinon."""
+    if not isinstance(sub, dict):
+        return "Each sub-request must be an object"
+    method = str(sub.get("method", "GET")).upper()
+    path = sub.get("path")
+    if method not in ALLOWED_METHODS:
+        return f"Unsupported method: {method}"
+    if not isinstance(path, str) or not path.startswith("/api/"):
+        return "Sub-request path must start with /api/"
+    if path.startswith(_EXCLUDED_PREFIXES):
+        return f"Path not allowed in a batch: {path}"
+    return None
+
+
+def _dispatch(sub):
+    """Exécuter une sous-requête dans un contexte de requête interne."""
+    method = str(sub.get("method", "GET")).upper()
+    kwargs = {}
+    if "body" in sub:
+        kwargs["json"] = sub["body"]
+
+    outer_globals = set(vars(g))
+    with current_app.test_request_context(
+        sub["path"],
+        method=method,
+        headers={
+            "User-Agent": request.headers.get("User-Agent", ""),
+            "Accept": request.headers.get("Accept", "application/json"),
+        },
+        environ_base={"REMOTE_ADDR": request.remote_addr},
+        **kwargs,
+    ):
+        secret = view_opted_out(request.endpoint)
+        try:
+            response = current_app.make_response(current_app.dispatch_request())
+        except HTTPException as e:
+            response = current_app.make_response(current_app.handle_http_exception(e))
+        except Exception as e:
+            db.session.rollback()
+            try:
+                response = current_app.make_response(current_app.handle_user_exception(e))
+            except Exception:
+                current_app.logger.error(f"Erreur dans une sous-requête du lot: {e}")
+                response = current_app.make_response(
+                    (jsonify({"error": "Internal server error"}), 500)
+                )
+        finally:
+            # L'état `g` d'une sous-requête (données validées, quota...) ne fuit
+            # pas dans la suivante.
+            for name in set(vars(g)) - outer_globals:
+                g.pop(name, None)
+
+    if secret:
+        skip_compression()
+
+    # Chaque sous-requête est sa propre unité de travail (COMMIT indépendant)
+    if not complete_unit(response.status_code, method):
+        response = current_app.make_response(
+            (jsonify({"error": "Internal server error"}), 500)
+        )
+    begin_unit()
+
+    if response.mimetype in BINARY_MIMETYPES:
+        return response.status_code, decode(response.get_data(), response.mimetype)
+    return response.status_code, response.get_json(silent=True)
+
+
+@batch_bp.route("", methods=["POST"])
+@token_required
+def run_batch(current_user):
+    """Exécuter une liste de sous-requêtes avec une seule authentification"""
+    data = request.get_json(silent=True) or {}
+    subs = data.get("requests")
+    max_requests = current_app.config["BATCH_MAX_REQUESTS"]
+
+    if not isinstance(subs, list) or not subs:
+        return jsonify({"error": "'requests' must be a non-empty list"}), 400
+    if len(subs) > max_requests:
+        return jsonify({"error": f"At most {max_requests} sub-requests per batch"}), 400
+
+    g.batch_user = current_user
+    responses = []
+    try:
+        for index, sub in enumerate(subs):
+            error = _validate_sub_request(sub)
+            if error:
+                status, body = 400, {"error": error}
+            else:
+                status, body = _dispatch(sub)
+            sub_id = sub.get("id", index) if isinstance(sub, dict) else index
+            responses.append({"id": sub_id, "status": status, "body": body})
+    finally:
+        g.pop("batch_user", None)
+
+    return negotiated_response({"responses": responses})
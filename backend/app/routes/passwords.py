@@ -6,6 +6,7 @@ from flask import Blueprint, request, jsonify, current_app, g
 from datetime import datetime, timezone
 from sqlalchemy import or_, and_
 from sqlalchemy.exc import IntegrityError
+import json
 import re
 import uuid
 
@@ -13,11 +14,45 @@ from app.models import Password, User, AuditLog, db
 from app.services.encryption_service import EncryptionService
 from app.services.password_generator import PasswordGenerator
 from app.services.jwt_service import token_required
+from app.services import sync_service
+from app.services.bulk_service import (
+    BULK_FIELDS,
+    BulkScopeError,
+    bulk_delete,
+    bulk_update,
+    is_category_rename,
+    per_id_results,
+    rename_category,
+    resolve_scope,
+)
+from app.services.domain_service import rank_matches, site_domain, split_url
+from app.services.expiry_service import MAX_REMIND_DAYS, get_expiring
+from app.services.projection import (
+    LIST_FIELDS,
+    TOMBSTONE_FIELDS,
+    entity_rows,
+    fetch_page_rows,
+    list_response,
+    parse_fields,
+    serialize,
+)
+from app.services.stats_service import get_vault_stats, invalidate_vault_caches
+from app.services.timestamps import to_naive_utc
+from app.services.security_report import (
+    audit_vault_breaches,
+    backfill_fingerprints,
+    build_security_report,
+    compute_fingerprint,
+)
 from validators import (
     validate_password_data as xss_validate_password,
     SecurityValidator,
 )
 from rate_limiter import rate_limit_middleware
+from compression import no_compression
+from content_negotiation import negotiated_response, parse_layout, timestamp_column
+from tracing import current_request_id
+from unit_of_work import after_commit, side_effect, stage_audit
 
 # Créer le blueprint
 passwords_bp = Blueprint("passwords", __name__)
@@ -31,38 +66,61 @@ def get_validated_data():
     return data
 
 
-def log_audit_event(
-    action, success=True, error_message=None, resource_id=None, user_id=None
+def build_audit_entry(
+    action,
+    success=True,
+    error_message=None,
+    resource_id=None,
+    user_id=None,
+    details=None,
 ):
-    """Enregistrer un événement d'audit"""
-    try:
-        if not user_id:
-            # Essayer d'obtenir user_id du contexte de la requête si disponible
-            user_id = getattr(request, "current_user_id", None)
+    """Construire (sans l'ajouter) une entrée d'audit pour la requête courante"""
+    if not user_id:
+        # Essayer d'obtenir user_id du contexte de la requête si disponible
+        user_id = getattr(request, "current_user_id", None)
+
+    return AuditLog(
+        user_id=user_id,
+        action=action,
+        resource_type="PASSWORD",
+        resource_id=resource_id,
+        ip_address=request.remote_addr,  # fiable via ProxyFix (M1)
+        user_agent=request.headers.get("User-Agent", ""),
+        success=success,
+        error_message=error_message,
+        details=json.dumps(details) if details is not None else None,
+        request_id=current_request_id(),
+        timestamp=datetime.now(timezone.utc),
+    )
 
-        ip_address = request.remote_addr  # fiable via ProxyFix (M1)
-        user_agent = request.headers.get("User-Agent", "")
 
-        # Créer une nouvelle session pour l'audit
-        audit_entry = AuditLog(
-            user_id=user_id,
-            action=action,
-            resource_type="PASSWORD",
-            resource_id=resource_id,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            success=success,
-            error_message=error_message,
-            timestamp=datetime.now(timezone.utc),
+def log_audit_event(
+    action,
+    success=True,
+    error_message=None,
+    resource_id=None,
+    user_id=None,
+    details=None,
+):
+    """Enregistrer un événement d'audit (committé avec l'unité de travail)"""
+    try:
+        stage_audit(
+            build_audit_entry(
+                action, success, error_message, resource_id, user_id, details
+            )
         )
 
-        db.session.add(audit_entry)
-        db.session.commit()
-
     except Exception as e:
         current_app.logger.error(f"Erreur lors de l'audit logging: {e}")
 
 
+def parse_expires_at(value):
+    """Date d'expiration ISO 8601 → datetime UTC naïf (None si vide, ValueError si invalide)"""
+    if not value:
+        return None
+    return to_naive_utc(datetime.fromisoformat(str(value).replace("Z", "+00:00")))
+
+
 def validate_password_data(data, is_update=False):
     """Valider les données d'un mot de passe"""
     errors = []
@@ -106,6 +164,21 @@ def validate_password_data(data, is_update=False):
     if "notes" in data and data["notes"] and len(data["notes"]) > 5000:
         errors.append("Notes cannot exceed 5000 characters")
 
+    if "expires_at" in data:
+        try:
+            parse_expires_at(data["expires_at"])
+        except (TypeError, ValueError):
+            errors.append("Expiration date must be an ISO 8601 date")
+
+    if "remind_before_expiry" in data:
+        remind = data["remind_before_expiry"]
+        if not isinstance(remind, int) or isinstance(remind, bool) or not (
+            0 <= remind <= MAX_REMIND_DAYS
+        ):
+            errors.append(
+                f"Reminder delay must be between 0 and {MAX_REMIND_DAYS} days"
+            )
+
     return errors
 
 
@@ -128,8 +201,17 @@ def get_passwords(current_user):
         sort_by = request.args.get("sort", "updated_at")
         sort_order = request.args.get("order", "desc")
 
-        # Construire la requête
-        query = Password.query.filter(Password.user_id == user_id)
+        try:
+            fields = parse_fields(request.args.get("fields", "").strip())
+            layout = parse_layout(request.args.get("layout"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        page = max(page, 1)
+        if per_page < 1:
+            per_page = 20
+
+        # Critères de la requête
+        criteria = [Password.user_id == user_id]
 
         # Filtres
         if search:
@@ -139,15 +221,16 @@ def get_passwords(current_user):
                 Password.site_url.ilike(f"%{search}%"),
                 Password.notes.ilike(f"%{search}%"),
             )
-            query = query.filter(search_filter)
+            criteria.append(search_filter)
 
         if category:
-            query = query.filter(Password.category == category)
+            criteria.append(Password.category == category)
 
         if favorites_only:
-            query = query.filter(Password.is_favorite == True)
+            criteria.append(Password.is_favorite == True)
 
         # Tri
+        order_column = None
         if sort_by in [
             "site_name",
             "username",
@@ -159,30 +242,25 @@ def get_passwords(current_user):
             order_column = getattr(Password, sort_by)
             if sort_order.lower() == "desc":
                 order_column = order_column.desc()
-            query = query.order_by(order_column)
-
-        # Pagination
-        passwords_paginated = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
 
-        # Convertir en dictionnaires (sans les mots de passe déchiffrés)
-        passwords_data = [password.to_dict() for password in passwords_paginated.items]
+        # Lecture projetée (Core, sans instances ORM ni colonnes inutiles)
+        rows, total = fetch_page_rows(criteria, order_column, page, per_page, fields)
+        pages = -(-total // per_page)
 
         log_audit_event("LIST_PASSWORDS", user_id=user_id)
 
-        return jsonify(
+        return list_response(
+            rows,
+            fields,
             {
-                "passwords": passwords_data,
-                "pagination": {
-                    "page": passwords_paginated.page,
-                    "pages": passwords_paginated.pages,
-                    "per_page": passwords_paginated.per_page,
-                    "total": passwords_paginated.total,
-                    "has_next": passwords_paginated.has_next,
-                    "has_prev": passwords_paginated.has_prev,
-                },
-            }
+                "page": page,
+                "pages": pages,
+                "per_page": per_page,
+                "total": total,
+                "has_next": page < pages,
+                "has_prev": page > 1,
+            },
+            layout,
         ), 200
 
     except Exception as e:
@@ -195,7 +273,123 @@ def get_passwords(current_user):
         return jsonify({"error": "Internal server error"}), 500
 
 
+@passwords_bp.route("/changes", methods=["GET"])
+@rate_limit_middleware
+@token_required
+def get_changes(current_user):
+    """Synchronisation delta : entrées créées/modifiées et suppressions depuis un jeton.
+
+    Sans `since`, renvoie tout le coffre (synchronisation initiale). Le client
+    rejoue la réponse (upsert des `updated`, suppression des `deleted`) puis
+    rappelle avec `sync_token` tant que `has_more` est vrai.
+    """
+    try:
+        user_id = current_user.id
+        since = request.args.get("since", "").strip()
+        limit = min(
+            request.args.get("limit", current_app.config["SYNC_PAGE_SIZE"], type=int),
+            current_app.config["SYNC_MAX_PAGE_SIZE"],
+        )
+        if limit < 1:
+            return jsonify({"error": "limit must be positive"}), 400
+        try:
+            layout = parse_layout(request.args.get("layout"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        try:
+            cursor, watermark = (
+                sync_service.decode_sync_token(since)
+                if since
+                else (sync_service.INITIAL_CURSOR, None)
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        try:
+            (
+                updated, deleted, next_cursor, next_watermark, has_more
+            ) = sync_service.collect_changes(
+                user_id,
+                cursor,
+                limit,
+                current_app.config["SYNC_TOMBSTONE_RETENTION_DAYS"],
+                watermark,
+            )
+        except sync_service.SyncTokenExpiredError as e:
+            return jsonify({"error": str(e), "code": "full_resync_required"}), 410
+
+        log_audit_event("SYNC_PASSWORDS", user_id=user_id)
+
+        timestamps = timestamp_column()
+        return negotiated_response(
+            {
+                "updated": serialize(
+                    entity_rows(updated, LIST_FIELDS), LIST_FIELDS, layout, timestamps
+                ),
+                "deleted": serialize(
+                    entity_rows(deleted, TOMBSTONE_FIELDS), TOMBSTONE_FIELDS, layout, timestamps
+                ),
+                "sync_token": sync_service.encode_sync_token(next_cursor, next_watermark),
+                "has_more": has_more,
+            }
+        )
+
+    except Exception as e:
+        log_audit_event(
+            "SYNC_PASSWORDS", success=False, error_message=str(e), user_id=user_id
+        )
+        current_app.logger.error(f"Erreur lors de la synchronisation delta: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@passwords_bp.route("/match", methods=["GET"])
+@rate_limit_middleware
+@token_required
+def match_passwords(current_user):
+    """Entrées candidates à l'autofill pour une URL, classées par spécificité.
+
+    Lookup par égalité sur (user_id, site_domain) — index idx_user_domain —
+    puis classement en mémoire : hôte exact, hôte parent, même domaine, et
+    préfixe de chemin le plus long.
+    """
+    try:
+        user_id = current_user.id
+        url = request.args.get("url", "").strip()
+        limit = min(request.args.get("limit", 10, type=int), 50)
+
+        host, _ = split_url(url)
+        domain = site_domain(url)
+        if not domain or limit < 1:
+            return jsonify({"error": "A valid url parameter is required"}), 400
+
+        candidates = Password.query.filter(
+            Password.user_id == user_id, Password.site_domain == domain
+        ).all()
+        ranked = rank_matches(candidates, url)[:limit]
+
+        log_audit_event("MATCH_PASSWORDS", user_id=user_id)
+
+        return jsonify(
+            {
+                "host": host,
+                "domain": domain,
+                "matches": [
+                    dict(entry.to_dict(), match=kind) for entry, kind in ranked
+                ],
+            }
+        ), 200
+
+    except Exception as e:
+        log_audit_event(
+            "MATCH_PASSWORDS", success=False, error_message=str(e), user_id=user_id
+        )
+        current_app.logger.error(f"Erreur lors de la recherche par URL: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @passwords_bp.route("/<string:password_id>", methods=["GET"])
+@no_compression
 @rate_limit_middleware
 @token_required
 def get_password(current_user, password_id):
@@ -243,22 +437,28 @@ def get_password(current_user, password_id):
         password_data["password"] = decrypted_password
 
         # Effets de bord OPPORTUNISTES et non bloquants : last_used + backfill
-        # v0 -> v1 (ré-encodage lié au contexte de la ligne). Un échec de
-        # persistance est avalé (logué sans secret) ; l'entrée reste en l'état
-        # (v0 relisible au prochain coup) et la lecture renvoie quand même 200.
-        try:
-            password_entry.last_used = datetime.now(timezone.utc)
+        # v0 -> v1 (ré-encodage lié au contexte de la ligne) + empreinte manquante.
+        # Isolés dans un SAVEPOINT : un échec est annulé seul (logué sans secret),
+        # l'entrée reste en l'état (v0 relisible au prochain coup) et la lecture
+        # renvoie quand même 200. Persistés par le COMMIT unique de fin de requête.
+        # Usage, pas contenu : `updated_at` garde sa valeur (UPDATE explicite, sans
+        # le onupdate du modèle), sinon chaque lecture ferait réapparaître l'entrée
+        # dans /changes et la ferait retélécharger par tous les appareils.
+        with side_effect("VIEW_PASSWORD"):
+            values = {
+                Password.last_used: datetime.now(timezone.utc),
+                Password.updated_at: Password.updated_at,
+            }
             if EncryptionService.is_legacy_entry(password_entry.encrypted_password):
-                password_entry.encrypted_password = EncryptionService.encrypt_entry(
+                values[Password.encrypted_password] = EncryptionService.encrypt_entry(
                     decrypted_password, vmk, entry_aad
                 )
-            db.session.commit()
-        except Exception as side_effect_error:
-            db.session.rollback()
-            current_app.logger.warning(
-                "Effet de bord non bloquant échoué (VIEW_PASSWORD) %s: %s",
-                password_id,
-                type(side_effect_error).__name__,
+            if password_entry.password_fingerprint is None:
+                values[Password.password_fingerprint] = compute_fingerprint(
+                    decrypted_password, vmk
+                )
+            Password.query.filter(Password.id == password_entry.id).update(
+                values, synchronize_session=False
             )
 
         log_audit_event("VIEW_PASSWORD", resource_id=password_id, user_id=user_id)
@@ -332,9 +532,11 @@ def create_password(current_user):
             user_id=user_id,
             site_name=data["site_name"].strip(),
             site_url=data.get("site_url", "").strip() or None,
+            site_domain=site_domain(data.get("site_url")),
             username=data["username"].strip(),
             email=data.get("email", "").strip() or None,
             encrypted_password=encrypted_password,
+            password_fingerprint=compute_fingerprint(data["password"], vmk),
             category=data.get("category", "").strip() or None,
             notes=data.get("notes", "").strip() or None,
             is_favorite=data.get("is_favorite", False),
@@ -342,6 +544,8 @@ def create_password(current_user):
             password_strength=strength_info["strength"],
             requires_2fa=data.get("requires_2fa", False),
             password_changed_at=datetime.now(timezone.utc),
+            expires_at=parse_expires_at(data.get("expires_at")),
+            remind_before_expiry=data.get("remind_before_expiry", 30),
         )
 
         # Gérer les tags
@@ -349,7 +553,8 @@ def create_password(current_user):
             password_entry.set_tags(data["tags"])
 
         db.session.add(password_entry)
-        db.session.commit()
+        db.session.flush()  # contraintes vérifiées ici, COMMIT en fin de requête
+        after_commit(lambda: invalidate_vault_caches(user_id))
 
         log_audit_event(
             "CREATE_PASSWORD", resource_id=password_entry.id, user_id=user_id
@@ -381,6 +586,7 @@ def create_password(current_user):
 
 
 @passwords_bp.route("/generate", methods=["POST"])
+@no_compression
 @token_required
 def generate_password(current_user):
     """Générer un nouveau mot de passe"""
@@ -459,6 +665,111 @@ def get_categories(current_user):
         return jsonify({"error": "Erreur interne du serveur"}), 500
 
 
+@passwords_bp.route("/stats", methods=["GET"])
+@rate_limit_middleware
+@token_required
+def get_stats(current_user):
+    """Statistiques du tableau de bord sur TOUT le coffre (une requête groupée, en cache)"""
+    try:
+        user_id = current_user.id
+        stats = get_vault_stats(user_id)
+
+        log_audit_event("VIEW_STATS", user_id=user_id)
+
+        return jsonify(stats), 200
+
+    except Exception as e:
+        log_audit_event(
+            "VIEW_STATS", success=False, error_message=str(e), user_id=user_id
+        )
+        current_app.logger.error(f"Erreur lors du calcul des statistiques: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+@passwords_bp.route("/expiring", methods=["GET"])
+@rate_limit_middleware
+@token_required
+def get_expiring_passwords(current_user):
+    """Mots de passe expirés ou à renouveler (liste précalculée par le scan, en cache)"""
+    try:
+        user_id = current_user.id
+        expiring = get_expiring(user_id)
+
+        log_audit_event("VIEW_EXPIRING", user_id=user_id)
+
+        return jsonify({"expiring": expiring, "count": len(expiring)}), 200
+
+    except Exception as e:
+        log_audit_event(
+            "VIEW_EXPIRING", success=False, error_message=str(e), user_id=user_id
+        )
+        current_app.logger.error(f"Erreur lors de la lecture des expirations: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+@passwords_bp.route("/security-report", methods=["GET"])
+@rate_limit_middleware
+@token_required
+def get_security_report(current_user):
+    """Rapport de sécurité (réutilisation, faiblesse, ancienneté) sans déchiffrement.
+
+    Seul le backfill des empreintes manquantes (entrées antérieures) déchiffre,
+    par lots bornés et uniquement si la session détient la VMK ; un échec de
+    persistance n'empêche jamais le rapport.
+    """
+    try:
+        user_id = current_user.id
+
+        vmk = current_app.session_key_store.get_vmk(g.session_id)
+        if vmk is not None:
+            with side_effect("FINGERPRINT_BACKFILL"):
+                backfill_fingerprints(
+                    user_id, vmk, current_app.config["FINGERPRINT_BACKFILL_BATCH"]
+                )
+
+        report = build_security_report(
+            user_id, current_app.config["SECURITY_REPORT_MAX_AGE_DAYS"]
+        )
+
+        log_audit_event("SECURITY_REPORT", user_id=user_id)
+
+        return jsonify(report), 200
+
+    except Exception as e:
+        log_audit_event(
+            "SECURITY_REPORT", success=False, error_message=str(e), user_id=user_id
+        )
+        current_app.logger.error(f"Erreur lors du rapport de sécurité: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+@passwords_bp.route("/breach-audit", methods=["GET"])
+@rate_limit_middleware
+@token_required
+def get_breach_audit(current_user):
+    """Confronter tout le coffre à la liste de fuites hors ligne (déchiffrement en session)"""
+    # VMK de session (hors try → coffre verrouillé = 423, pas 500)
+    vmk = current_app.session_key_store.get_required_vmk(g.session_id)
+    try:
+        user_id = current_user.id
+        audit = audit_vault_breaches(user_id, vmk)
+        if audit is None:
+            return jsonify(
+                {"error": "Breach filter not configured", "code": "breach_filter_disabled"}
+            ), 503
+
+        log_audit_event("BREACH_AUDIT", user_id=user_id)
+
+        return jsonify(audit), 200
+
+    except Exception as e:
+        log_audit_event(
+            "BREACH_AUDIT", success=False, error_message=str(e), user_id=user_id
+        )
+        current_app.logger.error(f"Erreur lors de l'audit des fuites: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
 @passwords_bp.route("/presets", methods=["GET"])
 @token_required
 def get_presets(current_user):
@@ -543,6 +854,7 @@ def update_password(current_user, password_id):
             password_obj.username = data["username"]
         if "site_url" in data:
             password_obj.site_url = data.get("site_url", "")
+            password_obj.site_domain = site_domain(password_obj.site_url)
         if "category" in data:
             password_obj.category = data.get("category", "personal")
         if "notes" in data:
@@ -553,6 +865,10 @@ def update_password(current_user, password_id):
             password_obj.requires_2fa = data.get("requires_2fa", False)
         if "is_favorite" in data:
             password_obj.is_favorite = data.get("is_favorite", False)
+        if "expires_at" in data:
+            password_obj.expires_at = parse_expires_at(data["expires_at"])
+        if "remind_before_expiry" in data:
+            password_obj.remind_before_expiry = data["remind_before_expiry"]
 
         # Si le mot de passe est modifié, le chiffrer et calculer la force
         if "password" in data:
@@ -562,6 +878,9 @@ def update_password(current_user, password_id):
                     data["password"], vmk, f"{user_id}:{password_obj.id}".encode()
                 )
                 password_obj.encrypted_password = encrypted_password
+                password_obj.password_fingerprint = compute_fingerprint(
+                    data["password"], vmk
+                )
 
                 strength_info = PasswordGenerator.evaluate_strength(data["password"])
                 password_obj.password_strength = strength_info["strength"]
@@ -578,7 +897,8 @@ def update_password(current_user, password_id):
 
         password_obj.updated_at = datetime.now(timezone.utc)
 
-        db.session.commit()
+        db.session.flush()
+        after_commit(lambda: invalidate_vault_caches(user_id))
 
         log_audit_event("UPDATE_PASSWORD", resource_id=password_id, user_id=user_id)
 
@@ -624,6 +944,127 @@ def update_password(current_user, password_id):
         return jsonify({"error": "Erreur interne du serveur"}), 500
 
 
+def _bulk_values(changes):
+    """Valider et normaliser le bloc `set` d'un PATCH groupé (liste d'erreurs, valeurs)"""
+    if not isinstance(changes, dict) or not changes:
+        return ["'set' must be a non-empty object"], None
+    unknown = sorted(set(changes) - BULK_FIELDS)
+    if unknown:
+        return [f"Fields cannot be bulk-updated: {', '.join(unknown)}"], None
+
+    errors = validate_password_data(changes, is_update=True)
+    for field in ("is_favorite", "requires_2fa"):
+        if field in changes and not isinstance(changes[field], bool):
+            errors.append(f"'{field}' must be a boolean")
+    if "priority" in changes and changes["priority"] not in (0, 1, 2):
+        errors.append("Priority must be 0, 1 or 2")
+    if "category" in changes and not isinstance(changes["category"], (str, type(None))):
+        errors.append("Category must be a string")
+    if errors:
+        return errors, None
+
+    values = {getattr(Password, field): value for field, value in changes.items()}
+    if "category" in changes:
+        values[Password.category] = (changes["category"] or "").strip() or None
+    if "expires_at" in changes:
+        values[Password.expires_at] = parse_expires_at(changes["expires_at"])
+    return [], values
+
+
+def _bulk_scope(user_id, data):
+    return resolve_scope(
+        user_id,
+        ids=data.get("ids"),
+        filters=data.get("filter"),
+        max_items=current_app.config["BULK_MAX_ITEMS"],
+    )
+
+
+@passwords_bp.route("/bulk", methods=["PATCH"])
+@rate_limit_middleware
+@token_required
+def bulk_update_passwords(current_user):
+    """Modifier un lot d'entrées (ids ou filtre) en une instruction et une transaction"""
+    try:
+        user_id = current_user.id
+        data = request.get_json(silent=True) or {}
+
+        errors, values = _bulk_values(data.get("set"))
+        if errors:
+            return jsonify({"error": "Invalid data", "details": errors}), 400
+
+        if "ids" not in data and is_category_rename(data.get("filter"), data["set"]):
+            # Renommage/fusion de catégorie : un UPDATE ensembliste, sans plafond
+            source = data["filter"]["category"]
+            updated = rename_category(user_id, source, values[Password.category])
+            details = {"count": updated, "fields": ["category"], "filter": {"category": source}}
+            results = []
+        else:
+            try:
+                requested, found = _bulk_scope(user_id, data)
+            except BulkScopeError as e:
+                return jsonify({"error": str(e)}), 400
+            updated = bulk_update(user_id, found, values)
+            details = {"count": updated, "fields": sorted(data["set"]), "ids": found}
+            results = per_id_results(requested, found, "updated")
+
+        # Audit récapitulatif committé avec la modification (même transaction)
+        stage_audit(
+            build_audit_entry("BULK_UPDATE_PASSWORDS", user_id=user_id, details=details)
+        )
+        after_commit(lambda: invalidate_vault_caches(user_id))
+
+        return jsonify({"updated": updated, "results": results}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        log_audit_event(
+            "BULK_UPDATE_PASSWORDS", success=False, error_message=str(e), user_id=user_id
+        )
+        current_app.logger.error(f"Erreur lors de la modification groupée: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+@passwords_bp.route("/bulk", methods=["DELETE"])
+@rate_limit_middleware
+@token_required
+def bulk_delete_passwords(current_user):
+    """Supprimer un lot d'entrées (ids ou filtre) avec tombstones, en une transaction"""
+    try:
+        user_id = current_user.id
+        data = request.get_json(silent=True) or {}
+
+        try:
+            requested, found = _bulk_scope(user_id, data)
+        except BulkScopeError as e:
+            return jsonify({"error": str(e)}), 400
+
+        deleted = bulk_delete(user_id, found)
+        stage_audit(
+            build_audit_entry(
+                "BULK_DELETE_PASSWORDS",
+                user_id=user_id,
+                details={"count": deleted, "ids": found},
+            )
+        )
+        after_commit(lambda: invalidate_vault_caches(user_id))
+
+        return jsonify(
+            {
+                "deleted": deleted,
+                "results": per_id_results(requested, found, "deleted"),
+            }
+        ), 200
+
+    except Exception as e:
+        db.session.rollback()
+        log_audit_event(
+            "BULK_DELETE_PASSWORDS", success=False, error_message=str(e), user_id=user_id
+        )
+        current_app.logger.error(f"Erreur lors de la suppression groupée: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
 @passwords_bp.route("/<string:password_id>", methods=["DELETE"])
 @token_required
 def delete_password(current_user, password_id):
@@ -644,8 +1085,12 @@ def delete_password(current_user, password_id):
             )
             return jsonify({"error": "Password not found"}), 404
 
+        # Tombstone dans la MÊME transaction : la suppression est visible des
+        # autres appareils via /changes dès qu'elle est commitée.
         db.session.delete(password_obj)
-        db.session.commit()
+        sync_service.record_tombstone(user_id, password_id)
+        db.session.flush()
+        after_commit(lambda: invalidate_vault_caches(user_id))
 
         log_audit_event("DELETE_PASSWORD", resource_id=password_id, user_id=user_id)
 
@@ -97,7 +97,7 @@ def update_profile(current_user):
                 ), 400
             current_user.username = username
 
-        db.session.commit()
+        db.session.flush()  # contraintes vérifiées ici, COMMIT en fin de requête
 
         return jsonify(
             {"message": "Profile updated successfully", "user": current_user.to_dict()}
@@ -161,7 +161,7 @@ def delete_account(current_user):
         current_app.session_key_store.evict(g.session_id)
         # (3) Purger (passwords et audit_logs supprimés en cascade).
         db.session.delete(current_user)
-        db.session.commit()
+        db.session.flush()  # COMMIT en fin de requête
 
         return jsonify({"message": "Account deleted successfully"}), 200
 
@@ -0,0 +1,147 @@
+"""
+Filtre de Bloom hors ligne des mots de passe compromis/courants.
+
+Le filtre est construit une fois, hors ligne, depuis une liste locale de mots
+de passe (cf. tools/build_breach_filter.py), puis ouvert ici en `mmap` lecture
+seule : les pages vivent dans le cache du noyau et sont PARTAGÉES par tous les
+workers gunicorn (aucune copie par processus, aucun parsing au démarrage).
+
+Format du fichier (petit-boutiste) :
+    magic(8) = b"PMBLOOM1" | num_bits(u64) | num_hashes(u32) | num_items(u64) | pad(4)
+    puis num_bits bits (octets, bit de poids faible d'abord)
+
+Indices : double hachage de Kirsch-Mitzenmacher sur un BLAKE2b-128 du mot de
+passe (h1 + i*h2 mod m) — une seule fonction de hachage par requête, k accès
+mémoire, donc O(k) soit quelques microsecondes. Faux positifs possibles (taux
+choisi à la construction), faux négatifs impossibles.
+
+Activation : variable d'environnement BREACH_FILTER_PATH. Absente ou fichier
+introuvable → filtre désactivé (seule la liste COMMON_PASSWORDS s'applique).
+"""
+
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PMBLOOM1"
+_HEADER = struct.Struct("<8sQIQ4x")
+HEADER_SIZE = _HEADER.size
+_PERSON = b"pm-breach-v1"
+
+
+def _hash_pair(password: str):
+    digest = hashlib.blake2b(
+        password.encode("utf-8"), digest_size=16, person=_PERSON
+    ).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1  # impair : parcourt tout l'anneau
+    return h1, h2
+
+
+def optimal_parameters(num_items: int, fp_rate: float):
+    """Taille (bits) et nombre de hachages optimaux pour n éléments et un taux p."""
+    num_items = max(1, num_items)
+    num_bits = max(8, math.ceil(-num_items * math.log(fp_rate) / (math.log(2) ** 2)))
+    num_hashes = max(1, round(num_bits / num_items * math.log(2)))
+    return num_bits, num_hashes
+
+
+class BreachFilter:
+    """Filtre de Bloom en lecture seule, adossé à un fichier mappé en mémoire."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.num_bits, self.num_hashes, self.num_items = _HEADER.unpack_from(
+            self._mm, 0
+        )
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path}: not a breach filter file")
+        if len(self._mm) < HEADER_SIZE + (self.num_bits + 7) // 8:
+            self._mm.close()
+            raise ValueError(f"{path}: truncated breach filter file")
+
+    def __contains__(self, password) -> bool:
+        if not password:
+            return False
+        h1, h2 = _hash_pair(password)
+        mm, m = self._mm, self.num_bits
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % m
+            if not (mm[HEADER_SIZE + (bit >> 3)] >> (bit & 7)) & 1:
+                return False
+        return True
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._mm)
+
+    def expected_fp_rate(self) -> float:
+        """Taux de faux positifs théorique pour le remplissage réel du filtre."""
+        k, m, n = self.num_hashes, self.num_bits, self.num_items
+        return (1 - math.exp(-k * n / m)) ** k
+
+    def close(self):
+        self._mm.close()
+
+    @staticmethod
+    def build(passwords, path: str, num_items: int, fp_rate: float = 1e-3) -> int:
+        """Construire le fichier depuis un itérable de mots de passe.
+
+        `num_items` dimensionne le filtre (borne haute acceptée). Écriture dans un
+        fichier temporaire puis renommage atomique : un worker qui ouvre le
+        chemin pendant la reconstruction voit l'ancien ou le nouveau, jamais un
+        fichier partiel. Retourne le nombre d'éléments insérés.
+        """
+        num_bits, num_hashes = optimal_parameters(num_items, fp_rate)
+        bits = bytearray((num_bits + 7) // 8)
+        inserted = 0
+        for password in passwords:
+            if not password:
+                continue
+            h1, h2 = _hash_pair(password)
+            for i in range(num_hashes):
+                bit = (h1 + i * h2) % num_bits
+                bits[bit >> 3] |= 1 << (bit & 7)
+            inserted += 1
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(_HEADER.pack(MAGIC, num_bits, num_hashes, inserted))
+            fh.write(bits)
+        os.replace(tmp_path, path)
+        return inserted
+
+
+_filters = {}
+_lock = threading.Lock()
+
+
+def get_breach_filter():
+    """Filtre configuré par BREACH_FILTER_PATH (ouvert une fois par processus), ou None."""
+    path = os.environ.get("BREACH_FILTER_PATH")
+    if not path:
+        return None
+    if path not in _filters:
+        with _lock:
+            if path not in _filters:
+                try:
+                    _filters[path] = BreachFilter(path)
+                except (OSError, ValueError) as e:
+                    logger.warning("Breach filter disabled (%s): %s", path, e)
+                    _filters[path] = None
+    return _filters[path]
+
+
+def is_breached(password) -> bool:
+    """Vrai si le mot de passe figure (probablement) dans la liste compromise."""
+    breach_filter = get_breach_filter()
+    return breach_filter is not None and password in breach_filter
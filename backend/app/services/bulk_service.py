@@ -0,0 +1,137 @@
+"""
+Opérations groupées sur le coffre (PATCH / DELETE /api/passwords/bulk).
+
+Une opération vise soit une liste d'ids, soit un filtre (catégorie, favoris,
+domaine, force maximale), toujours restreint à `user_id`. Elle s'exécute en
+requêtes ensemblistes dans UNE transaction :
+    SELECT id ... WHERE <portée>             (résultat par id, tombstones)
+    UPDATE / DELETE ... WHERE id IN (<ids>)  (une instruction)
+Le commit (avec l'entrée d'audit récapitulative) appartient à l'appelant.
+
+Renommer ou fusionner une catégorie = une seule instruction, sans
+matérialiser les ids ni plafond BULK_MAX_ITEMS (`rename_category`) :
+    {"filter": {"category": "Travail"}, "set": {"category": "Pro"}}
+    UPDATE ... WHERE user_id = ? AND category = ?
+"""
+
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app.models import Password, PasswordTombstone, db
+
+# Champs modifiables en masse (jamais le mot de passe, l'URL ou le nom : ils
+# portent des données dérivées — empreinte, domaine — calculées à l'unité).
+BULK_FIELDS = {
+    "category",
+    "is_favorite",
+    "priority",
+    "requires_2fa",
+    "expires_at",
+    "remind_before_expiry",
+}
+
+
+class BulkScopeError(ValueError):
+    """Portée d'opération groupée invalide ou trop large (→ 400)."""
+
+
+def _filter_criteria(filters):
+    criteria = []
+    for key, value in filters.items():
+        if key == "category":
+            criteria.append(
+                Password.category.is_(None) if value is None else Password.category == value
+            )
+        elif key == "is_favorite" and isinstance(value, bool):
+            criteria.append(Password.is_favorite.is_(value))
+        elif key == "site_domain" and isinstance(value, str):
+            criteria.append(Password.site_domain == value.lower())
+        elif key == "max_strength" and isinstance(value, int) and not isinstance(value, bool):
+            criteria.append(Password.password_strength <= value)
+        else:
+            raise BulkScopeError(f"Unsupported filter: {key}")
+    return criteria
+
+
+def resolve_scope(user_id, ids=None, filters=None, max_items=1000):
+    """Ids (dans l'ordre demandé) et ids trouvés de la portée, en une requête.
+
+    Retourne (ids demandés ou None, ids trouvés). Une portée vide ou qui
+    dépasse `max_items` lève BulkScopeError : pas d'opération sur tout le
+    coffre par accident.
+    """
+    if (ids is None) == (filters is None):
+        raise BulkScopeError("Provide either 'ids' or 'filter'")
+
+    query = db.session.query(Password.id).filter(Password.user_id == user_id)
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, str) for i in ids):
+            raise BulkScopeError("'ids' must be a non-empty list of ids")
+        ids = list(dict.fromkeys(ids))  # dédoublonnage, ordre conservé
+        if len(ids) > max_items:
+            raise BulkScopeError(f"At most {max_items} ids per request")
+        query = query.filter(Password.id.in_(ids))
+    else:
+        if not isinstance(filters, dict) or not filters:
+            raise BulkScopeError("'filter' must be a non-empty object")
+        query = query.filter(*_filter_criteria(filters))
+
+    found = [row.id for row in query.limit(max_items + 1)]
+    if len(found) > max_items:
+        raise BulkScopeError(f"Filter matches more than {max_items} entries")
+    return ids, found
+
+
+def is_category_rename(filters, changes):
+    """Renommage/fusion pur : filtre sur la seule catégorie, seule la catégorie modifiée."""
+    return (
+        isinstance(filters, dict)
+        and set(filters) == {"category"}
+        and isinstance(changes, dict)
+        and set(changes) == {"category"}
+    )
+
+
+def rename_category(user_id, source, target):
+    """UPDATE unique de toute une catégorie (sans commit) ; retourne le nombre modifié."""
+    return Password.query.filter(
+        Password.user_id == user_id, *_filter_criteria({"category": source})
+    ).update(
+        {Password.category: target, Password.updated_at: datetime.utcnow()},
+        synchronize_session=False,
+    )
+
+
+def _in_scope(user_id, found):
+    return Password.query.filter(Password.user_id == user_id, Password.id.in_(found))
+
+
+def bulk_update(user_id, found, values):
+    """UPDATE unique des entrées trouvées (sans commit) ; retourne le nombre modifié."""
+    if not found:
+        return 0
+    values = dict(values, updated_at=datetime.utcnow())
+    return _in_scope(user_id, found).update(values, synchronize_session=False)
+
+
+def bulk_delete(user_id, found):
+    """DELETE unique + tombstones en un INSERT groupé (sans commit)."""
+    if not found:
+        return 0
+    deleted = _in_scope(user_id, found).delete(synchronize_session=False)
+    now = datetime.utcnow()
+    db.session.execute(
+        insert(PasswordTombstone),
+        [{"id": entry_id, "user_id": user_id, "deleted_at": now} for entry_id in found],
+    )
+    return deleted
+
+
+def per_id_results(requested, found, status):
+    """Résultat par id : `status` pour les ids traités, `not_found` sinon."""
+    done = set(found)
+    return [
+        {"id": entry_id, "status": status if entry_id in done else "not_found"}
+        for entry_id in (requested if requested is not None else found)
+    ]
@@ -0,0 +1,198 @@
+"""
+Domaine enregistrable des URLs de site, pour la recherche d'autofill.
+
+Chaque entrée porte `site_domain`, le domaine enregistrable (eTLD+1) de son
+`site_url` calculé à l'écriture avec la Public Suffix List embarquée
+(app/data/public_suffix_list.dat, aucune requête réseau). La recherche d'une
+page se réduit alors à une égalité servie par l'index (user_id, site_domain) —
+`login.example.co.uk` et `www.example.co.uk` tombent sur `example.co.uk` —
+puis à un classement en mémoire des quelques candidats.
+
+Liste alternative (plus récente) : variable d'environnement
+PUBLIC_SUFFIX_LIST_PATH, au format officiel de publicsuffix.org.
+"""
+
+import ipaddress
+import os
+import threading
+from urllib.parse import urlsplit
+
+from sqlalchemy import bindparam, update
+
+from app.models import Password, db
+
+_DEFAULT_PSL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "public_suffix_list.dat",
+)
+
+_rules = None
+_lock = threading.Lock()
+
+
+def _load_rules(path):
+    """Règles (exactes, jokers, exceptions) du fichier PSL, sections ICANN et privées."""
+    exact, wildcard, exception = set(), set(), set()
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            rule = line.split(None, 1)[0] if line.strip() else ""
+            if not rule or rule.startswith("//"):
+                continue
+            if rule.startswith("!"):
+                exception.add(_to_ascii(rule[1:]))
+            elif rule.startswith("*."):
+                wildcard.add(_to_ascii(rule[2:]))
+            else:
+                exact.add(_to_ascii(rule))
+    return exact, wildcard, exception
+
+
+def _get_rules():
+    global _rules
+    if _rules is None:
+        with _lock:
+            if _rules is None:
+                _rules = _load_rules(
+                    os.environ.get("PUBLIC_SUFFIX_LIST_PATH") or _DEFAULT_PSL_PATH
+                )
+    return _rules
+
+
+def _to_ascii(host):
+    """Nom d'hôte en minuscules, forme punycode (IDNA) pour les domaines internationaux."""
+    host = host.strip().rstrip(".").lower()
+    try:
+        return host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return host
+
+
+def split_url(url):
+    """(hôte normalisé, chemin) d'une URL ; un hôte nu est accepté. Hôte vide si illisible."""
+    if not url:
+        return "", "/"
+    url = url.strip()
+    if "://" not in url:
+        url = f"//{url}"
+    try:
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+    except ValueError:
+        return "", "/"
+    return _to_ascii(host), parts.path or "/"
+
+
+def registrable_domain(host):
+    """Domaine enregistrable (eTLD+1) d'un hôte, None si l'hôte est un suffixe public.
+
+    Les adresses IP et les noms à un seul label (intranet, `localhost`) sont
+    leur propre domaine.
+    """
+    if not host:
+        return None
+    if "." not in host:
+        return host
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+
+    exact, wildcard, exception = _get_rules()
+    labels = host.split(".")
+    # Règle par défaut « * » : le dernier label est un suffixe public.
+    suffix_len = 1
+    for i in range(len(labels)):
+        candidate = ".".join(labels[i:])
+        if candidate in exception:
+            suffix_len = len(labels) - i - 1
+            break
+        parent = ".".join(labels[i + 1:])
+        if candidate in exact or (parent and parent in wildcard):
+            suffix_len = len(labels) - i
+            break
+    if len(labels) <= suffix_len:
+        return None
+    return ".".join(labels[-(suffix_len + 1):])
+
+
+def site_domain(site_url):
+    """Valeur de la colonne `site_domain` pour une URL de site (None si absente)."""
+    host, _ = split_url(site_url)
+    return registrable_domain(host)
+
+
+def _strip_www(host):
+    return host[4:] if host.startswith("www.") else host
+
+
+def rank_matches(entries, page_url):
+    """Classer les entrées candidates (même domaine) par spécificité pour la page.
+
+    Hôte : identique (à `www.` près) > entrée parente de la page > même domaine.
+    Puis le chemin de l'entrée le plus long préfixe du chemin de la page, puis
+    favoris et dernier usage. Retourne des couples (entrée, type de correspondance).
+    """
+    page_host, page_path = split_url(page_url)
+    page_host = _strip_www(page_host)
+    ranked = []
+    for entry in entries:
+        host, path = split_url(entry.site_url)
+        host = _strip_www(host)
+        if host == page_host:
+            kind, host_score = "exact", 2
+        elif page_host.endswith(f".{host}"):
+            kind, host_score = "parent", 1
+        else:
+            kind, host_score = "domain", 0
+        path = path.rstrip("/")
+        path_score = (
+            len(path)
+            if path and (page_path == path or page_path.startswith(f"{path}/"))
+            else 0
+        )
+        last_used = entry.last_used.timestamp() if entry.last_used else 0
+        ranked.append(
+            ((host_score, path_score, bool(entry.is_favorite), last_used), entry, kind)
+        )
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return [(entry, kind) for _, entry, kind in ranked]
+
+
+def backfill_site_domains(batch_size=1000):
+    """Renseigner `site_domain` des entrées antérieures à la colonne (commit par lot).
+
+    Parcours par clé (id) : une URL sans domaine enregistrable reste NULL sans
+    être relue indéfiniment ; premier lot sans prédicat d'id (pas de `id > ''`,
+    invalide pour une colonne UUID). Donnée dérivée, pas un changement de
+    contenu : UPDATE Core qui conserve `updated_at` (sinon toutes les entrées
+    repartiraient vers tous les appareils par /changes). Retourne le nombre
+    d'entrées renseignées.
+    """
+    table = Password.__table__
+    write = (
+        update(table)
+        .where(table.c.id == bindparam("entry_id"))
+        .values(site_domain=bindparam("domain"), updated_at=table.c.updated_at)
+    )
+    filled, last_id = 0, None
+    while True:
+        query = db.session.query(Password.id, Password.site_url).filter(
+            Password.site_domain.is_(None), Password.site_url.isnot(None)
+        )
+        if last_id is not None:
+            query = query.filter(Password.id > last_id)
+        batch = query.order_by(Password.id).limit(batch_size).all()
+        if not batch:
+            return filled
+        domains = [
+            {"entry_id": row.id, "domain": domain}
+            for row in batch
+            if (domain := site_domain(row.site_url)) is not None
+        ]
+        if domains:
+            db.session.execute(write, domains)
+        filled += len(domains)
+        last_id = batch[-1].id
+        db.session.commit()
@@ -3,11 +3,20 @@ Service de chiffrement AES pour les mots de passe
 """
 
 import base64
+import hashlib
+import hmac
 import os
 import secrets
+import time
+from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from argon2.low_level import hash_secret_raw, Type
 
+from metrics import AES_GCM_DECRYPT, AES_GCM_ENCRYPT, ARGON2_SECONDS
+from server_timing import record
+from tracing import span
+
 
 class EncryptionService:
     """Service de chiffrement/déchiffrement AES-256-GCM"""
@@ -46,15 +55,21 @@ class EncryptionService:
             raise ValueError("master_password requis")
         if not salt or len(salt) < 16:
             raise ValueError("sel invalide (>= 16 octets requis)")
-        return hash_secret_raw(
-            secret=master_password.encode("utf-8"),
-            salt=salt,
-            time_cost=EncryptionService.ARGON2_TIME_COST,
-            memory_cost=EncryptionService.ARGON2_MEMORY_KIB,
-            parallelism=EncryptionService.ARGON2_PARALLELISM,
-            hash_len=EncryptionService.ARGON2_KEY_LENGTH,
-            type=Type.ID,
-        )
+        start = time.perf_counter()
+        with span("crypto.argon2id"):
+            kek = hash_secret_raw(
+                secret=master_password.encode("utf-8"),
+                salt=salt,
+                time_cost=EncryptionService.ARGON2_TIME_COST,
+                memory_cost=EncryptionService.ARGON2_MEMORY_KIB,
+                parallelism=EncryptionService.ARGON2_PARALLELISM,
+                hash_len=EncryptionService.ARGON2_KEY_LENGTH,
+                type=Type.ID,
+            )
+        elapsed = time.perf_counter() - start
+        ARGON2_SECONDS.observe(elapsed)
+        record("argon2", elapsed)
+        return kek
 
     @staticmethod
     def generate_vmk() -> bytes:
@@ -73,8 +88,10 @@ class EncryptionService:
         GCM couvre l'AAD, donc un blob ne peut plus être déplacé vers un autre
         contexte. `aad=None` = pas de binding (blobs de l'incrément (a)).
         """
+        AES_GCM_ENCRYPT.inc()
         nonce = secrets.token_bytes(EncryptionService.GCM_NONCE_LENGTH)
-        ct = AESGCM(key).encrypt(nonce, plaintext, aad)  # ct = ciphertext || tag
+        with span("crypto.aes_gcm.encrypt"):
+            ct = AESGCM(key).encrypt(nonce, plaintext, aad)  # ct = ciphertext || tag
         blob = bytes([EncryptionService.AEAD_VERSION_V1]) + nonce + ct
         return base64.b64encode(blob).decode("utf-8")
 
@@ -89,25 +106,27 @@ class EncryptionService:
         L'anti-déplacement tient : un blob lié à un contexte X échoue sous tout
         autre contexte ET sous None. Aucune donnée v0/(a) ne devient illisible.
         """
-        raw = base64.b64decode(token.encode("utf-8"))
-        N = EncryptionService.GCM_NONCE_LENGTH
+        AES_GCM_DECRYPT.inc()
+        with span("crypto.aes_gcm.decrypt"):
+            raw = base64.b64decode(token.encode("utf-8"))
+            N = EncryptionService.GCM_NONCE_LENGTH
 
-        if raw and raw[0] == EncryptionService.AEAD_VERSION_V1:
-            nonce, ct = raw[1 : 1 + N], raw[1 + N :]
-            candidates = [aad] if aad is None else [aad, None]
-            for candidate in candidates:
-                try:
-                    return AESGCM(key).decrypt(nonce, ct, candidate)
-                except Exception:
-                    pass  # essaie la suivante, puis fallback v0
-
-        try:
-            return AESGCM(key).decrypt(raw[:N], raw[N:], None)
-        except Exception:
-            # Ne JAMAIS divulguer la cle / le master password dans l'erreur
-            raise ValueError(
-                "Dechiffrement impossible (cle invalide ou donnees alterees)"
-            )
+            if raw and raw[0] == EncryptionService.AEAD_VERSION_V1:
+                nonce, ct = raw[1 : 1 + N], raw[1 + N :]
+                candidates = [aad] if aad is None else [aad, None]
+                for candidate in candidates:
+                    try:
+                        return AESGCM(key).decrypt(nonce, ct, candidate)
+                    except Exception:
+                        pass  # essaie la suivante, puis fallback v0
+
+            try:
+                return AESGCM(key).decrypt(raw[:N], raw[N:], None)
+            except Exception:
+                # Ne JAMAIS divulguer la cle / le master password dans l'erreur
+                raise ValueError(
+                    "Dechiffrement impossible (cle invalide ou donnees alterees)"
+                )
 
     @staticmethod
     def is_legacy_entry(token: str) -> bool:
@@ -156,6 +175,62 @@ class EncryptionService:
             raise ValueError("VMK invalide")
         return EncryptionService._aesgcm_decrypt(vmk, token, aad).decode("utf-8")
 
+    @staticmethod
+    def encrypt_entries(items, vmk: bytes) -> list:
+        """Chiffrer un lot d'entrées d'un même coffre : [(plaintext, aad), ...].
+
+        Même format v1 et mêmes garanties qu'`encrypt_entry` (un nonce frais par
+        entrée), mais un seul contexte AESGCM et un seul tirage d'aléa pour tout
+        le lot : c'est le chemin des imports et du seeding (tools/seed_data.py).
+        """
+        if len(vmk) != EncryptionService.VMK_LENGTH:
+            raise ValueError("VMK invalide")
+        if any(not plaintext for plaintext, _ in items):
+            raise ValueError("texte vide")
+        N = EncryptionService.GCM_NONCE_LENGTH
+        nonces = secrets.token_bytes(N * len(items))
+        version = bytes([EncryptionService.AEAD_VERSION_V1])
+        aesgcm = AESGCM(vmk)
+        tokens = []
+        with span("crypto.aes_gcm.encrypt", attributes={"crypto.batch_size": len(items)}):
+            for i, (plaintext, aad) in enumerate(items):
+                nonce = nonces[i * N : (i + 1) * N]
+                ct = aesgcm.encrypt(nonce, plaintext.encode("utf-8"), aad)
+                tokens.append(base64.b64encode(version + nonce + ct).decode("utf-8"))
+        AES_GCM_ENCRYPT.inc(len(items))
+        return tokens
+
+    # ==================================================================
+    # Empreintes à clé (détection de réutilisation côté serveur)
+    # ==================================================================
+
+    # Séparation de domaine HKDF : la clé d'empreinte est dérivée de la VMK mais
+    # n'est JAMAIS utilisable comme clé de chiffrement (et réciproquement).
+    _HKDF_INFO_FINGERPRINT = b"entry-fingerprint-v1"
+
+    @staticmethod
+    def derive_fingerprint_key(vmk: bytes) -> bytes:
+        """Dériver (HKDF-SHA256) la clé HMAC des empreintes depuis la VMK.
+
+        Sans la VMK (donc sans session déverrouillée), les empreintes stockées
+        ne permettent ni attaque par dictionnaire ni corrélation entre utilisateurs.
+        """
+        if len(vmk) != EncryptionService.VMK_LENGTH:
+            raise ValueError("VMK invalide")
+        return HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=EncryptionService._HKDF_INFO_FINGERPRINT,
+        ).derive(vmk)
+
+    @staticmethod
+    def fingerprint_entry(plaintext: str, fingerprint_key: bytes) -> str:
+        """Empreinte déterministe d'un mot de passe : HMAC-SHA256 hexadécimal (64 car.)."""
+        return hmac.new(
+            fingerprint_key, plaintext.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+
     # ==================================================================
     # Choreographie du coffre (Lot 3 / C1)
     # ==================================================================
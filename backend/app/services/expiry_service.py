@@ -0,0 +1,210 @@
+"""
+Rappels d'expiration des mots de passe (colonnes `expires_at` /
+`remind_before_expiry`).
+
+Un rappel est dû dès que `expires_at - remind_before_expiry jours <= maintenant`
+(les entrées déjà expirées restent dues jusqu'à leur mise à jour). Le scan est
+ensembliste : une seule requête SQL pour tous les utilisateurs, bornée par
+l'index partiel `expires_at IS NOT NULL` (les entrées sans expiration, la grande
+majorité, n'y figurent pas), puis condition exacte par ligne.
+
+Le résultat est écrit dans Redis sous forme d'une liste compacte par
+utilisateur (`expiring:<user_id>`) : le tableau de bord ne coûte qu'une lecture
+de cache. Cache absent (scan pas encore passé, écriture du coffre) → calcul pour
+ce seul utilisateur, puis mise en cache. Toute écriture du coffre (dont
+`expires_at`) invalide la liste ; sans écriture, une liste en cache n'est
+valable que jusqu'au prochain rappel à venir (TTL plafonné), même si aucun scan
+ne tourne.
+
+Les horodatages sont normalisés en UTC naïf : `expires_at` est un
+`TIMESTAMP WITH TIME ZONE` sous PostgreSQL (datetime « aware »).
+
+Déclenchement : `flask scan-expiring` (cron) ou planificateur interne
+(EXPIRY_SCAN_INTERVAL_SECONDS > 0), protégé par un verrou Redis pour qu'un seul
+worker scanne par intervalle.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func
+
+from app.models import Password, db
+from app.services.timestamps import to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+EXPIRING_PREFIX = "expiring:"
+_SCAN_LOCK_KEY = "expiring:scan-lock"
+
+DEFAULT_REMIND_DAYS = 30
+# Borne haute de remind_before_expiry (validée à l'écriture) : borne la plage
+# parcourue dans l'index partiel.
+MAX_REMIND_DAYS = 365
+
+
+def _due_condition(now):
+    """Condition SQL exacte « rappel dû à `now` », selon le dialecte."""
+    days = func.coalesce(Password.remind_before_expiry, DEFAULT_REMIND_DAYS)
+    if db.engine.dialect.name == "postgresql":
+        return Password.expires_at <= now + func.make_interval(0, 0, 0, days)
+    # SQLite : arithmétique en jours juliens
+    return func.julianday(Password.expires_at) <= func.julianday(now) + days
+
+
+def _due_query(now):
+    return (
+        db.session.query(
+            Password.user_id, Password.id, Password.site_name, Password.expires_at
+        )
+        .filter(
+            Password.expires_at.isnot(None),
+            Password.expires_at <= now + timedelta(days=MAX_REMIND_DAYS),
+            _due_condition(now),
+        )
+        .order_by(Password.user_id, Password.expires_at)
+    )
+
+
+def _item(row):
+    return {
+        "id": row.id,
+        "site_name": row.site_name,
+        "expires_at": to_naive_utc(row.expires_at).isoformat(),
+    }
+
+
+def compute_due_lists(now=None, user_id=None):
+    """Listes de rappels dus par utilisateur ({user_id: [items]}), en une requête."""
+    query = _due_query(now or datetime.utcnow())
+    if user_id is not None:
+        query = query.filter(Password.user_id == user_id)
+    due = {}
+    for row in query:
+        due.setdefault(row.user_id, []).append(_item(row))
+    return due
+
+
+def next_due_times(now, user_id=None):
+    """Prochain rappel à venir par utilisateur ({user_id: datetime}), dans l'horizon du cache.
+
+    Seules les entrées dont le rappel tombe avant l'expiration du cache comptent :
+    `expires_at <= now + MAX_REMIND_DAYS + TTL` borne la plage lue dans l'index.
+    """
+    horizon = now + timedelta(days=MAX_REMIND_DAYS, seconds=_ttl())
+    query = db.session.query(
+        Password.user_id, Password.expires_at, Password.remind_before_expiry
+    ).filter(
+        Password.expires_at.isnot(None),
+        Password.expires_at > now,
+        Password.expires_at <= horizon,
+    )
+    if user_id is not None:
+        query = query.filter(Password.user_id == user_id)
+    upcoming = {}
+    for row in query:
+        days = row.remind_before_expiry
+        due_at = to_naive_utc(row.expires_at) - timedelta(
+            days=DEFAULT_REMIND_DAYS if days is None else days
+        )
+        if due_at > now and (row.user_id not in upcoming or due_at < upcoming[row.user_id]):
+            upcoming[row.user_id] = due_at
+    return upcoming
+
+
+def _redis():
+    return current_app.redis
+
+
+def _ttl():
+    return current_app.config["EXPIRY_CACHE_TTL_SECONDS"]
+
+
+def _cache_ttl(now, next_due):
+    """TTL d'une liste en cache : jamais au-delà du prochain rappel à venir."""
+    if next_due is None:
+        return _ttl()
+    return max(1, min(_ttl(), math.ceil((next_due - now).total_seconds())))
+
+
+def scan_expiring(now=None):
+    """Scanner tout le coffre et publier les listes dues dans Redis (pipeline).
+
+    Retourne (utilisateurs concernés, rappels dus).
+    """
+    now = now or datetime.utcnow()
+    due = compute_due_lists(now)
+    upcoming = next_due_times(now)
+    pipe = _redis().pipeline(transaction=False)
+    for user_id, items in due.items():
+        pipe.setex(
+            EXPIRING_PREFIX + user_id,
+            _cache_ttl(now, upcoming.get(user_id)),
+            json.dumps(items),
+        )
+    pipe.execute()
+    return len(due), sum(len(items) for items in due.values())
+
+
+def get_expiring(user_id, now=None):
+    """Rappels dus de l'utilisateur (cache, sinon calcul ciblé), avec jours restants."""
+    now = now or datetime.utcnow()
+    key = EXPIRING_PREFIX + str(user_id)
+    items = None
+    try:
+        cached = _redis().get(key)
+        if cached is not None:
+            items = json.loads(cached)
+    except Exception as e:
+        logger.warning("Expiry cache read failed: %s", type(e).__name__)
+
+    if items is None:
+        items = compute_due_lists(now, user_id).get(user_id, [])
+        next_due = next_due_times(now, user_id).get(user_id)
+        try:
+            _redis().setex(key, _cache_ttl(now, next_due), json.dumps(items))
+        except Exception as e:
+            logger.warning("Expiry cache write failed: %s", type(e).__name__)
+
+    for item in items:
+        remaining = to_naive_utc(datetime.fromisoformat(item["expires_at"])) - now
+        item["days_left"] = remaining.days
+        item["expired"] = remaining.total_seconds() <= 0
+    return items
+
+
+def start_expiry_scheduler(app):
+    """Lancer le scan périodique dans un thread démon de ce processus.
+
+    Chaque worker lance le sien ; le verrou Redis (SET NX EX) garantit un seul
+    scan par intervalle pour tout le déploiement. À lancer après le fork des
+    workers (un thread ne survit pas au fork).
+    """
+    interval = app.config["EXPIRY_SCAN_INTERVAL_SECONDS"]
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    locked = app.redis.set(
+                        _SCAN_LOCK_KEY, "1", nx=True, ex=max(1, interval - 1)
+                    )
+                    if locked:
+                        users, reminders = scan_expiring()
+                        logger.info(
+                            "Expiry scan: %d reminder(s) for %d user(s)", reminders, users
+                        )
+                except Exception as e:
+                    logger.error("Expiry scan failed: %s", e)
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=loop, name="expiry-scanner", daemon=True)
+    thread.start()
+    return thread
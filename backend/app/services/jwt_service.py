@@ -8,6 +8,8 @@ from datetime import datetime, timedelta
 from flask import current_app, request, jsonify, g
 from functools import wraps
 
+from tracing import span
+
 
 class JWTService:
     """Service pour gérer les tokens JWT"""
@@ -69,6 +71,41 @@ class JWTService:
 
 
 
+def _authenticate():
+    """(utilisateur, None) si le token et la session sont valides, sinon (None, réponse 401)."""
+    auth_header = request.headers.get("Authorization")
+    token = None
+    if auth_header:
+        try:
+            token = auth_header.split(" ")[1]
+        except IndexError:
+            return None, (jsonify({"error": "Invalid authorization header format"}), 401)
+    if not token:
+        return None, (jsonify({"error": "Token is missing"}), 401)
+
+    payload, error = JWTService.decode_token(token)
+    if error:
+        return None, (jsonify({"error": error}), 401)
+    if payload.get("type") != "access":
+        return None, (jsonify({"error": "Invalid token type"}), 401)
+
+    # Pivot du modèle de révocation : la session doit encore exister.
+    # Inactivité glissante : le TTL est ré-armé par la même commande Redis.
+    sid = payload.get("sid")
+    store = current_app.session_key_store
+    if not store.touch(sid, current_app.config["VAULT_SESSION_IDLE_TTL_SECONDS"]):
+        return None, (jsonify({"error": "Session expired or revoked"}), 401)
+    g.session_id = sid
+
+    from app.models import User
+
+    current_user = User.query.get(payload["user_id"])
+    if not current_user:
+        return None, (jsonify({"error": "User not found"}), 401)
+
+    return current_user, None
+
+
 def token_required(f):
     """Décorateur protégeant les routes : token valide ET session encore active.
 
@@ -80,37 +117,16 @@ def token_required(f):
 
     @wraps(f)
     def decorated(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        token = None
-        if auth_header:
-            try:
-                token = auth_header.split(" ")[1]
-            except IndexError:
-                return jsonify({"error": "Invalid authorization header format"}), 401
-        if not token:
-            return jsonify({"error": "Token is missing"}), 401
-
-        payload, error = JWTService.decode_token(token)
-        if error:
-            return jsonify({"error": error}), 401
-        if payload.get("type") != "access":
-            return jsonify({"error": "Invalid token type"}), 401
-
-        # Pivot du modèle de révocation : la session doit encore exister.
-        sid = payload.get("sid")
-        store = current_app.session_key_store
-        if not sid or not store.session_exists(sid):
-            return jsonify({"error": "Session expired or revoked"}), 401
-        # Inactivité glissante : ré-armer le TTL à chaque requête.
-        store.touch(sid, current_app.config["VAULT_SESSION_IDLE_TTL_SECONDS"])
-        g.session_id = sid
-
-        from app.models import User
-
-        current_user = User.query.get(payload["user_id"])
-        if not current_user:
-            return jsonify({"error": "User not found"}), 401
-
+        # Sous-requête d'un lot (/api/batch) : token, session et utilisateur ont
+        # déjà été validés une fois pour tout le lot.
+        batch_user = g.get("batch_user")
+        if batch_user is not None:
+            return f(batch_user, *args, **kwargs)
+
+        with span("auth.token_required"):
+            current_user, failure = _authenticate()
+        if failure is not None:
+            return failure
         return f(current_user, *args, **kwargs)
 
     return decorated
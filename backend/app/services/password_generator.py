@@ -7,7 +7,16 @@ import string
 import re
 from typing import Dict, List, Optional
 
-from zxcvbn import zxcvbn
+from app.services.breach_filter import is_breached
+from server_timing import phase
+
+
+def zxcvbn(password, user_inputs=None):
+    """zxcvbn importé au premier appel : ses dictionnaires de fréquence coûtent
+    ~30 ms à l'import, payés sinon par chaque worker au démarrage (cf. warmup)."""
+    from zxcvbn import zxcvbn as _zxcvbn
+
+    return _zxcvbn(password, user_inputs)
 
 
 class PasswordGenerator:
@@ -147,8 +156,10 @@ class PasswordGenerator:
         secrets.SystemRandom().shuffle(password_list)
         password = "".join(password_list)
 
-        # Vérifier qu'il ne s'agit pas d'un mot de passe courant
-        if password.lower() in PasswordGenerator.COMMON_PASSWORDS:
+        # Vérifier qu'il ne s'agit pas d'un mot de passe courant ou compromis
+        if password.lower() in PasswordGenerator.COMMON_PASSWORDS or is_breached(
+            password
+        ):
             # Régénérer récursivement
             return PasswordGenerator.generate(
                 length,
@@ -180,10 +191,15 @@ class PasswordGenerator:
         Évaluer la force d'un mot de passe
 
         Returns:
-            Dict avec 'strength' (1-5), 'entropy', et 'feedback'
+            Dict avec 'strength' (1-5), 'entropy', 'feedback' et 'breached'
         """
         if not password:
-            return {"strength": 0, "entropy": 0, "feedback": ["Mot de passe vide"]}
+            return {
+                "strength": 0,
+                "entropy": 0,
+                "feedback": ["Mot de passe vide"],
+                "breached": False,
+            }
 
         length = len(password)
         feedback = []
@@ -213,7 +229,8 @@ class PasswordGenerator:
         # pas seulement la diversité de caractères : un mot de passe « qui a l'air
         # complexe » mais prévisible est noté honnêtement (M6). L'entropie et les
         # drapeaux has_* restent calculés au-dessus pour l'affichage des consommateurs.
-        z = zxcvbn(password)
+        with phase("zxcvbn"):
+            z = zxcvbn(password)
         strength = z["score"] + 1  # 0..4 → 1..5
 
         warning = z["feedback"].get("warning")
@@ -221,10 +238,21 @@ class PasswordGenerator:
             feedback.append(warning)
         feedback.extend(z["feedback"].get("suggestions", []))
 
+        # Présent dans une liste de fuites (filtre de Bloom hors ligne) ou dans la
+        # liste courante : devinable par attaque par dictionnaire → force plancher.
+        breached = (
+            password.lower() in PasswordGenerator.COMMON_PASSWORDS
+            or is_breached(password)
+        )
+        if breached:
+            strength = 1
+            feedback.insert(0, "This password appears in a list of breached passwords")
+
         return {
             "strength": strength,
             "entropy": round(entropy, 1),
             "feedback": feedback,
+            "breached": breached,
             "has_lowercase": has_lower,
             "has_uppercase": has_upper,
             "has_digits": has_digit,
@@ -0,0 +1,215 @@
+"""
+Chemin de lecture sans ORM pour les listes d'entrées.
+
+`Password.query` matérialise une instance ORM complète par ligne (notes,
+`encrypted_password`, suivi d'identité, état d'instance), puis `to_dict()`
+convertit chaque champ un par un. Pour une page de 100 lignes, c'est l'essentiel
+du coût CPU de la liste. Ici :
+
+- `select()` Core sur les SEULES colonnes projetées : les lignes arrivent en
+  tuples nommés légers, jamais en objets ORM ;
+- sérialisation par colonne : chaque convertisseur (dates → ISO 8601, tags →
+  liste) est appliqué à une colonne entière, puis les dictionnaires sont
+  reconstruits d'un seul `zip` ;
+- `fields=` (sparse fieldset) : le client ne demande que ce qu'il affiche ;
+  `id` est toujours inclus.
+
+Le format de sortie par défaut est identique à `Password.to_dict()`.
+
+Avec le cache de fragments (json_provider.RowFragmentCache), une ligne déjà
+sérialisée est resservie en octets si son (id, updated_at, last_used) n'a pas
+changé : seules les lignes modifiées repassent par la sérialisation.
+`last_used` fait partie de la clé car une lecture le met à jour sans toucher à
+`updated_at` (réservé aux changements de contenu).
+
+Mise en page colonnaire (`layout=columnar`) : `{champ: [valeurs]}` au lieu
+d'une liste d'objets, les clés ne sont plus répétées par entrée. Formats
+binaires (content_negotiation) : horodatages natifs du format au lieu d'ISO.
+"""
+
+from flask import current_app, jsonify
+from sqlalchemy import func, select
+
+from app.models import Password, db
+from content_negotiation import JSON, encode, negotiate_format, timestamp_column
+
+# Champs publics d'une entrée de liste, dans l'ordre de Password.to_dict()
+LIST_FIELDS = (
+    "id",
+    "site_name",
+    "site_url",
+    "username",
+    "email",
+    "category",
+    "tags",
+    "notes",
+    "is_favorite",
+    "priority",
+    "password_strength",
+    "requires_2fa",
+    "created_at",
+    "updated_at",
+    "last_used",
+    "password_changed_at",
+    "expires_at",
+    "remind_before_expiry",
+)
+
+# Champs d'un tombstone de synchronisation, dans l'ordre de to_dict()
+TOMBSTONE_FIELDS = ("id", "deleted_at")
+
+_DATETIME_FIELDS = {
+    "created_at",
+    "updated_at",
+    "last_used",
+    "password_changed_at",
+    "expires_at",
+    "deleted_at",
+}
+
+
+def _iso_column(values):
+    return [v.isoformat() if v is not None else None for v in values]
+
+
+def _tags_column(values):
+    return [v.split(",") if v else [] for v in values]
+
+
+def _converter(field, timestamps=None):
+    if field in _DATETIME_FIELDS:
+        return timestamps or _iso_column
+    if field == "tags":
+        return _tags_column
+    return None
+
+
+def parse_fields(raw):
+    """Champs demandés par `fields=a,b,c` (tous si absent) ; ValueError si inconnu."""
+    if not raw:
+        return LIST_FIELDS
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested - set(LIST_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(name for name in LIST_FIELDS if name in requested)
+
+
+def projected_select(fields):
+    """SELECT des seules colonnes des champs demandés."""
+    table = Password.__table__
+    return select(*(table.c[name] for name in fields))
+
+
+def _columns(rows, fields, timestamps):
+    columns = [list(column) for column in zip(*rows)] if rows else [[] for _ in fields]
+    for index, name in enumerate(fields):
+        convert = _converter(name, timestamps)
+        if convert is not None:
+            columns[index] = convert(columns[index])
+    return columns
+
+
+def serialize_rows(rows, fields, timestamps=None):
+    """Sérialiser des lignes (tuples) en dictionnaires, colonne par colonne.
+
+    `timestamps` : convertisseur de colonne des horodatages (ISO 8601 par
+    défaut ; voir content_negotiation.timestamp_column).
+    """
+    if not rows:
+        return []
+    columns = _columns(rows, fields, timestamps)
+    return [dict(zip(fields, values)) for values in zip(*columns)]
+
+
+def serialize_columns(rows, fields, timestamps=None):
+    """Sérialiser des lignes en mise en page colonnaire : {champ: [valeurs]}."""
+    return dict(zip(fields, _columns(rows, fields, timestamps)))
+
+
+def serialize(rows, fields, layout="rows", timestamps=None):
+    """Sérialiser selon la mise en page demandée ("rows" ou "columnar")."""
+    if layout == "columnar":
+        return serialize_columns(rows, fields, timestamps)
+    return serialize_rows(rows, fields, timestamps)
+
+
+def entity_rows(entities, fields):
+    """Lignes (tuples) des champs demandés d'instances ORM déjà chargées."""
+    return [tuple(getattr(entity, name) for name in fields) for entity in entities]
+
+
+def fetch_page_rows(criteria, order_by, page, per_page, fields):
+    """Page projetée (tuples) + total.
+
+    Le total voyage avec la page (`count(*) OVER ()`, calculé avant LIMIT) :
+    un seul aller-retour. Requête de comptage séparée seulement pour une page
+    vide au-delà de la première (le total n'y est pas porté).
+    """
+    stmt = projected_select(fields).add_columns(func.count().over())
+    stmt = stmt.where(*criteria)
+    if order_by is not None:
+        stmt = stmt.order_by(order_by)
+    result = db.session.execute(
+        stmt.limit(per_page).offset((page - 1) * per_page)
+    ).all()
+    if result:
+        return [row[:-1] for row in result], result[0][-1]
+    if page == 1:
+        return [], 0
+    total = db.session.scalar(
+        select(func.count()).select_from(Password).where(*criteria)
+    )
+    return [], total
+
+
+def render_rows_json(rows, fields, cache, dumps):
+    """Tableau JSON (octets) des lignes ; fragments en cache par (id, updated_at, last_used)."""
+    versions = [fields.index(name) for name in ("id", "updated_at", "last_used") if name in fields]
+    keys = [(*(row[i] for i in versions), fields) for row in rows]
+    fragments = [cache.get(key) for key in keys]
+    misses = [i for i, fragment in enumerate(fragments) if fragment is None]
+    if misses:
+        items = serialize_rows([rows[i] for i in misses], fields)
+        for i, item in zip(misses, items):
+            fragments[i] = dumps(item)
+            cache.put(keys[i], fragments[i])
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def list_response(rows, fields, pagination, layout="rows"):
+    """Réponse de liste dans le format négocié.
+
+    JSON en lignes : fragments en cache si possible, sinon `jsonify`.
+    """
+    mimetype = negotiate_format()
+    if mimetype != JSON:
+        body = encode(
+            {
+                "passwords": serialize(rows, fields, layout, timestamp_column(mimetype)),
+                "pagination": pagination,
+            },
+            mimetype,
+        )
+    else:
+        cache = getattr(current_app, "row_fragment_cache", None)
+        if layout != "rows" or cache is None or "updated_at" not in fields:
+            response = jsonify(
+                {"passwords": serialize(rows, fields, layout), "pagination": pagination}
+            )
+            response.vary.add("Accept")
+            return response
+        dumps = current_app.json.dumps_bytes
+        body = b"".join(
+            (
+                b'{"passwords":',
+                render_rows_json(rows, fields, cache, dumps),
+                b',"pagination":',
+                dumps(pagination),
+                b"}",
+            )
+        )
+    response = current_app.response_class(body, mimetype=mimetype)
+    response.vary.add("Accept")
+    return response
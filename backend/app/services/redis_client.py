@@ -7,10 +7,28 @@ session key store (VMK), rate limiting, registre des refresh tokens.
 """
 
 import os
+import time
 
 import redis
 
+from metrics import REDIS_SECONDS
+from server_timing import record
+from tracing import KIND_CLIENT, span
+
 
 def make_redis_client():
     """Construit un client Redis à partir de REDIS_URL (connexion paresseuse)."""
     return redis.from_url(os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+
+
+def timed(operation, call, *args, **kwargs):
+    """Aller-retour Redis chronométré : métrique redis_command_seconds{operation},
+    phase Server-Timing `redis` et span `redis.<operation>`."""
+    start = time.perf_counter()
+    try:
+        with span(f"redis.{operation}", KIND_CLIENT, {"db.system": "redis"}):
+            return call(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        REDIS_SECONDS.labels(operation).observe(elapsed)
+        record("redis", elapsed)
@@ -0,0 +1,188 @@
+"""
+Rapport de sécurité du coffre calculé côté serveur.
+
+- Réutilisation : chaque entrée porte une empreinte HMAC de son mot de passe sous
+  une clé dérivée de la VMK (cf. EncryptionService.derive_fingerprint_key),
+  calculée à l'écriture. Deux entrées partagent un mot de passe ssi elles
+  partagent l'empreinte : `GROUP BY password_fingerprint HAVING count > 1`,
+  servi par l'index (user_id, password_fingerprint).
+- Faiblesse et ancienneté : lues sur les colonnes `password_strength` et
+  `password_changed_at`.
+- Backfill : les entrées antérieures aux empreintes (NULL) sont complétées par
+  lots tant que la session détient la VMK ; le rapport indique la couverture.
+- Audit des fuites : seul cas où le coffre est déchiffré (en session, à la
+  demande), pour confronter chaque entrée au filtre de Bloom hors ligne.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, func, update
+
+from app.models import Password, db
+from app.services.breach_filter import get_breach_filter
+from app.services.encryption_service import EncryptionService
+
+
+def compute_fingerprint(plaintext, vmk):
+    """Empreinte à clé d'un mot de passe en clair, pour l'utilisateur de cette VMK."""
+    return EncryptionService.fingerprint_entry(
+        plaintext, EncryptionService.derive_fingerprint_key(vmk)
+    )
+
+
+def backfill_fingerprints(user_id, vmk, batch_size):
+    """Calculer (sans commit) les empreintes manquantes, au plus `batch_size`.
+
+    Retourne le nombre d'entrées complétées. Une entrée indéchiffrable est
+    laissée à NULL (elle reste signalée dans la couverture du rapport) ; le
+    parcours par id passe au-delà, sans la relire à chaque lot. L'empreinte est
+    une donnée dérivée : UPDATE Core qui conserve `updated_at` (pas de
+    réapparition dans /changes).
+    """
+    key = EncryptionService.derive_fingerprint_key(vmk)
+    table = Password.__table__
+    write = (
+        update(table)
+        .where(table.c.id == bindparam("entry_id"))
+        .values(password_fingerprint=bindparam("fingerprint"), updated_at=table.c.updated_at)
+    )
+    fingerprints, last_id = [], None
+    while len(fingerprints) < batch_size:
+        query = db.session.query(Password.id, Password.encrypted_password).filter(
+            Password.user_id == user_id, Password.password_fingerprint.is_(None)
+        )
+        if last_id is not None:
+            query = query.filter(Password.id > last_id)
+        pending = query.order_by(Password.id).limit(batch_size).all()
+        if not pending:
+            break
+        for row in pending:
+            try:
+                plaintext = EncryptionService.decrypt_entry(
+                    row.encrypted_password, vmk, f"{user_id}:{row.id}".encode()
+                )
+            except ValueError:
+                continue
+            fingerprints.append(
+                {"entry_id": row.id, "fingerprint": EncryptionService.fingerprint_entry(plaintext, key)}
+            )
+            if len(fingerprints) == batch_size:
+                break
+        last_id = pending[-1].id
+    if fingerprints:
+        db.session.execute(write, fingerprints)
+    return len(fingerprints)
+
+
+def _summary(entry):
+    return {"id": entry.id, "site_name": entry.site_name, "username": entry.username}
+
+
+def build_security_report(user_id, max_age_days, now=None):
+    """Assembler le rapport (réutilisation, faiblesse, ancienneté, couverture)."""
+    now = now or datetime.utcnow()
+
+    reused_fingerprints = (
+        db.session.query(Password.password_fingerprint)
+        .filter(
+            Password.user_id == user_id, Password.password_fingerprint.isnot(None)
+        )
+        .group_by(Password.password_fingerprint)
+        .having(func.count(Password.id) > 1)
+    )
+    reused_entries = (
+        Password.query.filter(
+            Password.user_id == user_id,
+            Password.password_fingerprint.in_(reused_fingerprints.scalar_subquery()),
+        )
+        .order_by(Password.password_fingerprint, Password.site_name)
+        .all()
+    )
+    # L'empreinte ne sort jamais du serveur : les groupes sont simplement énumérés.
+    groups = {}
+    for entry in reused_entries:
+        groups.setdefault(entry.password_fingerprint, []).append(_summary(entry))
+    reused = [{"count": len(g), "entries": g} for g in groups.values()]
+
+    weak = (
+        Password.query.filter(
+            Password.user_id == user_id,
+            func.coalesce(Password.password_strength, 1) <= 2,
+        )
+        .order_by(Password.password_strength, Password.site_name)
+        .all()
+    )
+
+    changed_at = func.coalesce(Password.password_changed_at, Password.created_at)
+    old = (
+        Password.query.filter(
+            Password.user_id == user_id,
+            changed_at < now - timedelta(days=max_age_days),
+        )
+        .order_by(changed_at)
+        .all()
+    )
+
+    total, unfingerprinted = (
+        db.session.query(
+            func.count(Password.id),
+            func.count(Password.id) - func.count(Password.password_fingerprint),
+        )
+        .filter(Password.user_id == user_id)
+        .one()
+    )
+
+    return {
+        "total": total,
+        "reused": reused,
+        "reused_count": sum(group["count"] for group in reused),
+        "weak": [
+            dict(_summary(e), password_strength=e.password_strength) for e in weak
+        ],
+        "old": [
+            dict(
+                _summary(e),
+                password_changed_at=(e.password_changed_at or e.created_at).isoformat(),
+            )
+            for e in old
+        ],
+        "max_age_days": max_age_days,
+        "coverage": {"analyzed": total - unfingerprinted, "pending": unfingerprinted},
+        "generated_at": now.isoformat(),
+    }
+
+
+def audit_vault_breaches(user_id, vmk, batch_size=500):
+    """Confronter toutes les entrées du coffre au filtre de fuites (lecture par lots).
+
+    Retourne None si aucun filtre n'est configuré. Les entrées indéchiffrables
+    sont comptées à part, jamais ignorées en silence.
+    """
+    breach_filter = get_breach_filter()
+    if breach_filter is None:
+        return None
+
+    breached, checked, unreadable = [], 0, 0
+    entries = (
+        Password.query.filter(Password.user_id == user_id)
+        .order_by(Password.id)
+        .yield_per(batch_size)
+    )
+    for entry in entries:
+        try:
+            plaintext = EncryptionService.decrypt_entry(
+                entry.encrypted_password, vmk, f"{user_id}:{entry.id}".encode()
+            )
+        except ValueError:
+            unreadable += 1
+            continue
+        checked += 1
+        if plaintext in breach_filter:
+            breached.append(_summary(entry))
+
+    return {
+        "checked": checked,
+        "unreadable": unreadable,
+        "breached": breached,
+        "breached_count": len(breached),
+    }
@@ -17,7 +17,7 @@ la VMK ne touche jamais le disque. Sérialisation : VMK en base64.
 import base64
 import time
 
-from app.services.redis_client import make_redis_client
+from app.services.redis_client import make_redis_client, timed
 
 _SESSION_PREFIX = "session:"
 
@@ -36,6 +36,10 @@ class SessionKeyStore:
     def _key(session_id: str) -> str:
         return _SESSION_PREFIX + session_id
 
+    def _redis(self, command: str, *args, **kwargs):
+        """Commande Redis chronométrée (opération `session_<commande>`)."""
+        return timed("session_" + command, getattr(self._client, command), *args, **kwargs)
+
     def store_session(
         self, session_id: str, vmk: bytes, idle_ttl: int, absolute_ttl: int
     ) -> None:
@@ -46,18 +50,18 @@ class SessionKeyStore:
             raise ValueError("ttl doit être positif")
         deadline = int(time.time()) + absolute_ttl
         value = base64.b64encode(vmk).decode("utf-8") + "|" + str(deadline)
-        self._client.setex(self._key(session_id), min(idle_ttl, absolute_ttl), value)
+        self._redis("setex", self._key(session_id), min(idle_ttl, absolute_ttl), value)
 
     def _get_raw(self, session_id: str):
         """Retourne (vmk_b64, deadline) ou None. Supprime la clé si le plafond absolu est dépassé."""
-        raw = self._client.get(self._key(session_id))
+        raw = self._redis("get", self._key(session_id))
         if not raw:
             return None
         text = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw
         vmk_b64, _, deadline_s = text.partition("|")
         deadline = int(deadline_s)
         if time.time() > deadline:
-            self._client.delete(self._key(session_id))  # plafond absolu atteint
+            self._redis("delete", self._key(session_id))  # plafond absolu atteint
             return None
         return vmk_b64, deadline
 
@@ -68,16 +72,26 @@ class SessionKeyStore:
         return self._get_raw(session_id) is not None
 
     def touch(self, session_id: str, idle_ttl: int) -> bool:
-        """Ré-arme le TTL d'inactivité, borné par le plafond absolu. False si session morte."""
-        raw = self._get_raw(session_id)
-        if raw is None:
+        """Ré-arme le TTL d'inactivité, borné par le plafond absolu. False si session morte.
+
+        Un seul aller-retour sur le chemin chaud : GETEX lit la valeur et ré-arme
+        le TTL d'inactivité en une commande (Redis >= 6.2). Un second appel n'a
+        lieu que dans la dernière fenêtre avant le plafond (TTL raccourci) ou
+        quand le plafond est dépassé (suppression).
+        """
+        if not session_id:
             return False
-        _, deadline = raw
-        remaining = deadline - int(time.time())
+        key = self._key(session_id)
+        raw = self._redis("getex", key, ex=idle_ttl)
+        if not raw:
+            return False
+        text = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw
+        remaining = int(text.partition("|")[2]) - int(time.time())
         if remaining <= 0:
-            self._client.delete(self._key(session_id))
+            self._redis("delete", key)  # plafond absolu atteint
             return False
-        self._client.expire(self._key(session_id), min(idle_ttl, remaining))
+        if remaining < idle_ttl:
+            self._redis("expire", key, remaining)
         return True
 
     def get_vmk(self, session_id: str):
@@ -97,4 +111,4 @@ class SessionKeyStore:
     def evict(self, session_id: str) -> None:
         """Révoquer la session : supprime la clé → VMK évincée, requêtes refusées."""
         if session_id:
-            self._client.delete(self._key(session_id))
+            self._redis("delete", self._key(session_id))
@@ -14,7 +14,7 @@ consommé par une rotation) = signal de vol → l'appelant révoque toute la ses
 
 from redis import exceptions as redis_exceptions
 
-from app.services.redis_client import make_redis_client
+from app.services.redis_client import make_redis_client, timed
 
 _VALID_REFRESH_PREFIX = "valid_refresh:"
 
@@ -31,7 +31,7 @@ class RefreshRegistry:
 
     def register(self, jti: str, session_id: str, ttl_seconds: int) -> None:
         """Enregistrer un jti de refresh comme valide pour la session."""
-        self._client.setex(self._key(jti), ttl_seconds, session_id)
+        timed("refresh_setex", self._client.setex, self._key(jti), ttl_seconds, session_id)
 
     def rotate(self, old_jti: str, new_jti: str) -> bool:
         """Consommer old_jti et publier new_jti ATOMIQUEMENT (RENAME).
@@ -41,7 +41,7 @@ class RefreshRegistry:
         Le new_jti hérite du TTL restant → borné par le plafond de session.
         """
         try:
-            self._client.rename(self._key(old_jti), self._key(new_jti))
+            timed("refresh_rename", self._client.rename, self._key(old_jti), self._key(new_jti))
             return True
         except redis_exceptions.ResponseError:
             # "no such key" : old_jti n'est plus le refresh valide → rejeu
@@ -0,0 +1,144 @@
+"""
+Statistiques du coffre calculées côté serveur (tableau de bord).
+
+Le front ne voyait que la première page de la liste (20 lignes) : ses totaux
+étaient faux dès qu'un coffre grandissait. Ici, UNE seule requête SQL groupée
+par catégorie calcule, par agrégats conditionnels, tout ce dont le tableau de
+bord a besoin (force, favoris, récents, histogrammes d'âge) ; les totaux globaux
+sont la somme des groupes. Aucune donnée chiffrée n'est lue.
+
+Cache : le résultat est mis en cache dans Redis par utilisateur (TTL court,
+les valeurs « récents / âge » dérivent avec le temps) et invalidé à chaque
+écriture du coffre. Une panne Redis n'empêche jamais le calcul.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import case, func
+
+from app.models import Password, db
+from app.services.expiry_service import EXPIRING_PREFIX
+
+logger = logging.getLogger(__name__)
+
+_STATS_PREFIX = "stats:"
+
+# Bornes des histogrammes d'âge, en jours : [0,30[, [30,90[, [90,180[, [180,365[, >= 365
+AGE_BUCKETS = (30, 90, 180, 365)
+RECENT_DAYS = 7
+
+
+def _bucket_labels():
+    bounds = (0,) + AGE_BUCKETS
+    labels = [f"{lo}-{hi}d" for lo, hi in zip(bounds, bounds[1:])]
+    return labels + [f"{AGE_BUCKETS[-1]}d+"]
+
+
+def _age_columns(prefix, column, now):
+    """Un agrégat conditionnel par tranche d'âge de `column`."""
+    cutoffs = [now - timedelta(days=d) for d in AGE_BUCKETS]
+    columns = []
+    newer = None
+    for label, cutoff in zip(_bucket_labels(), cutoffs):
+        cond = column > cutoff if newer is None else (column > cutoff) & (column <= newer)
+        columns.append(func.sum(case((cond, 1), else_=0)).label(f"{prefix}{label}"))
+        newer = cutoff
+    columns.append(
+        func.sum(case((column <= newer, 1), else_=0)).label(
+            f"{prefix}{_bucket_labels()[-1]}"
+        )
+    )
+    return columns
+
+
+def compute_vault_stats(user_id, now=None):
+    """Calculer les statistiques du coffre en une seule requête groupée."""
+    now = now or datetime.utcnow()
+    strength = func.coalesce(Password.password_strength, 1)  # inconnue = faible (cf. front)
+    changed_at = func.coalesce(Password.password_changed_at, Password.created_at)
+
+    rows = (
+        db.session.query(
+            Password.category,
+            func.count(Password.id).label("total"),
+            func.sum(case((strength <= 2, 1), else_=0)).label("weak"),
+            func.sum(case((strength == 3, 1), else_=0)).label("medium"),
+            func.sum(case((strength >= 4, 1), else_=0)).label("strong"),
+            func.sum(case((Password.is_favorite.is_(True), 1), else_=0)).label(
+                "favorites"
+            ),
+            func.sum(
+                case(
+                    (Password.created_at > now - timedelta(days=RECENT_DAYS), 1),
+                    else_=0,
+                )
+            ).label("recently_added"),
+            *_age_columns("password_age_", changed_at, now),
+            *_age_columns("entry_age_", Password.created_at, now),
+        )
+        .filter(Password.user_id == user_id)
+        .group_by(Password.category)
+        .all()
+    )
+
+    stats = {
+        key: 0
+        for key in ("total", "weak", "medium", "strong", "favorites", "recently_added")
+    }
+    histograms = {
+        "password_age": dict.fromkeys(_bucket_labels(), 0),
+        "entry_age": dict.fromkeys(_bucket_labels(), 0),
+    }
+    category_counts = []
+
+    for row in rows:
+        values = row._mapping
+        for key in stats:
+            stats[key] += int(values[key] or 0)
+        for name, histogram in histograms.items():
+            for label in histogram:
+                histogram[label] += int(values[f"{name}_{label}"] or 0)
+        if row.category:
+            category_counts.append({"category": row.category, "count": row.total})
+
+    category_counts.sort(key=lambda c: (-c["count"], c["category"]))
+    stats.update(histograms)
+    stats["categories"] = len(category_counts)
+    stats["category_counts"] = category_counts
+    stats["generated_at"] = now.isoformat()
+    return stats
+
+
+def _redis():
+    return current_app.redis
+
+
+def get_vault_stats(user_id):
+    """Statistiques depuis le cache Redis, ou calculées puis mises en cache."""
+    key = _STATS_PREFIX + user_id
+    try:
+        cached = _redis().get(key)
+        if cached:
+            return json.loads(cached)
+    except Exception as e:
+        logger.warning("Stats cache read failed: %s", type(e).__name__)
+
+    stats = compute_vault_stats(user_id)
+    try:
+        _redis().setex(
+            key, current_app.config["STATS_CACHE_TTL_SECONDS"], json.dumps(stats)
+        )
+    except Exception as e:
+        logger.warning("Stats cache write failed: %s", type(e).__name__)
+    return stats
+
+
+def invalidate_vault_caches(user_id):
+    """Invalider les agrégats mis en cache après une écriture du coffre (best-effort)."""
+    try:
+        _redis().delete(_STATS_PREFIX + str(user_id), EXPIRING_PREFIX + str(user_id))
+    except Exception as e:
+        logger.warning("Stats cache invalidation failed: %s", type(e).__name__)
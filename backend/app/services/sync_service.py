@@ -0,0 +1,164 @@
+"""
+Synchronisation delta multi-appareils (« qu'est-ce qui a changé depuis T ? »).
+
+Modèle :
+- Le jeton de synchronisation est un CURSEUR de keyset opaque `(horodatage, id)`.
+  Entrées modifiées (`passwords.updated_at`) et suppressions
+  (`password_tombstones.deleted_at`) sont fusionnées sur cet ordre total : le
+  jeton renvoyé ne recule jamais (monotone) et aucune ligne n'est sautée entre
+  deux pages, même à horodatage égal. Un id vide (`(T, "")`) désigne « avant
+  toute ligne à T » : pas de comparaison d'id (colonne UUID sous PostgreSQL).
+- Dernière page (`has_more` faux) : le curseur avance jusqu'à « maintenant »,
+  même sans changement ; un coffre inactif ne garde pas un curseur ancien.
+- Le jeton porte aussi son FILIGRANE : l'instant (serveur) depuis lequel l'état
+  du client est complet. Fixé à la fin d'une synchronisation, conservé de page
+  en page (une synchronisation complète part de son propre début).
+- Chaque flux est lu par l'index (user_id, horodatage) avec `LIMIT page+1` :
+  le coût d'un appel est proportionnel au delta, pas à la taille du coffre.
+- Seuls les changements de CONTENU avancent `updated_at` : la lecture d'un mot
+  de passe (last_used, backfill de chiffrement) le conserve.
+- Limite : l'horodatage est pris à l'horloge de l'application, pas dans l'ordre
+  des COMMIT. Une transaction qui committe après qu'un client a synchronisé
+  au-delà de son horodatage (écriture concurrente lente) n'est pas revue par ce
+  client avant la modification suivante de l'entrée. Le risque est borné à la
+  durée d'une transaction d'écriture (une requête) ; une resynchronisation
+  complète (`since` absent) le lève.
+- Compaction : les tombstones plus vieux que la rétention sont purgés. Un jeton
+  dont le filigrane précède cet horizon ne peut plus garantir de voir toutes les
+  suppressions → SyncTokenExpiredError (→ 410) : le client refait une
+  synchronisation complète. C'est l'âge de la dernière synchronisation qui
+  compte, pas celui du dernier changement du coffre.
+"""
+
+import base64
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+
+from app.models import Password, PasswordTombstone, db
+from app.services.timestamps import to_naive_utc
+
+_TOKEN_VERSION = "v2"
+_LEGACY_TOKEN_VERSION = "v1"  # sans filigrane : celui-ci vaut le curseur
+_EPOCH = datetime(1970, 1, 1)
+
+# Curseur initial : avant toute ligne (synchronisation complète)
+INITIAL_CURSOR = (_EPOCH, "")
+
+
+class SyncTokenExpiredError(Exception):
+    """Jeton antérieur à l'horizon de compaction des tombstones (→ 410)."""
+
+
+def _micros(value: datetime) -> int:
+    delta = to_naive_utc(value) - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 10**6 + delta.microseconds
+
+
+def encode_sync_token(cursor, watermark) -> str:
+    """Encoder un curseur (horodatage, id) et son filigrane en jeton opaque URL-safe."""
+    ts, last_id = cursor
+    raw = f"{_TOKEN_VERSION}:{_micros(ts)}:{_micros(watermark)}:{last_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_sync_token(token: str):
+    """Décoder un jeton en (curseur, filigrane) ; lève ValueError s'il est malformé (→ 400)."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        version, rest = raw.split(":", 1)
+        if version == _TOKEN_VERSION:
+            micros, watermark, last_id = rest.split(":", 2)
+        elif version == _LEGACY_TOKEN_VERSION:
+            micros, last_id = rest.split(":", 1)
+            watermark = micros
+        else:
+            raise ValueError(version)
+        cursor = (_EPOCH + timedelta(microseconds=int(micros)), last_id)
+        return cursor, _EPOCH + timedelta(microseconds=int(watermark))
+    except Exception:
+        raise ValueError("Invalid sync token")
+
+
+def _after(column, id_column, cursor):
+    """Prédicat keyset `(column, id) > cursor`, portable (PostgreSQL et SQLite).
+
+    Sans id (`(T, "")`, curseur initial ou avancé à « maintenant ») : `column >= T`,
+    sans comparer l'id à une chaîne vide (invalide pour une colonne UUID).
+    """
+    ts, last_id = cursor
+    if not last_id:
+        return column >= ts
+    return or_(column > ts, and_(column == ts, id_column > last_id))
+
+
+def collect_changes(user_id, cursor, limit, retention_days, watermark=None):
+    """Entrées créées/modifiées et tombstones postérieurs au curseur, fusionnés.
+
+    `watermark` : filigrane du jeton (None pour une synchronisation complète).
+    Retourne (updated, deleted, next_cursor, next_watermark, has_more).
+    `updated` contient des instances Password, `deleted` des PasswordTombstone,
+    chacun dans l'ordre du curseur. Lève SyncTokenExpiredError si le filigrane
+    précède l'horizon de compaction (des suppressions ont pu être oubliées).
+    """
+    now = datetime.utcnow()
+    horizon = now - timedelta(days=retention_days)
+    if watermark is not None and watermark < horizon:
+        raise SyncTokenExpiredError(
+            "Sync token is older than the tombstone retention; full resync required"
+        )
+
+    entries = (
+        Password.query.filter(
+            Password.user_id == user_id,
+            _after(Password.updated_at, Password.id, cursor),
+        )
+        .order_by(Password.updated_at, Password.id)
+        .limit(limit + 1)
+        .all()
+    )
+    tombstones = (
+        PasswordTombstone.query.filter(
+            PasswordTombstone.user_id == user_id,
+            _after(PasswordTombstone.deleted_at, PasswordTombstone.id, cursor),
+        )
+        .order_by(PasswordTombstone.deleted_at, PasswordTombstone.id)
+        .limit(limit + 1)
+        .all()
+    )
+
+    merged = sorted(
+        [(to_naive_utc(e.updated_at), e.id, e) for e in entries]
+        + [(to_naive_utc(t.deleted_at), t.id, t) for t in tombstones],
+        key=lambda item: (item[0], item[1]),
+    )
+    page, has_more = merged[:limit], len(merged) > limit
+
+    updated = [obj for _, _, obj in page if isinstance(obj, Password)]
+    deleted = [obj for _, _, obj in page if isinstance(obj, PasswordTombstone)]
+    next_cursor = (page[-1][0], page[-1][1]) if page else cursor
+    if has_more:
+        # Pages suivantes : même filigrane (une synchronisation complète part de `now`)
+        return updated, deleted, next_cursor, watermark or now, has_more
+    # Tout est lu jusqu'à `now` : curseur et filigrane y avancent (jamais en arrière)
+    if next_cursor[0] < now:
+        next_cursor = (now, "")
+    return updated, deleted, next_cursor, now, has_more
+
+
+def record_tombstone(user_id, entry_id):
+    """Ajouter (sans commit) le tombstone d'une entrée supprimée à la session."""
+    db.session.merge(
+        PasswordTombstone(id=entry_id, user_id=user_id, deleted_at=datetime.utcnow())
+    )
+
+
+def compact_tombstones(retention_days) -> int:
+    """Purger les tombstones plus vieux que la rétention ; retourne le nombre supprimé."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    removed = PasswordTombstone.query.filter(
+        PasswordTombstone.deleted_at < cutoff
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return removed
@@ -0,0 +1,15 @@
+"""
+Horodatages : les colonnes DateTime stockent de l'UTC naïf, mais PostgreSQL
+renvoie les colonnes `TIMESTAMP WITH TIME ZONE` (expires_at, updated_at...)
+en datetime « aware ». Toute comparaison ou soustraction passe par
+`to_naive_utc`.
+"""
+
+from datetime import datetime, timezone
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Normalise un horodatage en UTC naïf (format stocké par les colonnes DateTime)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
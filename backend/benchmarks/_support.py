@@ -0,0 +1,109 @@
+"""
+Outillage partagé des microbenchmarks (exécutables hors ligne, sans pytest).
+
+Charge `app.py` comme le fait tests/conftest.py (le package `app/` masque le
+module), construit une app de test (SQLite en mémoire, fakeredis) et un coffre
+synthétique de N entrées. Exécution depuis backend/ :
+
+    python -m benchmarks.bench_list_projection
+"""
+
+import importlib.util
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("ARGON2_MEMORY_KIB", "8192")
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+os.environ.setdefault("ARGON2_PARALLELISM", "1")
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
+
+
+def load_app_entry():
+    if "app_entry" not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            "app_entry", os.path.join(_BACKEND_DIR, "app.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["app_entry"] = module
+        spec.loader.exec_module(module)
+    return sys.modules["app_entry"]
+
+
+def make_app():
+    """App de test avec Redis simulé (à utiliser dans `with app.app_context()`)."""
+    import fakeredis
+
+    from app.services.session_key_store import SessionKeyStore
+    from app.services.session_service import RefreshRegistry
+    from rate_limiter import RateLimiter
+
+    app = load_app_entry().create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    return app
+
+
+def seed_vault(num_entries, email="bench@example.com"):
+    """Créer un utilisateur et N entrées réalistes (notes, blob chiffré factice)."""
+    from app.models import Password, User, db
+    from app.services.encryption_service import EncryptionService
+    from tests.passwords import STRONG_TEST_PASSWORD
+
+    user = User(email=email, username="bench")
+    user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+        STRONG_TEST_PASSWORD
+    )
+    db.session.add(user)
+    db.session.flush()
+    now = datetime.utcnow()
+    db.session.bulk_insert_mappings(
+        Password,
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user.id,
+                "site_name": f"Site {i}",
+                "site_url": f"https://login.site{i}.example.com/signin",
+                "site_domain": "example.com",
+                "username": f"user{i}@example.com",
+                "email": f"user{i}@example.com",
+                "encrypted_password": "v1:" + "A" * 120,
+                "category": ("Pro", "Perso", "Social")[i % 3],
+                "tags": "a,b,c",
+                "notes": "Lorem ipsum dolor sit amet. " * 20,
+                "password_strength": i % 5 + 1,
+                "created_at": now - timedelta(days=i),
+                "updated_at": now - timedelta(hours=i),
+                "last_used": now - timedelta(minutes=i),
+                "password_changed_at": now - timedelta(days=i),
+            }
+            for i in range(num_entries)
+        ],
+    )
+    db.session.commit()
+    return user
+
+
+def bench(fn, repeat=200, warmup=20):
+    """Temps par appel (ms) : médiane et p95."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95)], 3),
+    }
@@ -0,0 +1,74 @@
+"""
+Microbenchmark : JSON vs MessagePack vs CBOR, en lignes et en colonnes, sur un
+lot de synchronisation de N entrées (1000 par défaut). Mesure le temps
+d'encodage (sérialisation des lignes comprise), la taille de la charge utile
+(brute et gzip) et le temps de décodage côté client.
+
+    python -m benchmarks.bench_binary_formats [--rows 1000]
+"""
+
+import argparse
+import gzip
+import json
+
+from benchmarks._support import bench, make_app, seed_vault
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    from content_negotiation import CBOR, MSGPACK, decode, encode, timestamp_column
+
+    app = make_app()
+    results = {}
+    with app.app_context():
+        from app.models import Password, db
+        from app.services.projection import LIST_FIELDS, fetch_page_rows, serialize
+
+        db.create_all()
+        user = seed_vault(args.rows)
+        rows, _ = fetch_page_rows(
+            [Password.user_id == user.id], Password.updated_at, 1, args.rows, LIST_FIELDS
+        )
+        dumps, loads = app.json.dumps_bytes, app.json.loads
+
+        for layout in ("rows", "columnar"):
+            codecs = {
+                "json": (
+                    lambda: dumps({"passwords": serialize(rows, LIST_FIELDS, layout)}),
+                    loads,
+                ),
+                "json_stdlib_decode": (
+                    lambda: dumps({"passwords": serialize(rows, LIST_FIELDS, layout)}),
+                    json.loads,
+                ),
+            }
+            for name, mimetype in (("msgpack", MSGPACK), ("cbor", CBOR)):
+                codecs[name] = (
+                    lambda mimetype=mimetype: encode(
+                        {
+                            "passwords": serialize(
+                                rows, LIST_FIELDS, layout, timestamp_column(mimetype)
+                            )
+                        },
+                        mimetype,
+                    ),
+                    lambda data, mimetype=mimetype: decode(data, mimetype),
+                )
+
+            for name, (encoder, decoder) in codecs.items():
+                payload = encoder()
+                results[f"{name}_{layout}"] = {
+                    "encode_ms": bench(encoder, args.repeat, 5)["median_ms"],
+                    "decode_ms": bench(lambda: decoder(payload), args.repeat, 5)["median_ms"],
+                    "bytes": len(payload),
+                    "gzip_bytes": len(gzip.compress(payload, 6)),
+                }
+    print(json.dumps({"rows": args.rows, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Microbenchmark : coût CPU et gain de bande passante de la compression des
+réponses de liste aux tailles de page usuelles (20, 50, 100 entrées), pour
+gzip (niveaux 1, 6, 9) et brotli (qualités 1, 4, 6 si le module est installé).
+
+`transfer_saved_ms` : temps de transfert économisé sur un lien à --mbps
+(10 Mbit/s par défaut, mobile moyen) ; à comparer à `cpu_ms`.
+
+    python -m benchmarks.bench_compression [--pages 20,50,100] [--mbps 10]
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks._support import make_app, seed_vault
+
+
+def cpu_per_call(fn, repeat):
+    for _ in range(5):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time_ns()
+        fn()
+        samples.append(time.process_time_ns() - start)
+    samples.sort()
+    return round(samples[len(samples) // 2] / 1e6, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", default="20,50,100")
+    parser.add_argument("--mbps", type=float, default=10.0)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    page_sizes = [int(size) for size in args.pages.split(",")]
+
+    import compression
+
+    variants = {f"gzip_{level}": ("gzip", {"COMPRESSION_LEVEL": level}) for level in (1, 6, 9)}
+    if compression.brotli is not None:
+        variants.update(
+            {f"br_{quality}": ("br", {"BROTLI_QUALITY": quality}) for quality in (1, 4, 6)}
+        )
+
+    app = make_app()
+    results = {}
+    with app.app_context():
+        from app.models import Password, db
+        from app.services.projection import LIST_FIELDS, fetch_page_rows, list_response
+
+        db.create_all()
+        user = seed_vault(max(page_sizes))
+        with app.test_request_context():
+            for size in page_sizes:
+                rows, total = fetch_page_rows(
+                    [Password.user_id == user.id], Password.updated_at.desc(), 1, size, LIST_FIELDS
+                )
+                pagination = {"page": 1, "pages": 1, "per_page": size, "total": total}
+                body = list_response(rows, LIST_FIELDS, pagination).get_data()
+
+                page = {"raw_bytes": len(body)}
+                for name, (encoding, config) in variants.items():
+                    compressed = compression.compress(body, encoding, config)
+                    saved_bits = (len(body) - len(compressed)) * 8
+                    page[name] = {
+                        "bytes": len(compressed),
+                        "ratio": round(len(body) / len(compressed), 2),
+                        "cpu_ms": cpu_per_call(
+                            lambda: compression.compress(body, encoding, config), args.repeat
+                        ),
+                        "transfer_saved_ms": round(saved_bits / (args.mbps * 1e3), 2),
+                    }
+                results[f"{size}_rows"] = page
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
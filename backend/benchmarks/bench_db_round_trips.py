@@ -0,0 +1,112 @@
+"""
+Comptage des allers-retours base de données par endpoint : requêtes SQL,
+COMMIT, ROLLBACK et SAVEPOINT émis pendant un appel HTTP. Sur PostgreSQL,
+chaque transaction coûte en plus un BEGIN implicite du pilote (compté ici
+avec les transactions ouvertes).
+
+    python -m benchmarks.bench_db_round_trips
+"""
+
+import json
+from collections import Counter
+
+from sqlalchemy import event
+
+from benchmarks._support import make_app
+
+
+class RoundTripCounter:
+    """Compteurs d'événements de la connexion (requêtes, transactions)."""
+
+    # SAVEPOINT/RELEASE passent par le curseur : déjà comptés en requêtes
+    EVENTS = ("begin", "commit", "rollback")
+
+    def __init__(self, engine):
+        self.counts = Counter()
+        event.listen(engine, "before_cursor_execute", self._on_statement)
+        for name in self.EVENTS:
+            event.listen(engine, name, self._make_listener(name))
+
+    def _on_statement(self, *args):
+        self.counts["statements"] += 1
+
+    def _make_listener(self, name):
+        def listener(*args):
+            self.counts[name] += 1
+
+        return listener
+
+    def measure(self, fn):
+        self.counts.clear()
+        fn()
+        counts = dict(self.counts)
+        counts["round_trips"] = sum(self.counts.values())
+        return counts
+
+
+def main():
+    from app.models import db
+    from tests.passwords import STRONG_TEST_PASSWORD
+
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        counter = RoundTripCounter(db.engine)
+        credentials = {"email": "rt@example.com", "password": STRONG_TEST_PASSWORD}
+        state = {}
+
+        def register():
+            r = client.post("/api/auth/register", json=dict(credentials, username="rt"))
+            assert r.status_code == 201, r.data
+
+        def login():
+            r = client.post("/api/auth/login", json=credentials)
+            state["auth"] = {
+                "Authorization": f"Bearer {r.get_json()['tokens']['access_token']}"
+            }
+
+        def login_failed():
+            client.post("/api/auth/login", json=dict(credentials, password="wrong-password"))
+
+        def create():
+            r = client.post(
+                "/api/passwords/",
+                headers=state["auth"],
+                json={"site_name": "s", "username": "u", "password": "Xq9#Lm2$Tz7!"},
+            )
+            state["entry"] = r.get_json()["password"]["id"]
+
+        def get():
+            client.get(f"/api/passwords/{state['entry']}", headers=state["auth"])
+
+        def update():
+            client.put(
+                f"/api/passwords/{state['entry']}",
+                headers=state["auth"],
+                json={"site_name": "renamed"},
+            )
+
+        def listing():
+            client.get("/api/passwords/", headers=state["auth"])
+
+        def delete():
+            client.delete(f"/api/passwords/{state['entry']}", headers=state["auth"])
+
+        results = {}
+        for name, fn in [
+            ("POST /auth/register", register),
+            ("POST /auth/login (fail)", login_failed),
+            ("POST /auth/login", login),
+            ("POST /passwords/", create),
+            ("GET /passwords/<id>", get),
+            ("PUT /passwords/<id>", update),
+            ("GET /passwords/", listing),
+            ("DELETE /passwords/<id>", delete),
+        ]:
+            results[name] = counter.measure(fn)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
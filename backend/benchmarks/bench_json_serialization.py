@@ -0,0 +1,83 @@
+"""
+Microbenchmark : réponse de liste de 100 entrées sérialisée par le fournisseur
+JSON stdlib de Flask, par orjson, et par orjson avec le cache de fragments de
+lignes (chaud). Mesure le temps CPU et le pic d'allocation par réponse.
+
+    python -m benchmarks.bench_json_serialization [--rows 100]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks._support import make_app, seed_vault
+
+
+def cpu_per_call(fn, repeat):
+    for _ in range(20):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time_ns()
+        fn()
+        samples.append(time.process_time_ns() - start)
+    samples.sort()
+    return round(samples[len(samples) // 2] / 1e6, 3)
+
+
+def peak_allocation_kib(fn):
+    """Pic de mémoire allouée (Kio) pendant un appel."""
+    fn()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    from json_provider import OrjsonProvider, RowFragmentCache
+
+    app = make_app()
+    with app.app_context():
+        from app.models import Password, db
+        from app.services.projection import LIST_FIELDS, fetch_page_rows, list_response
+
+        db.create_all()
+        user = seed_vault(args.rows)
+        rows, total = fetch_page_rows(
+            [Password.user_id == user.id], Password.updated_at.desc(), 1, args.rows, LIST_FIELDS
+        )
+        pagination = {"page": 1, "pages": 1, "per_page": args.rows, "total": total}
+
+        variants = {
+            "stdlib": (DefaultJSONProvider(app), None),
+            "orjson": (OrjsonProvider(app), None),
+            "orjson_row_cache": (OrjsonProvider(app), RowFragmentCache(10 * args.rows)),
+        }
+        results = {}
+        with app.test_request_context():
+            for name, (provider, cache) in variants.items():
+                app.json, app.row_fragment_cache = provider, cache
+
+                def render():
+                    return list_response(rows, LIST_FIELDS, pagination).get_data()
+
+                results[name] = {
+                    "cpu_ms": cpu_per_call(render, args.repeat),
+                    "alloc_peak_kib": peak_allocation_kib(render),
+                    "bytes": len(render()),
+                }
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Microbenchmark : page de liste ORM (`Password.query` + `to_dict()` + `jsonify`)
+contre le chemin de la route (`fetch_page_rows` + `list_response`), pour des
+pages de 20 et 100 entrées. `projection` utilise le cache de fragments de l'app
+(chaud après le premier appel, comme en production) ; `projection_no_cache`
+le désactive.
+
+    python -m benchmarks.bench_list_projection [--entries 2000]
+"""
+
+import argparse
+import json
+
+from flask import jsonify
+
+from benchmarks._support import bench, make_app, seed_vault
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        from app.models import Password, db
+        from app.services.projection import LIST_FIELDS, fetch_page_rows, list_response
+
+        db.create_all()
+        user = seed_vault(args.entries)
+        criteria = [Password.user_id == user.id]
+        order = Password.updated_at.desc()
+        fragment_cache = app.row_fragment_cache
+
+        results = {}
+        with app.test_request_context("/api/passwords/"):
+            for per_page in (20, 100):
+
+                def orm_page():
+                    page = (
+                        Password.query.filter(*criteria)
+                        .order_by(order)
+                        .paginate(page=1, per_page=per_page, error_out=False)
+                    )
+                    body = jsonify(
+                        {
+                            "passwords": [entry.to_dict() for entry in page.items],
+                            "pagination": {"page": 1, "total": page.total},
+                        }
+                    ).get_data()
+                    db.session.expunge_all()  # comme en fin de requête
+                    return body
+
+                def projected_page(fields=LIST_FIELDS):
+                    rows, total = fetch_page_rows(criteria, order, 1, per_page, fields)
+                    return list_response(rows, fields, {"page": 1, "total": total}).get_data()
+
+                def uncached_page():
+                    app.row_fragment_cache = None
+                    try:
+                        return projected_page()
+                    finally:
+                        app.row_fragment_cache = fragment_cache
+
+                results[f"page_{per_page}"] = {
+                    "orm": bench(orm_page, args.repeat),
+                    "projection": bench(projected_page, args.repeat),
+                    "projection_no_cache": bench(uncached_page, args.repeat),
+                    "projection_sparse": bench(
+                        lambda: projected_page(("id", "site_name", "username", "updated_at")),
+                        args.repeat,
+                    ),
+                }
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
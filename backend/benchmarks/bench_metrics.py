@@ -0,0 +1,78 @@
+"""
+Microbenchmark : surcoût de l'instrumentation Prometheus. Coût unitaire d'une
+observation d'histogramme et d'un incrément de compteur, puis latence d'une
+requête authentifiée légère (GET /api/auth/me) avec et sans minuteur de
+requête (METRICS_ENABLED). Les métriques des services restent actives dans
+les deux cas : elles coûtent quelques observations par requête.
+
+    python -m benchmarks.bench_metrics [--repeat 2000]
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks._support import bench, load_app_entry, make_app
+
+
+def per_call_ns(fn, repeat):
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter_ns() - start) / repeat)
+
+
+def request_latency(metrics_enabled, repeat):
+    from app.models import User, db
+    from app.services.encryption_service import EncryptionService
+    from tests.passwords import STRONG_TEST_PASSWORD
+
+    config = load_app_entry().config["testing"]
+    previous = config.METRICS_ENABLED
+    config.METRICS_ENABLED = metrics_enabled
+    try:
+        app = make_app()
+    finally:
+        config.METRICS_ENABLED = previous
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        user = User(email="bench@example.com", username="bench")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        r = client.post(
+            "/api/auth/login",
+            json={"email": "bench@example.com", "password": STRONG_TEST_PASSWORD},
+        )
+        auth = {"Authorization": f"Bearer {r.get_json()['tokens']['access_token']}"}
+        result = bench(lambda: client.get("/api/auth/me", headers=auth), repeat, 50)
+        db.drop_all()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    import metrics
+
+    histogram = metrics.REQUEST_SECONDS.labels("GET", "/bench", "200")
+    results = {
+        "histogram_observe_ns": per_call_ns(lambda: histogram.observe(0.001), 100_000),
+        "histogram_labels_observe_ns": per_call_ns(
+            lambda: metrics.REQUEST_SECONDS.labels("GET", "/bench", "200").observe(0.001),
+            100_000,
+        ),
+        "counter_inc_ns": per_call_ns(metrics.AES_GCM_ENCRYPT.inc, 100_000),
+        "request_with_timer": request_latency(True, args.repeat),
+        "request_without_timer": request_latency(False, args.repeat),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
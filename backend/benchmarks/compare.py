@@ -0,0 +1,142 @@
+"""
+Comparaison de la suite pytest-benchmark avec la baseline enregistrée.
+
+Lance la suite (ou lit un résultat `--benchmark-json` existant), compare le
+temps de chaque benchmark à celui de benchmarks/baselines/hot_paths.json et
+échoue (code 1) si l'un régresse de plus du seuil. Statistique comparée : le
+minimum par défaut (le moins sensible aux interruptions de la machine pour des
+mesures de quelques microsecondes), ou la médiane (--stat median). Hors
+ligne, depuis backend/ :
+
+    python -m benchmarks.compare                   # exécuter puis comparer
+    python -m benchmarks.compare resultat.json     # comparer un résultat existant
+    python -m benchmarks.compare --save            # exécuter puis remplacer la baseline
+
+La baseline n'a de sens que sur la machine (ou la classe de machine) qui l'a
+produite : la régénérer avec --save après un changement de matériel.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+_BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(_BENCHMARKS_DIR, "baselines", "hot_paths.json")
+# Mesures stables : davantage de tours, GC désactivé pendant les mesures
+PYTEST_OPTIONS = (
+    "--benchmark-min-rounds=20", "--benchmark-disable-gc", "-q", "-p", "no:cacheprovider"
+)
+STATS = ("min", "median")
+
+
+def run_suite():
+    """Exécuter la suite et renvoyer le document JSON de pytest-benchmark."""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "results.json")
+        subprocess.run(
+            [sys.executable, "-m", "pytest", _BENCHMARKS_DIR, *PYTEST_OPTIONS,
+             f"--benchmark-json={output}"],
+            cwd=os.path.dirname(_BENCHMARKS_DIR),
+            check=True,
+        )
+        with open(output, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def timings(results, stat):
+    """{nom: statistique en secondes} depuis un document pytest-benchmark."""
+    return {bench["name"]: bench["stats"][stat] for bench in results["benchmarks"]}
+
+
+def compare(baseline, current, threshold, min_delta):
+    """Lignes (nom, baseline, actuel, ratio, statut) et liste des régressions.
+
+    Une régression dépasse à la fois le seuil relatif et l'écart absolu
+    minimal (bruit de mesure des benchmarks de l'ordre de la microseconde).
+    """
+    rows, regressions = [], []
+    for name in sorted(set(baseline) | set(current)):
+        before, after = baseline.get(name), current.get(name)
+        if before is None or after is None:
+            rows.append((name, before, after, None, "nouveau" if before is None else "absent"))
+            continue
+        ratio = after / before
+        if ratio > 1 + threshold and after - before > min_delta:
+            status = "RÉGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold and before - after > min_delta:
+            status = "amélioration"
+        else:
+            status = "ok"
+        rows.append((name, before, after, ratio, status))
+    return rows, regressions
+
+
+def _us(seconds):
+    return "-" if seconds is None else f"{seconds * 1e6:,.1f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "results", nargs="?", help="résultat --benchmark-json (sinon : exécuter la suite)"
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--stat", choices=STATS, default="min")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="régression relative tolérée (0.25 = +25 %%)"
+    )
+    parser.add_argument("--min-delta-us", type=float, default=1.0, help="écart absolu minimal (µs)")
+    parser.add_argument("--save", action="store_true", help="remplacer la baseline par ce résultat")
+    args = parser.parse_args(argv)
+
+    if args.results:
+        with open(args.results, encoding="utf-8") as f:
+            results = json.load(f)
+    else:
+        results = run_suite()
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        baseline_doc = {
+            "machine": f"{platform.machine()} {platform.processor() or platform.system()}",
+            "python": platform.python_version(),
+        }
+        for stat in STATS:
+            baseline_doc[f"{stat}_seconds"] = timings(results, stat)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline_doc, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline enregistrée : {args.baseline} ({len(results['benchmarks'])} benchmarks)")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Baseline absente ({args.baseline}) : lancer d'abord avec --save", file=sys.stderr)
+        return 2
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)[f"{args.stat}_seconds"]
+    current = timings(results, args.stat)
+
+    rows, regressions = compare(baseline, current, args.threshold, args.min_delta_us / 1e6)
+    width = max(len(row[0]) for row in rows)
+    print(
+        f"{'benchmark':<{width}}  {'baseline µs':>12}  {'actuel µs':>12}  {'ratio':>6}"
+        f"  statut ({args.stat})"
+    )
+    for name, before, after, ratio, status in rows:
+        ratio_text = "-" if ratio is None else f"{ratio:.2f}"
+        print(f"{name:<{width}}  {_us(before):>12}  {_us(after):>12}  {ratio_text:>6}  {status}")
+    if regressions:
+        print(
+            f"\n{len(regressions)} régression(s) au-delà de +{args.threshold:.0%}", file=sys.stderr
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+Fixtures de la suite pytest-benchmark (chemins chauds).
+
+Entrées déterministes (VMK, AAD, textes fixes) pour des mesures comparables
+d'une exécution à l'autre. La suite est ignorée si pytest-benchmark n'est pas
+installé ; elle n'est pas lancée par `python -m pytest` (testpaths = tests) :
+
+    python -m pytest benchmarks
+    python -m benchmarks.compare
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks._support import make_app  # noqa: E402  (Argon2 réduit, app_entry)
+
+VMK = bytes(range(32))
+AAD = b"4f1c2e8a-user:9b7d3a10-entry"
+PLAINTEXT = "correct-horse-battery-staple-42!"
+
+
+@pytest.fixture(scope="module")
+def app():
+    from extensions import db
+
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
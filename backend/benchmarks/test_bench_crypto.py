@@ -0,0 +1,43 @@
+"""
+Chiffrement des entrées : AES-256-GCM avec la VMK, et chemins de repli du
+déchiffrement (blob v1 sans AAD, format v0 legacy, v0 dont le nonce commence
+par l'octet de version : deux essais v1 perdus avant le repli).
+"""
+
+import base64
+
+import pytest
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.services.encryption_service import EncryptionService
+from benchmarks.conftest import AAD, PLAINTEXT, VMK
+
+
+def _v0_blob(first_nonce_byte):
+    nonce = bytes([first_nonce_byte]) + bytes(range(1, 12))
+    return base64.b64encode(nonce + AESGCM(VMK).encrypt(nonce, PLAINTEXT.encode(), None)).decode()
+
+
+FALLBACK_BLOBS = {
+    "v1_aad": lambda: EncryptionService.encrypt_entry(PLAINTEXT, VMK, AAD),
+    "v1_without_aad": lambda: EncryptionService.encrypt_entry(PLAINTEXT, VMK, None),
+    "v0_legacy": lambda: _v0_blob(0x02),
+    "v0_version_byte_nonce": lambda: _v0_blob(EncryptionService.AEAD_VERSION_V1),
+}
+
+
+def test_encrypt_entry(benchmark):
+    token = benchmark(EncryptionService.encrypt_entry, PLAINTEXT, VMK, AAD)
+    assert EncryptionService.decrypt_entry(token, VMK, AAD) == PLAINTEXT
+
+
+def test_decrypt_entry(benchmark):
+    token = EncryptionService.encrypt_entry(PLAINTEXT, VMK, AAD)
+    assert benchmark(EncryptionService.decrypt_entry, token, VMK, AAD) == PLAINTEXT
+
+
+@pytest.mark.parametrize("case", list(FALLBACK_BLOBS))
+def test_aesgcm_decrypt_fallback(benchmark, case):
+    token = FALLBACK_BLOBS[case]()
+    plaintext = benchmark(EncryptionService._aesgcm_decrypt, VMK, token, AAD)
+    assert plaintext == PLAINTEXT.encode()
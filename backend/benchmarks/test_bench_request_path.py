@@ -0,0 +1,60 @@
+"""
+Chemin de chaque requête authentifiée : rate limiting (fakeredis), TTL de
+session glissant, sérialisation d'une entrée.
+"""
+
+from datetime import datetime, timedelta
+
+from app.models import Password
+from benchmarks.conftest import VMK
+
+ENTRY_PATH = "/api/passwords/3f2a9c1e-7b4d-4e8a-9c21-5d6e7f809a1b/reveal?fields=password"
+NOW = datetime(2026, 1, 15, 12, 0, 0)
+
+
+def test_normalize_endpoint(benchmark, app):
+    normalized = benchmark(app.rate_limiter._normalize_endpoint, ENTRY_PATH)
+    assert normalized == "/api/passwords/*/reveal"
+
+
+def test_rate_limiter_is_allowed(benchmark, app):
+    limiter = app.rate_limiter
+    # Limite hors d'atteinte : on mesure le chemin « autorisé », jamais le blocage
+    limiter.limits = {"default": {"requests": 10**9, "window": 60, "block_duration": 60}}
+    with app.test_request_context("/api/passwords/", environ_base={"REMOTE_ADDR": "10.0.0.8"}):
+        from flask import request
+
+        allowed, _ = benchmark(limiter.is_allowed, request)
+    assert allowed
+
+
+def test_session_touch(benchmark, app):
+    store = app.session_key_store
+    store.store_session("bench-session", VMK, idle_ttl=900, absolute_ttl=3600)
+    assert benchmark(store.touch, "bench-session", 900)
+
+
+def test_password_to_dict(benchmark):
+    entry = Password(
+        id="9b7d3a10-1c2d-4e5f-8a9b-0c1d2e3f4a5b",
+        user_id="4f1c2e8a-0b1c-4d2e-9f3a-4b5c6d7e8f90",
+        site_name="Exemple",
+        site_url="https://login.example.com/signin",
+        username="alice",
+        email="alice@example.com",
+        encrypted_password="v1:" + "A" * 120,
+        category="Pro",
+        tags="travail,sso,2fa",
+        notes="Lorem ipsum dolor sit amet. " * 20,
+        is_favorite=True,
+        priority=2,
+        password_strength=4,
+        requires_2fa=True,
+        created_at=NOW - timedelta(days=30),
+        updated_at=NOW - timedelta(days=1),
+        last_used=NOW,
+        password_changed_at=NOW - timedelta(days=30),
+        expires_at=NOW + timedelta(days=60),
+    )
+    data = benchmark(entry.to_dict)
+    assert data["tags"] == ["travail", "sso", "2fa"]
@@ -0,0 +1,30 @@
+"""
+Génération et évaluation de mots de passe (zxcvbn), nettoyage bleach des
+entrées.
+"""
+
+import pytest
+
+from app.services.password_generator import PasswordGenerator
+from validators import SecurityValidator
+
+NOTES = {
+    "plain": "Compte principal, 2FA par application, codes de secours au coffre. " * 4,
+    "markup": "<b>Compte</b> principal <script>alert(1)</script> <a href='x'>lien</a> " * 4,
+}
+
+
+def test_generate(benchmark):
+    result = benchmark(PasswordGenerator.generate, length=20)
+    assert len(result["password"]) == 20
+
+
+def test_evaluate_strength(benchmark):
+    result = benchmark(PasswordGenerator.evaluate_strength, "Tr0ub4dor&3-horse-Staple")
+    assert result["strength"] > 0
+
+
+@pytest.mark.parametrize("kind", list(NOTES))
+def test_sanitize_input(benchmark, kind):
+    sanitized = benchmark(SecurityValidator.sanitize_input, NOTES[kind], "notes")
+    assert "<script>" not in sanitized
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compression des réponses HTTP (gzip, brotli) côté Flask.
+
+En production, Nginx compresse déjà (nginx.prod.conf, `gzip on`) ; sans proxy
+devant (dev, tests, déploiement direct), les listes, statistiques et rapports
+JSON partaient en clair. Cette étape `after_request` :
+
+- négocie l'encodage via Accept-Encoding (valeurs q respectées, `q=0` exclut) :
+  brotli si le module `brotli` est installé et accepté, sinon gzip ;
+- ne compresse que les types textuels et au-delà de COMPRESSION_MIN_SIZE
+  octets (en deçà, l'en-tête et le CPU coûtent plus que le gain) ;
+- réponses en flux (`is_streamed`) : compression morceau par morceau avec un
+  flush par morceau, le client reçoit les données au fil de l'eau (pas de
+  mise en mémoire de la réponse entière, pas de Content-Length) ;
+- exclusion par route avec `@no_compression` : les réponses qui contiennent un
+  secret (mot de passe déchiffré, tokens) ne sont jamais compressées, pour
+  fermer la porte aux attaques par canal auxiliaire de type BREACH. Une vue
+  qui relaie d'autres vues (/api/batch) exclut sa réponse au cas par cas avec
+  `skip_compression()` dès qu'une vue relayée est exclue.
+
+Configuration : COMPRESSION_ENABLED, COMPRESSION_MIN_SIZE, COMPRESSION_LEVEL
+(gzip, 1-9), BROTLI_QUALITY (0-11).
+"""
+
+import gzip
+import logging
+import zlib
+
+from flask import current_app, g, request
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle : gzip seul
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "application/msgpack",
+    "application/cbor",
+    "text/plain",
+    "text/html",
+    "text/css",
+    "text/csv",
+    "text/xml",
+    "text/javascript",
+}
+
+
+def no_compression(view):
+    """Exclure une route de la compression (à placer sous `@route`)."""
+    view.no_compression = True
+    return view
+
+
+def view_opted_out(endpoint):
+    """La vue de `endpoint` est-elle exclue de la compression ?"""
+    view = current_app.view_functions.get(endpoint)
+    return getattr(view, "no_compression", False)
+
+
+def skip_compression():
+    """Exclure la réponse de la requête en cours de la compression."""
+    g.no_compression = True
+
+
+def supported_encodings():
+    """Encodages proposés, par ordre de préférence du serveur."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encodings):
+    """Meilleur encodage accepté par le client, None si aucun."""
+    return accept_encodings.best_match(supported_encodings())
+
+
+def compress(data, encoding, config):
+    """Compresser un corps complet."""
+    if encoding == "br":
+        return brotli.compress(data, quality=config.get("BROTLI_QUALITY", 4))
+    return gzip.compress(data, compresslevel=config.get("COMPRESSION_LEVEL", 6), mtime=0)
+
+
+def _encoded(chunks):
+    for chunk in chunks:
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def compress_stream(chunks, encoding, config):
+    """Compresser un flux morceau par morceau (flush à chaque morceau)."""
+    try:
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=config.get("BROTLI_QUALITY", 4))
+            for chunk in _encoded(chunks):
+                data = compressor.process(chunk) + compressor.flush()
+                if data:
+                    yield data
+            yield compressor.finish()
+            return
+
+        # wbits=31 : en-tête et somme de contrôle gzip (et non zlib brut)
+        compressor = zlib.compressobj(
+            config.get("COMPRESSION_LEVEL", 6), zlib.DEFLATED, 31
+        )
+        for chunk in _encoded(chunks):
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush(zlib.Z_FINISH)
+    finally:
+        # Libérer le générateur d'origine (stream_with_context, curseurs...)
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def _opted_out():
+    return g.get("no_compression", False) or view_opted_out(request.endpoint)
+
+
+def compress_response(response, config):
+    """Compresser la réponse si le client l'accepte et si elle s'y prête."""
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or "no-transform" in response.headers.get("Cache-Control", "")
+        or _opted_out()
+    ):
+        return response
+
+    # La représentation dépend désormais d'Accept-Encoding (caches partagés)
+    response.vary.add("Accept-Encoding")
+
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None or request.method == "HEAD":
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding, config)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < config.get("COMPRESSION_MIN_SIZE", 1024):
+            return response
+        response.set_data(compress(data, encoding, config))
+
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def setup_compression(app):
+    """Configurer la compression des réponses pour l'application Flask.
+
+    À appeler AVANT les autres middlewares `after_request` : Flask les exécute
+    en ordre inverse d'enregistrement, la compression s'applique donc en
+    dernier, sur le corps et les en-têtes définitifs.
+    """
+    if not app.config.get("COMPRESSION_ENABLED", True):
+        return app
+
+    @app.after_request
+    def compress_after_request(response):
+        return compress_response(response, app.config)
+
+    logger.info(f"Response compression enabled: {', '.join(supported_encodings())}")
+    return app
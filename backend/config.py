@@ -69,6 +69,100 @@ class Config:
     VAULT_SESSION_IDLE_TTL_SECONDS = int(os.environ.get("VAULT_SESSION_IDLE_TTL_SECONDS", 900))  # 15 min
     VAULT_SESSION_ABSOLUTE_TTL_SECONDS = int(os.environ.get("VAULT_SESSION_ABSOLUTE_TTL_SECONDS", 604800))  # 7 jours
 
+    # Synchronisation delta (/api/passwords/changes) : taille de page et
+    # rétention des tombstones (au-delà, un jeton plus ancien impose un resync complet)
+    SYNC_PAGE_SIZE = int(os.environ.get("SYNC_PAGE_SIZE", 500))
+    SYNC_MAX_PAGE_SIZE = int(os.environ.get("SYNC_MAX_PAGE_SIZE", 1000))
+    SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get("SYNC_TOMBSTONE_RETENTION_DAYS", 90))
+
+    # Statistiques du tableau de bord : durée du cache Redis par utilisateur
+    # (invalidé à chaque écriture ; le TTL borne la dérive des tranches d'âge)
+    STATS_CACHE_TTL_SECONDS = int(os.environ.get("STATS_CACHE_TTL_SECONDS", 300))
+
+    # Rapport de sécurité : ancienneté maximale conseillée d'un mot de passe et
+    # taille des lots de backfill des empreintes (entrées antérieures)
+    SECURITY_REPORT_MAX_AGE_DAYS = int(os.environ.get("SECURITY_REPORT_MAX_AGE_DAYS", 90))
+    FINGERPRINT_BACKFILL_BATCH = int(os.environ.get("FINGERPRINT_BACKFILL_BATCH", 200))
+
+    # Rappels d'expiration : intervalle du scan interne (0 = désactivé, cron
+    # `flask scan-expiring` à la place) et durée de vie des listes en cache
+    EXPIRY_SCAN_INTERVAL_SECONDS = int(os.environ.get("EXPIRY_SCAN_INTERVAL_SECONDS", 0))
+    EXPIRY_CACHE_TTL_SECONDS = int(os.environ.get("EXPIRY_CACHE_TTL_SECONDS", 6 * 3600))
+
+    # Opérations groupées : nombre maximal d'entrées visées par requête
+    BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 1000))
+
+    # Multiplexeur /api/batch : nombre maximal de sous-requêtes par lot
+    BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", 20))
+
+    # Sérialisation JSON : "orjson" (défaut) ou "default" (stdlib Flask), et
+    # taille du cache par processus des lignes de liste déjà sérialisées (0 = off)
+    JSON_PROVIDER = os.environ.get("JSON_PROVIDER", "orjson")
+    JSON_ROW_CACHE_SIZE = int(os.environ.get("JSON_ROW_CACHE_SIZE", 0))
+
+    # Compression des réponses (gzip, brotli si installé) : seuil minimal en
+    # octets, niveau gzip (1-9) et qualité brotli (0-11). Désactivable derrière
+    # un proxy qui compresse déjà (Nginx `gzip on`).
+    COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", 6))
+    BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", 4))
+
+    # Unité de travail : en-tête de diagnostic X-DB-Commits (COMMIT par requête)
+    DB_COMMIT_HEADER = os.environ.get("DB_COMMIT_HEADER", "false").lower() == "true"
+
+    # Métriques Prometheus (/metrics, format texte). METRICS_TOKEN : jeton Bearer
+    # exigé par l'endpoint s'il est défini. Agrégation multi-workers gunicorn :
+    # variable PROMETHEUS_MULTIPROC_DIR (lue par prometheus_client).
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+    # Server-Timing : en-tête de décomposition par phase (argon2, db, redis...).
+    # SERVER_TIMING_ENABLED pour toutes les réponses (dev), sinon seulement pour
+    # une requête portant `X-Server-Timing: <SERVER_TIMING_TOKEN>`. Requêtes plus
+    # lentes que SLOW_REQUEST_MS journalisées avec leurs phases (0 = désactivé).
+    SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "false").lower() == "true"
+    SERVER_TIMING_TOKEN = os.environ.get("SERVER_TIMING_TOKEN")
+    SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS", 500))
+
+    # Profilage échantillonné (piles repliées dans PROFILE_DIR). Une fraction
+    # PROFILE_SAMPLE_RATE des requêtes, ou celles portant un en-tête X-Profile
+    # signé avec PROFILE_SIGNING_KEY (`flask profile-token`). Surcoût CPU de
+    # l'échantillonnage borné à PROFILE_MAX_OVERHEAD (fraction d'un CPU).
+    PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0.0))
+    PROFILE_SIGNING_KEY = os.environ.get("PROFILE_SIGNING_KEY")
+    PROFILE_TOKEN_TTL = int(os.environ.get("PROFILE_TOKEN_TTL", 300))
+    PROFILE_DIR = os.environ.get("PROFILE_DIR", "/tmp/profiles")
+    PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+    PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", 50))
+    PROFILE_MAX_OVERHEAD = float(os.environ.get("PROFILE_MAX_OVERHEAD", 0.02))
+
+    # Comptabilité mémoire par endpoint (tracemalloc + RSS, /debug/memory).
+    # tracemalloc ralentit les allocations : diagnostic ponctuel seulement.
+    # Instantané des MEMORY_SNAPSHOT_TOP plus gros allocateurs au plus toutes
+    # les MEMORY_SNAPSHOT_INTERVAL secondes.
+    MEMORY_TRACKING_ENABLED = os.environ.get("MEMORY_TRACKING_ENABLED", "false").lower() == "true"
+    MEMORY_TRACE_FRAMES = int(os.environ.get("MEMORY_TRACE_FRAMES", 1))
+    MEMORY_SNAPSHOT_INTERVAL = int(os.environ.get("MEMORY_SNAPSHOT_INTERVAL", 300))
+    MEMORY_SNAPSHOT_TOP = int(os.environ.get("MEMORY_SNAPSHOT_TOP", 20))
+
+    # Traces de requêtes (spans OTLP JSON, une ligne par trace dans
+    # TRACE_EXPORT_PATH). Échantillonnage en fin de requête : erreurs et
+    # requêtes d'au moins TRACE_SLOW_MS toujours gardées, une fraction
+    # TRACE_SAMPLE_RATE des autres. X-Request-ID est propagé dans tous les cas.
+    TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "false").lower() == "true"
+    TRACE_EXPORT_PATH = os.environ.get("TRACE_EXPORT_PATH", "/tmp/traces/spans.jsonl")
+    TRACE_SERVICE_NAME = os.environ.get("TRACE_SERVICE_NAME", "password-manager-api")
+    TRACE_SLOW_MS = int(os.environ.get("TRACE_SLOW_MS", 500))
+    TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", 0.0))
+    TRACE_MAX_SPANS = int(os.environ.get("TRACE_MAX_SPANS", 512))
+
+    # Préchauffage au démarrage (wsgi.py) : zxcvbn et bleach, importés sinon au
+    # premier usage. Avec gunicorn --preload : une fois dans le maître, pages
+    # partagées entre workers (copy-on-write).
+    WARMUP_ON_START = os.environ.get("WARMUP_ON_START", "true").lower() == "true"
+
     # Configuration CORS
     CORS_ORIGINS = [
         "http://localhost:3000",
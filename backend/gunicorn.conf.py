@@ -0,0 +1,70 @@
+"""
+Configuration gunicorn (chargée automatiquement depuis backend/ : `gunicorn wsgi:app`).
+
+Réglages par variables d'environnement :
+
+- GUNICORN_WORKERS (4), GUNICORN_THREADS (1) ;
+- GUNICORN_WORKER_CLASS : `sync` par défaut, `gthread` dès que
+  GUNICORN_THREADS > 1 (un worker sert alors plusieurs requêtes à la fois,
+  utile pendant les attentes Redis/PostgreSQL ; Argon2id libère le GIL) ;
+- GUNICORN_PRELOAD (true) : app construite une fois dans le maître, partagée
+  en copy-on-write entre workers (mesure : tools/worker_memory.py) ;
+- GUNICORN_BIND (0.0.0.0:5000), GUNICORN_TIMEOUT (120),
+  GUNICORN_MAX_REQUESTS / GUNICORN_MAX_REQUESTS_JITTER (0 : pas de recyclage).
+
+Hooks (voir prefork.py) : pools Redis et SQLAlchemy neufs après le fork,
+threads de fond et connexions préchauffées dans chaque worker, fichiers de
+métriques d'un worker terminé libérés (PROMETHEUS_MULTIPROC_DIR).
+"""
+
+import gc
+import glob
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 4))
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync")
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 0))
+accesslog = "-"
+
+# create_app() laisse les threads de fond aux workers (hook post_worker_init)
+os.environ["POST_FORK_HOOKS"] = "1"
+
+# Métriques multi-processus : répertoire vidé une fois, avant le chargement de
+# l'app (pas lors d'un rechargement HUP : les workers vivants y écrivent).
+_multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if _multiproc_dir and not os.environ.get("_PROMETHEUS_MULTIPROC_CLEARED"):
+    os.makedirs(_multiproc_dir, exist_ok=True)
+    for _path in glob.glob(os.path.join(_multiproc_dir, "*.db")):
+        os.remove(_path)
+    os.environ["_PROMETHEUS_MULTIPROC_CLEARED"] = "1"
+
+
+def when_ready(server):
+    # Objets de l'app préchargée hors du GC : ses passages n'écrivent plus dans
+    # leurs en-têtes, les pages restent partagées entre workers.
+    if server.cfg.preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from prefork import reset_connections
+
+        reset_connections(worker.app.wsgi())
+
+
+def post_worker_init(worker):
+    from prefork import worker_ready
+
+    worker_ready(worker.wsgi)
+
+
+def child_exit(server, worker):
+    from metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
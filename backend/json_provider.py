@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sérialisation JSON rapide (orjson) pour Flask.
+
+- OrjsonProvider remplace le fournisseur JSON stdlib de Flask : `jsonify`,
+  `request.get_json()` et le client de test passent par orjson (datetime et
+  UUID natifs, sortie en octets UTF-8 sans passer par `str`).
+- RowFragmentCache : cache (par processus, LRU borné) des octets JSON déjà
+  sérialisés d'une ligne de liste, indexé par (id, updated_at, champs). Toute
+  écriture d'une entrée change `updated_at` : une entrée modifiée n'est jamais
+  resservie depuis le cache.
+
+Configuration : JSON_PROVIDER ("orjson" par défaut, "default" = stdlib) et
+JSON_ROW_CACHE_SIZE (0 = cache désactivé). orjson absent → fournisseur stdlib.
+"""
+
+import decimal
+import logging
+import threading
+from collections import OrderedDict
+
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+from server_timing import phase
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle : repli sur le fournisseur stdlib
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(o):
+    """Types non gérés nativement par orjson (même périmètre que Flask)."""
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """Fournisseur JSON Flask adossé à orjson.
+
+    Clés non-str acceptées (converties comme par json.dumps). `dumps` honore
+    sort_keys et indent (2 ou None) ; tout autre argument (separators, cls,
+    ensure_ascii...) passe par le fournisseur stdlib.
+    """
+
+    mimetype = "application/json"
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._fallback = DefaultJSONProvider(app)
+
+    def _options(self):
+        # Sortie indentée en debug, comme le fournisseur par défaut de Flask
+        options = orjson.OPT_NON_STR_KEYS
+        return options | orjson.OPT_INDENT_2 if self._app.debug else options
+
+    def dumps_bytes(self, obj, option=None):
+        with phase("serialize"):
+            if option is None:
+                option = self._options()
+            return orjson.dumps(obj, default=_default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        option = None
+        if kwargs:
+            sort_keys = kwargs.pop("sort_keys", False)
+            indent = kwargs.pop("indent", None)
+            if kwargs or indent not in (None, 2):
+                return self._fallback.dumps(obj, sort_keys=sort_keys, indent=indent, **kwargs)
+            option = orjson.OPT_NON_STR_KEYS
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent == 2:
+                option |= orjson.OPT_INDENT_2
+        return self.dumps_bytes(obj, option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+class RowFragmentCache:
+    """LRU borné des fragments JSON (octets) de lignes de liste."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._data.get(key)
+            if fragment is not None:
+                self._data.move_to_end(key)
+            return fragment
+
+    def put(self, key, fragment):
+        with self._lock:
+            self._data[key] = fragment
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+def setup_json_provider(app):
+    """Installer le fournisseur JSON configuré et le cache de fragments."""
+    app.row_fragment_cache = None
+    if app.config.get("JSON_PROVIDER", "orjson") != "orjson":
+        return app
+    if orjson is None:
+        logger.warning("orjson not installed: using the standard JSON provider")
+        return app
+
+    app.json = OrjsonProvider(app)
+    size = app.config.get("JSON_ROW_CACHE_SIZE", 0)
+    if size > 0:
+        app.row_fragment_cache = RowFragmentCache(size)
+    return app
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comptabilité mémoire par endpoint (tracemalloc + RSS), sur option.
+
+Le RSS d'un worker varie de centaines de Mio : chaque dérivation Argon2id
+alloue ARGON2_MEMORY_KIB (192 Mio) côté C, et l'on ne voit pas ce qui reste
+retenu ailleurs (dictionnaires zxcvbn, identity map SQLAlchemy, objets
+bleach...). Deux mesures complémentaires par requête :
+
+- pic des allocations Python tracées (tracemalloc, remis à zéro à chaque
+  requête) : objets Python, y compris ceux libérés avant la fin ;
+- croissance du RSS (/proc/self/statm) : voit aussi les allocations C
+  (Argon2id, OpenSSL) qu'ignore tracemalloc.
+
+Exposition : histogrammes `http_request_memory_peak_bytes` et
+`http_request_rss_growth_bytes` et jauge `worker_resident_memory_bytes` sur
+/metrics, et `GET /debug/memory` (JSON, même jeton que /metrics) avec les
+agrégats par endpoint du worker qui répond et le dernier instantané des plus
+gros allocateurs, pris au plus toutes les MEMORY_SNAPSHOT_INTERVAL secondes
+(avec l'écart par rapport au précédent : ce qui grossit).
+
+Coût : tracemalloc ralentit nettement les allocations (activé seulement si
+MEMORY_TRACKING_ENABLED, pour un diagnostic de dimensionnement). Le pic est
+global au processus : avec des workers multi-threads, il est attribué à
+l'endpoint de la requête qui se termine.
+"""
+
+import os
+import threading
+import time
+import tracemalloc
+
+from flask import g, jsonify, request
+
+from metrics import REQUEST_MEMORY_PEAK, REQUEST_RSS_GROWTH, WORKER_RSS, _authorized
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):  # hors POSIX
+    _PAGE_SIZE = None
+
+# Bruit de l'outillage lui-même dans les instantanés
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes():
+    """RSS courant du processus (Linux), None si indisponible."""
+    if _PAGE_SIZE is None:
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryLedger:
+    """Agrégats par endpoint et instantanés des plus gros allocateurs."""
+
+    def __init__(self, top_n, snapshot_interval):
+        self.top_n = top_n
+        self.snapshot_interval = snapshot_interval
+        self.endpoints = {}
+        self.top_allocators = []
+        self.growing_allocators = []
+        self.snapshot_at = None
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, peak, rss_growth):
+        with self._lock:
+            stats = self.endpoints.setdefault(
+                endpoint,
+                {"requests": 0, "peak_max": 0, "peak_total": 0, "rss_growth_max": 0,
+                 "rss_growth_total": 0},
+            )
+            stats["requests"] += 1
+            stats["peak_max"] = max(stats["peak_max"], peak)
+            stats["peak_total"] += peak
+            stats["rss_growth_max"] = max(stats["rss_growth_max"], rss_growth)
+            stats["rss_growth_total"] += rss_growth
+
+    def snapshot_due(self, now=None):
+        now = now if now is not None else time.time()
+        return self.snapshot_at is None or now - self.snapshot_at >= self.snapshot_interval
+
+    def take_snapshot(self):
+        """Instantané des plus gros allocateurs (fichier:ligne) et de ce qui a grossi."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        top = [_stat(stat) for stat in snapshot.statistics("lineno")[: self.top_n]]
+        growing = []
+        if self._previous is not None:
+            diffs = snapshot.compare_to(self._previous, "lineno")
+            growing = [
+                dict(_stat(diff), size_diff=diff.size_diff, count_diff=diff.count_diff)
+                for diff in diffs[: self.top_n]
+                if diff.size_diff > 0
+            ]
+        with self._lock:
+            self.top_allocators, self.growing_allocators = top, growing
+            self.snapshot_at = time.time()
+            self._previous = snapshot
+
+    def report(self):
+        with self._lock:
+            endpoints = {
+                endpoint: dict(
+                    stats,
+                    peak_avg=stats["peak_total"] // stats["requests"],
+                    rss_growth_avg=stats["rss_growth_total"] // stats["requests"],
+                )
+                for endpoint, stats in self.endpoints.items()
+            }
+            current, peak = tracemalloc.get_traced_memory()
+            return {
+                "pid": os.getpid(),
+                "rss_bytes": rss_bytes(),
+                "traced": {"current": current, "peak_since_reset": peak},
+                "endpoints": endpoints,
+                "snapshot_at": self.snapshot_at,
+                "top_allocators": self.top_allocators,
+                "growing_allocators": self.growing_allocators,
+            }
+
+
+def _stat(stat):
+    frame = stat.traceback[0]
+    return {"location": f"{frame.filename}:{frame.lineno}", "size": stat.size, "count": stat.count}
+
+
+def setup_memory_tracking(app):
+    """Configurer la comptabilité mémoire par endpoint (si MEMORY_TRACKING_ENABLED)."""
+    if not app.config.get("MEMORY_TRACKING_ENABLED"):
+        return app
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(app.config["MEMORY_TRACE_FRAMES"])
+    ledger = MemoryLedger(
+        app.config["MEMORY_SNAPSHOT_TOP"], app.config["MEMORY_SNAPSHOT_INTERVAL"]
+    )
+    app.memory_ledger = ledger
+
+    @app.before_request
+    def start_memory_accounting():
+        tracemalloc.reset_peak()
+        g._memory_start = (tracemalloc.get_traced_memory()[0], rss_bytes())
+
+    @app.after_request
+    def record_memory_accounting(response):
+        start = g.pop("_memory_start", None)
+        if start is None:
+            return response
+        traced_start, rss_start = start
+        peak = max(tracemalloc.get_traced_memory()[1] - traced_start, 0)
+        rss_now = rss_bytes()
+        rss_growth = max(rss_now - rss_start, 0) if rss_now and rss_start else 0
+
+        rule = request.url_rule
+        endpoint = rule.rule if rule is not None else "<unmatched>"
+        REQUEST_MEMORY_PEAK.labels(request.method, endpoint).observe(peak)
+        REQUEST_RSS_GROWTH.labels(request.method, endpoint).observe(rss_growth)
+        if rss_now:
+            WORKER_RSS.set(rss_now)
+        ledger.record(f"{request.method} {endpoint}", peak, rss_growth)
+
+        if ledger.snapshot_due():
+            ledger.take_snapshot()
+        return response
+
+    @app.route("/debug/memory", methods=["GET"])
+    def memory_report():
+        if not _authorized(app):
+            return jsonify({"error": "Unauthorized"}), 401
+        if request.args.get("snapshot") == "1":
+            ledger.take_snapshot()
+        return jsonify(ledger.report())
+
+    return app
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métriques Prometheus (format d'exposition texte) sur `/metrics`.
+
+`/health` ne donne qu'un temps de `SELECT 1`. Les chemins chauds sont
+instrumentés ici :
+
+- `http_request_duration_seconds{method,endpoint,status}` : minuteur de
+  requête (endpoint = règle de route Flask, cardinalité bornée) ;
+- `argon2_derive_seconds` : dérivations Argon2id (login, inscription,
+  égalisation de timing) ;
+- `aes_gcm_operations_total{operation}` : chiffrements / déchiffrements ;
+- `redis_command_seconds{operation}` : allers-retours Redis du session key
+  store, du registre des refresh tokens et du rate limiter ;
+- `rate_limit_decisions_total{decision}` : allowed / blocked / exceeded ;
+- `audit_write_seconds{path}` : COMMIT qui persiste l'audit (unité de travail
+  complète, ou audit seul après une réponse 5xx).
+
+Multi-processus (gunicorn) : avec PROMETHEUS_MULTIPROC_DIR (répertoire
+partagé, vidé au démarrage par gunicorn.conf.py), chaque worker écrit ses
+valeurs dans des fichiers mmap et `/metrics` agrège tous les workers, quel
+que soit celui qui répond. Le master appelle `mark_process_dead(pid)` à la
+sortie d'un worker (hook `child_exit` de gunicorn.conf.py).
+
+Coût : une observation est un incrément en mémoire (~1 µs), sans I/O ; les
+séries à labels fixes sont liées une fois à l'import. Sans `prometheus_client`
+installé, les métriques sont des no-op et `/metrics` répond 501.
+
+Configuration : METRICS_ENABLED, METRICS_TOKEN (jeton Bearer exigé sur
+`/metrics` s'il est défini ; sinon l'endpoint n'est exposé qu'au réseau
+interne, Nginx ne le relaie pas).
+"""
+
+import hmac
+import os
+import time
+
+from flask import g, jsonify, request
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # dépendance optionnelle : métriques désactivées
+    prometheus_client = None
+
+
+class _NoopMetric:
+    """Métrique sans effet (prometheus_client absent)."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, amount):
+        pass
+
+    def set(self, value):
+        pass
+
+
+def _histogram(name, documentation, labelnames=(), buckets=None):
+    if prometheus_client is None:
+        return _NoopMetric()
+    kwargs = {"buckets": buckets} if buckets else {}
+    return prometheus_client.Histogram(name, documentation, labelnames, **kwargs)
+
+
+def _counter(name, documentation, labelnames=()):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return prometheus_client.Counter(name, documentation, labelnames)
+
+
+def _gauge(name, documentation, multiprocess_mode):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return prometheus_client.Gauge(name, documentation, multiprocess_mode=multiprocess_mode)
+
+
+# Argon2id : ~100-250 ms en production (192 MiB), quelques ms en test
+_ARGON2_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.15, 0.2, 0.25, 0.35, 0.5, 1.0, 2.5)
+# Redis local : sous la milliseconde attendue
+_REDIS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+# Mémoire par requête : de 64 Kio à 256 Mio (Argon2id de production : 192 Mio)
+_MEMORY_BUCKETS = tuple(2**exponent for exponent in range(16, 30, 2))
+
+REQUEST_SECONDS = _histogram(
+    "http_request_duration_seconds",
+    "Durée de traitement des requêtes HTTP",
+    ("method", "endpoint", "status"),
+)
+ARGON2_SECONDS = _histogram(
+    "argon2_derive_seconds", "Durée d'une dérivation Argon2id", buckets=_ARGON2_BUCKETS
+)
+AES_GCM_OPERATIONS = _counter(
+    "aes_gcm_operations", "Opérations AES-256-GCM", ("operation",)
+)
+REDIS_SECONDS = _histogram(
+    "redis_command_seconds",
+    "Durée des allers-retours Redis",
+    ("operation",),
+    buckets=_REDIS_BUCKETS,
+)
+RATE_LIMIT_DECISIONS = _counter(
+    "rate_limit_decisions", "Décisions du rate limiter", ("decision",)
+)
+AUDIT_WRITE_SECONDS = _histogram(
+    "audit_write_seconds", "Durée du COMMIT qui persiste l'audit", ("path",)
+)
+# Comptabilité mémoire (memory_accounting, si MEMORY_TRACKING_ENABLED)
+REQUEST_MEMORY_PEAK = _histogram(
+    "http_request_memory_peak_bytes",
+    "Pic d'allocations Python tracées (tracemalloc) pendant la requête",
+    ("method", "endpoint"),
+    buckets=_MEMORY_BUCKETS,
+)
+REQUEST_RSS_GROWTH = _histogram(
+    "http_request_rss_growth_bytes",
+    "Croissance du RSS du worker pendant la requête (0 si stable ou en baisse)",
+    ("method", "endpoint"),
+    buckets=_MEMORY_BUCKETS,
+)
+WORKER_RSS = _gauge("worker_resident_memory_bytes", "RSS du worker", "liveall")
+
+# Séries à labels fixes liées une fois (évite la recherche par label à chaque appel)
+AES_GCM_ENCRYPT = AES_GCM_OPERATIONS.labels("encrypt")
+AES_GCM_DECRYPT = AES_GCM_OPERATIONS.labels("decrypt")
+
+
+def available():
+    """Vrai si prometheus_client est installé."""
+    return prometheus_client is not None
+
+
+def render():
+    """(corps, content-type) de l'exposition texte, agrégée sur tous les workers
+    en mode multi-processus."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """Libérer les fichiers d'un worker terminé (hook gunicorn `child_exit`)."""
+    if prometheus_client is not None and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+def _authorized(app):
+    token = app.config.get("METRICS_TOKEN")
+    if not token:
+        return True
+    supplied = request.headers.get("Authorization", "")
+    return hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode())
+
+
+def setup_metrics(app):
+    """Configurer le minuteur de requêtes et l'endpoint `/metrics`.
+
+    À appeler AVANT les autres middlewares `after_request` : exécuté en
+    dernier, le minuteur couvre aussi le COMMIT, les en-têtes et la compression.
+    """
+    if not app.config.get("METRICS_ENABLED", True):
+        return app
+
+    @app.before_request
+    def start_request_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            rule = request.url_rule
+            REQUEST_SECONDS.labels(
+                request.method,
+                rule.rule if rule is not None else "<unmatched>",
+                str(response.status_code),
+            ).observe(time.perf_counter() - start)
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_endpoint():
+        if not available():
+            return jsonify({"error": "Metrics unavailable (prometheus_client not installed)"}), 501
+        if not _authorized(app):
+            return jsonify({"error": "Unauthorized"}), 401
+        body, content_type = render()
+        return app.response_class(body, content_type=content_type)
+
+    return app
@@ -0,0 +1,58 @@
+"""
+Cycle de vie des workers gunicorn (hooks de gunicorn.conf.py).
+
+Avec `--preload`, l'app est construite UNE fois dans le maître puis forkée :
+code, dictionnaires zxcvbn et objets de l'app sont partagés en copy-on-write
+au lieu d'être dupliqués par worker. Mais tout ce que create_app a créé est
+hérité tel quel :
+
+- le pool de connexions Redis (`app.redis`) et le pool SQLAlchemy : une
+  socket héritée utilisée par deux processus mélange leurs réponses. Chaque
+  worker repart de pools vides (`reset_connections`, hook post_fork) sans
+  fermer les sockets du maître ;
+- les threads (scan d'expiration) ne survivent pas au fork : sous gunicorn
+  (POST_FORK_HOOKS), create_app ne les lance pas ; chaque worker les démarre
+  (`worker_ready`, hook post_worker_init), avec ou sans --preload.
+"""
+
+import logging
+import os
+
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Posée par gunicorn.conf.py : les threads de fond démarrent dans les workers
+POST_FORK_HOOKS_ENV = "POST_FORK_HOOKS"
+
+
+def worker_threads_deferred():
+    """create_app doit-il laisser les threads de fond aux hooks de worker ?"""
+    return bool(os.environ.get(POST_FORK_HOOKS_ENV))
+
+
+def reset_connections(app):
+    """Worker fraîchement forké : pools Redis et SQLAlchemy propres au processus."""
+    pool = getattr(app.redis, "connection_pool", None)
+    if pool is not None:
+        pool.reset()  # connexions héritées oubliées, pas fermées (sockets du maître)
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def start_worker_threads(app):
+    """Threads de fond d'un worker (scan d'expiration si configuré)."""
+    if app.config["EXPIRY_SCAN_INTERVAL_SECONDS"] > 0 and not app.config.get("TESTING"):
+        from app.services.expiry_service import start_expiry_scheduler
+
+        start_expiry_scheduler(app)
+
+
+def worker_ready(app):
+    """Worker prêt à servir : threads de fond, puis connexions préchauffées."""
+    start_worker_threads(app)
+    if app.config["WARMUP_ON_START"]:
+        from warmup import warmup
+
+        warmup(app, connections=True)
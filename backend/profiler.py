@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profilage par échantillonnage à la demande, sur les workers en service.
+
+Les comportements d'Argon2id et de Redis sous concurrence réelle ne se
+reproduisent pas hors ligne. Une requête profilée est échantillonnée par un
+thread dédié qui relève la pile du thread de la requête toutes les
+PROFILE_INTERVAL_MS (`sys._current_frames`, aucun traçage par appel de
+fonction : le code profilé s'exécute à vitesse normale).
+
+- Sélection : une fraction PROFILE_SAMPLE_RATE des requêtes, ou une requête
+  portant l'en-tête signé `X-Profile: <horodatage>.<hmac>` (HMAC-SHA256 de
+  l'horodatage avec PROFILE_SIGNING_KEY, valable PROFILE_TOKEN_TTL secondes ;
+  `flask profile-token` en génère un). La réponse indique alors le fichier
+  produit (`X-Profile-Id`).
+- Sortie : piles repliées (« collapsed stacks », `racine;...;feuille N`),
+  lisibles par flamegraph.pl, speedscope ou inferno, dans PROFILE_DIR ;
+  rotation : seuls les PROFILE_MAX_FILES fichiers les plus récents restent.
+- Surcoût borné : le temps CPU du thread d'échantillonnage est mesuré. Au-delà
+  de PROFILE_MAX_OVERHEAD (fraction d'un CPU) pendant un profil, l'intervalle
+  double ; sur la fenêtre glissante d'une minute, plus aucun profil ne démarre
+  tant que le budget est dépassé. Un seul profil à la fois par worker.
+
+Désactivé par défaut (PROFILING_ENABLED).
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+# Pile relevée au plus à cette profondeur (récursions pathologiques)
+_MAX_DEPTH = 128
+_BUDGET_WINDOW = 60.0
+
+
+def sign_token(key, timestamp=None):
+    """Valeur d'en-tête `X-Profile` signée pour l'horodatage donné (maintenant par défaut)."""
+    timestamp = str(int(timestamp if timestamp is not None else time.time()))
+    digest = hmac.new(key.encode(), timestamp.encode(), hashlib.sha256).hexdigest()
+    return f"{timestamp}.{digest}"
+
+
+def verify_token(key, token, ttl, now=None):
+    """Vrai si `token` est signé par `key` et date de moins de `ttl` secondes."""
+    if not key or not token:
+        return False
+    timestamp, _, digest = token.partition(".")
+    if not timestamp.isdigit():
+        return False
+    expected = sign_token(key, int(timestamp)).partition(".")[2]
+    if not hmac.compare_digest(digest.encode(), expected.encode()):
+        return False
+    now = now if now is not None else time.time()
+    return abs(now - int(timestamp)) <= ttl
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame):
+    """Pile repliée `racine;...;feuille` à partir d'un frame."""
+    labels = []
+    while frame is not None and len(labels) < _MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class OverheadBudget:
+    """Temps CPU consommé par l'échantillonnage sur une fenêtre glissante."""
+
+    def __init__(self, limit, window=_BUDGET_WINDOW):
+        self.limit = limit
+        self.window = window
+        self._spent = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now):
+        while self._spent and self._spent[0][0] < now - self.window:
+            self._spent.popleft()
+
+    def charge(self, cpu_seconds, now=None):
+        with self._lock:
+            now = now if now is not None else time.monotonic()
+            self._spent.append((now, cpu_seconds))
+            self._trim(now)
+
+    def allows(self, now=None):
+        with self._lock:
+            now = now if now is not None else time.monotonic()
+            self._trim(now)
+            return sum(cpu for _, cpu in self._spent) < self.limit * self.window
+
+
+class StackSampler:
+    """Échantillonne la pile d'un thread depuis un thread dédié."""
+
+    def __init__(self, thread_id, interval, max_overhead):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.stacks = Counter()
+        self.samples = 0
+        self.cpu_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        interval = self.interval
+        while not self._stop.wait(interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            self.stacks[collapse(frame)] += 1
+            self.samples += 1
+            del frame
+            # Régulation : au-delà du budget, on échantillonne deux fois moins souvent
+            cpu = time.thread_time() - cpu_start
+            if cpu > self.max_overhead * (time.perf_counter() - wall_start):
+                interval = min(interval * 2, 1.0)
+        self.cpu_seconds = time.thread_time() - cpu_start
+
+
+def write_profile(directory, name, stacks, max_files):
+    """Écrire les piles repliées (écriture atomique) puis appliquer la rotation."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    os.replace(tmp, path)
+
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(".folded")),
+        key=lambda entry: entry.stat().st_mtime_ns,
+    )
+    for entry in profiles[: max(len(profiles) - max_files, 0)]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+    return path
+
+
+def _profile_name(method, rule):
+    route = re.sub(r"[^A-Za-z0-9]+", "_", rule).strip("_") or "root"
+    return f"{time.time_ns()}-{os.getpid()}-{method}-{route}.folded"
+
+
+def setup_profiling(app):
+    """Configurer le profilage échantillonné des requêtes (si PROFILING_ENABLED)."""
+
+    @app.cli.command("profile-token")
+    def profile_token_command():
+        """Afficher une valeur d'en-tête X-Profile signée (PROFILE_SIGNING_KEY)."""
+        key = app.config.get("PROFILE_SIGNING_KEY")
+        if not key:
+            raise SystemExit("PROFILE_SIGNING_KEY is not set")
+        print(f"{PROFILE_HEADER}: {sign_token(key)}")
+
+    if not app.config.get("PROFILING_ENABLED"):
+        return app
+
+    budget = OverheadBudget(app.config["PROFILE_MAX_OVERHEAD"])
+    slot = threading.Semaphore(1)
+    app.profiling_budget = budget
+
+    def _requested():
+        return verify_token(
+            app.config.get("PROFILE_SIGNING_KEY"),
+            request.headers.get(PROFILE_HEADER),
+            app.config["PROFILE_TOKEN_TTL"],
+        )
+
+    @app.before_request
+    def start_profile():
+        requested = _requested()
+        if not requested and random.random() >= app.config["PROFILE_SAMPLE_RATE"]:
+            return
+        if not budget.allows():
+            logger.info("Profil ignoré : budget de surcoût CPU atteint")
+            return
+        if not slot.acquire(blocking=False):
+            return
+        g._profile = (
+            StackSampler(
+                threading.get_ident(),
+                app.config["PROFILE_INTERVAL_MS"] / 1000,
+                app.config["PROFILE_MAX_OVERHEAD"],
+            ).start(),
+            requested,
+        )
+
+    def _finish(response=None):
+        profile = g.pop("_profile", None)
+        if profile is None:
+            return None
+        sampler, requested = profile
+        try:
+            stacks = sampler.stop()
+            budget.charge(sampler.cpu_seconds)
+            rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            name = _profile_name(request.method, rule)
+            if stacks:
+                write_profile(
+                    app.config["PROFILE_DIR"], name, stacks, app.config["PROFILE_MAX_FILES"]
+                )
+                if requested and response is not None:
+                    response.headers["X-Profile-Id"] = name
+        except OSError as e:
+            logger.warning(f"Écriture du profil impossible: {e}")
+        finally:
+            slot.release()
+        return None
+
+    @app.after_request
+    def stop_profile(response):
+        _finish(response)
+        return response
+
+    @app.teardown_request
+    def abort_profile(exc):
+        # after_request non exécuté (exception non gérée) : libérer le créneau
+        _finish()
+
+    return app
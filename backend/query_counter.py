@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compteurs de requêtes SQL et d'allers-retours Redis.
+
+Rien n'empêchait un N+1 ou un aller-retour de plus de s'installer sur un
+chemin chaud. Ces compteurs mesurent ce qu'une portion de code (typiquement
+un appel HTTP de test) envoie réellement aux deux backends :
+
+- SQL : chaque instruction passée au curseur (événement `before_cursor_execute`).
+  BEGIN/COMMIT ne sont pas des instructions (voir unit_of_work / X-DB-Commits) ;
+  SAVEPOINT/RELEASE, eux, en sont.
+- Redis : chaque aller-retour réseau. Une commande isolée compte pour un, un
+  pipeline pour un quelle que soit sa taille ; le détail des commandes est
+  conservé pour le diagnostic.
+
+    with count_queries(db.engine, app.redis) as counts:
+        client.get("/api/passwords/", headers=auth)
+    assert counts.sql <= 2 and counts.redis <= 3
+
+Outil de test et de diagnostic : l'instrumentation Redis remplace des
+méthodes de l'instance cliente le temps du bloc, à ne pas utiliser en
+production.
+"""
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Instructions SQL émises sur un engine tant que le compteur est actif."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _on_statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def start(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_statement)
+        return self
+
+    def stop(self):
+        event.remove(self.engine, "before_cursor_execute", self._on_statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+class RedisCommandCounter:
+    """Allers-retours Redis d'un client (commandes isolées et pipelines)."""
+
+    def __init__(self, client):
+        self.client = client
+        self.round_trips = []
+
+    def start(self):
+        client = self.client
+        execute_command = client.execute_command
+        pipeline = client.pipeline
+
+        def counted_execute_command(*args, **options):
+            self.round_trips.append((args[0],))
+            return execute_command(*args, **options)
+
+        def counted_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            execute = pipe.execute
+
+            def counted_execute(*a, **kw):
+                self.round_trips.append(tuple(cmd[0][0] for cmd in pipe.command_stack))
+                return execute(*a, **kw)
+
+            pipe.execute = counted_execute
+            return pipe
+
+        # Attributs d'instance : masquent les méthodes de classe, retirés par stop()
+        client.execute_command = counted_execute_command
+        client.pipeline = counted_pipeline
+        return self
+
+    def stop(self):
+        for name in ("execute_command", "pipeline"):
+            self.client.__dict__.pop(name, None)
+
+    @property
+    def count(self):
+        return len(self.round_trips)
+
+    @property
+    def commands(self):
+        return [command for trip in self.round_trips for command in trip]
+
+
+class QueryCounts:
+    """Résultat d'une mesure : `sql` et `redis` (allers-retours), avec le détail."""
+
+    def __init__(self, sql_counter, redis_counter):
+        self._sql = sql_counter
+        self._redis = redis_counter
+
+    @property
+    def sql(self):
+        return self._sql.count if self._sql else 0
+
+    @property
+    def redis(self):
+        return self._redis.count if self._redis else 0
+
+    @property
+    def statements(self):
+        return list(self._sql.statements) if self._sql else []
+
+    @property
+    def redis_commands(self):
+        return self._redis.commands if self._redis else []
+
+    def __repr__(self):
+        return f"QueryCounts(sql={self.sql}, redis={self.redis})"
+
+
+@contextmanager
+def count_queries(engine=None, redis_client=None):
+    """Compter les requêtes SQL et les allers-retours Redis émis dans le bloc."""
+    sql_counter = QueryCounter(engine).start() if engine is not None else None
+    redis_counter = RedisCommandCounter(redis_client).start() if redis_client is not None else None
+    try:
+        yield QueryCounts(sql_counter, redis_counter)
+    finally:
+        if sql_counter:
+            sql_counter.stop()
+        if redis_counter:
+            redis_counter.stop()
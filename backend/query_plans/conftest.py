@@ -0,0 +1,103 @@
+"""
+Fixtures de la suite de plans : base PostgreSQL jetable peuplée une fois par
+session (tools/seed_data.py), app de test branchée dessus, deux profils de
+coffre (médian et le plus gros) et collecte des recommandations d'index,
+affichées en fin de session.
+"""
+
+import importlib.util
+import os
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from benchmarks._support import load_app_entry, make_app  # Argon2 réduit, app_entry
+
+_TOOLS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "tools"
+)
+SEED = 48
+SEED_USERS = int(os.environ.get("PLAN_SEED_USERS", 300))
+# Seuil (pg_class.reltuples) au-delà duquel un Seq Scan est un échec
+LARGE_TABLE_ROWS = int(os.environ.get("PLAN_LARGE_TABLE_ROWS", 10000))
+
+_recommendations = {}
+
+
+def _load_seed_data():
+    spec = importlib.util.spec_from_file_location(
+        "seed_data", os.path.join(_TOOLS_DIR, "seed_data.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def seed_data():
+    return _load_seed_data()
+
+
+@pytest.fixture(scope="session")
+def plan_app(seed_data):
+    url = make_url(os.environ["PLAN_DATABASE_URL"])
+    if url.get_backend_name() != "postgresql" or "test" not in (url.database or ""):
+        pytest.exit("PLAN_DATABASE_URL : base PostgreSQL jetable dont le nom contient « test »")
+
+    from extensions import db
+
+    load_app_entry().config["testing"].SQLALCHEMY_DATABASE_URI = url.render_as_string(
+        hide_password=False
+    )
+    app = make_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_data.main([
+            "--database-url", url.render_as_string(hide_password=False),
+            "--users", str(SEED_USERS), "--seed", str(SEED),
+            "--jobs", str(min(4, os.cpu_count() or 1)),
+        ])
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture(scope="session")
+def large_tables(plan_app):
+    from extensions import db
+
+    rows = db.session.execute(
+        db.text(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples >= :rows"
+        ),
+        {"rows": LARGE_TABLE_ROWS},
+    )
+    return {name for (name,) in rows}
+
+
+@pytest.fixture(scope="session")
+def profiles(plan_app, seed_data):
+    """{profil: email} : coffre de taille médiane et plus gros coffre."""
+    from extensions import db
+
+    rows = db.session.execute(
+        db.text(
+            "SELECT u.email FROM users u JOIN passwords p ON p.user_id = u.id "
+            "GROUP BY u.email ORDER BY count(*)"
+        )
+    ).scalars().all()
+    return {"median": rows[len(rows) // 2], "largest": rows[-1]}
+
+
+def record_recommendations(name, recommendations):
+    for recommendation in recommendations:
+        _recommendations.setdefault(recommendation, []).append(name)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _recommendations:
+        return
+    terminalreporter.section("index recommandés")
+    for recommendation, shapes in sorted(_recommendations.items()):
+        terminalreporter.write_line(recommendation)
+        terminalreporter.write_line(f"    requêtes : {', '.join(sorted(set(shapes)))}")
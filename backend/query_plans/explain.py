@@ -0,0 +1,134 @@
+"""
+Capture des requêtes SQL et lecture des plans EXPLAIN (FORMAT JSON).
+
+Les fonctions d'analyse sont pures (un plan = le dictionnaire « Plan » de
+PostgreSQL) et testées sans base dans tests/test_query_plans.py.
+"""
+
+import json
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+# Nœuds qui lisent une table (condition d'accès ou filtre exploitable)
+_CONDITION_KEYS = ("Index Cond", "Recheck Cond", "Filter")
+_SORT_NODES = ("Sort", "Incremental Sort")
+# `(colonne)::type = ...` ou `colonne = ...` ; exclut <>, >=, <=, !=
+_EQUALITY = re.compile(r"\b(\w+)\)?(?:::[\w ]+?)?\s+=\s")
+_SORT_KEY = re.compile(r"^\(*(?:\w+\.)?(\w+)\)*(?:::[\w ]+)?(?:\s+(?:ASC|DESC))?(?:\s+NULLS\s+\w+)?$")
+
+
+@contextmanager
+def capture_selects(engine):
+    """Requêtes SELECT émises pendant le bloc : [(instruction, paramètres), ...]."""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+
+def explain(connection, statement, parameters):
+    """Plan (nœud racine) d'une requête capturée, avec ses paramètres d'origine."""
+    value = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+    ).scalar()
+    return (json.loads(value) if isinstance(value, str) else value)[0]["Plan"]
+
+
+def iter_nodes(plan, ancestors=()):
+    """Parcours en profondeur : (nœud, ancêtres de la racine au parent)."""
+    yield plan, ancestors
+    for child in plan.get("Plans", ()):
+        yield from iter_nodes(child, ancestors + (plan,))
+
+
+def equality_columns(condition):
+    """Colonnes comparées par égalité dans une condition de plan, dans l'ordre."""
+    columns = []
+    for column in _EQUALITY.findall(condition or ""):
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+def sort_columns(sort_keys):
+    """Colonnes d'un « Sort Key » (préfixe de table, cast et sens retirés)."""
+    columns = []
+    for key in sort_keys:
+        match = _SORT_KEY.match(key.strip())
+        if match:
+            columns.append(match.group(1))
+    return columns
+
+
+def table_indexes(table):
+    """Colonnes des index d'une table SQLAlchemy (clé primaire et uniques inclus)."""
+    indexes = [tuple(column.name for column in table.primary_key.columns)]
+    indexes += [tuple(column.name for column in index.columns) for index in table.indexes]
+    return indexes
+
+
+def is_covered(columns, indexes):
+    """Un index existant commence-t-il par ces colonnes (dans cet ordre) ?"""
+    columns = tuple(columns)
+    return any(index[: len(columns)] == columns for index in indexes)
+
+
+def _sort_above(ancestors):
+    for parent in reversed(ancestors):
+        if parent["Node Type"] in _SORT_NODES:
+            return parent
+        if parent["Node Type"] not in ("Limit", "WindowAgg", "Gather", "Gather Merge"):
+            return None
+    return None
+
+
+def _candidate(node, ancestors):
+    """Index qui servirait ce nœud : égalités, puis clés du tri au-dessus."""
+    equalities = []
+    for key in _CONDITION_KEYS:
+        for column in equality_columns(node.get(key)):
+            if column not in equalities:
+                equalities.append(column)
+    sort = _sort_above(ancestors)
+    ordering = sort_columns(sort["Sort Key"]) if sort else []
+    return tuple(equalities + [c for c in ordering if c not in equalities])
+
+
+def analyze_plan(plan, large_tables, indexes, sort_rows=1000):
+    """Problèmes d'un plan.
+
+    Retourne (parcours séquentiels des grandes tables, recommandations).
+    `indexes` : {table: [colonnes d'index]}. Une recommandation est émise pour
+    un Seq Scan d'une grande table, ou pour un tri de plus de `sort_rows`
+    lignes en mémoire que l'index (égalités + clés de tri) éviterait.
+    """
+    seq_scans, recommendations = [], []
+    for node, ancestors in iter_nodes(plan):
+        table = node.get("Relation Name")
+        if table is None:
+            continue
+        reason = None
+        if node["Node Type"] == "Seq Scan" and table in large_tables:
+            seq_scans.append(table)
+            reason = f"Seq Scan ({node.get('Filter', 'sans filtre')})"
+        else:
+            sort = _sort_above(ancestors)
+            if sort is not None and node.get("Plan Rows", 0) > sort_rows:
+                reason = f"tri de ~{node['Plan Rows']} lignes ({', '.join(sort['Sort Key'])})"
+        if reason is None:
+            continue
+        columns = _candidate(node, ancestors)
+        if columns and not is_covered(columns, indexes.get(table, ())):
+            recommendations.append(
+                f"CREATE INDEX ON {table} ({', '.join(columns)});  -- {reason}"
+            )
+    return seq_scans, recommendations
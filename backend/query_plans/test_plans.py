@@ -0,0 +1,94 @@
+"""
+Plans des requêtes de la liste (filtres, recherche, tris, pagination), des
+catégories et statistiques, et des lookups d'authentification (login, jeton),
+pour un coffre médian et pour le plus gros coffre de la base peuplée.
+
+Chaque requête SELECT émise par la route est rejouée sous EXPLAIN avec ses
+paramètres : aucun Seq Scan n'est toléré sur une grande table.
+"""
+
+import os
+
+import pytest
+
+if not os.environ.get("PLAN_DATABASE_URL"):
+    pytest.skip("PLAN_DATABASE_URL non défini (PostgreSQL local requis)", allow_module_level=True)
+
+from app.models import AuditLog, Password, User  # noqa: E402
+from extensions import db  # noqa: E402
+from query_plans.conftest import record_recommendations  # noqa: E402
+from query_plans.explain import analyze_plan, capture_selects, explain, table_indexes  # noqa: E402
+
+PROFILES = ("median", "largest")
+LIST_SHAPES = {
+    "list": "",
+    "list_deep_page": "page=20&per_page=20",
+    "list_search": "search=goo",
+    "list_category": "category=Travail",
+    "list_favorites": "favorites=true",
+    "list_category_favorites": "category=Travail&favorites=true",
+    "list_sort_site_name": "sort=site_name&order=asc",
+    "list_sort_username": "sort=username&order=asc",
+    "list_sort_category": "sort=category&order=asc",
+    "list_sort_created_at": "sort=created_at",
+    "list_sort_last_used": "sort=last_used",
+}
+ENDPOINTS = {
+    **{name: f"/api/passwords/?{query}" for name, query in LIST_SHAPES.items()},
+    "categories": "/api/passwords/categories",
+    "stats": "/api/passwords/stats",
+}
+INDEXES = {
+    table.name: table_indexes(table)
+    for table in (User.__table__, Password.__table__, AuditLog.__table__)
+}
+
+
+@pytest.fixture(scope="module")
+def logins(plan_app, profiles, seed_data):
+    """{profil: (en-têtes, requêtes du login)}."""
+    client = plan_app.test_client()
+    result = {}
+    for profile, email in profiles.items():
+        with capture_selects(db.engine) as statements:
+            response = client.post(
+                "/api/auth/login", json={"email": email, "password": seed_data.DEFAULT_PASSWORD}
+            )
+        assert response.status_code == 200, response.get_json()
+        token = response.get_json()["tokens"]["access_token"]
+        result[profile] = ({"Authorization": f"Bearer {token}"}, statements)
+    return result
+
+
+def _check(name, statements, large_tables):
+    assert statements, f"{name} : aucune requête capturée"
+    failures = []
+    with db.engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = explain(connection, statement, parameters)
+            seq_scans, recommendations = analyze_plan(plan, large_tables, INDEXES)
+            record_recommendations(name, recommendations)
+            if seq_scans:
+                failures.append(
+                    f"Seq Scan sur {', '.join(seq_scans)} :\n{statement}\n"
+                    + "\n".join(recommendations)
+                )
+    assert not failures, f"{name}\n\n" + "\n\n".join(failures)
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_login_lookup(logins, large_tables, profile):
+    _, statements = logins[profile]
+    _check(f"login[{profile}]", statements, large_tables)
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+@pytest.mark.parametrize("name", list(ENDPOINTS))
+def test_endpoint_plans(plan_app, logins, large_tables, profile, name):
+    headers, _ = logins[profile]
+    client = plan_app.test_client()
+    with capture_selects(db.engine) as statements:
+        response = client.get(ENDPOINTS[name], headers=headers)
+    assert response.status_code == 200, response.get_json()
+    # Le lookup du jeton (token_required) fait partie des requêtes capturées
+    _check(f"{name}[{profile}]", statements, large_tables)
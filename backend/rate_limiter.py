@@ -22,6 +22,10 @@ from functools import wraps
 from flask import request, jsonify, g, current_app
 import logging
 
+from app.services.redis_client import timed
+from metrics import RATE_LIMIT_DECISIONS
+from tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -153,24 +157,30 @@ class RateLimiter:
         endpoint = self._normalize_endpoint(request.path)
         config = self._get_rate_limit_config(endpoint)
 
+        # Un seul aller-retour (pipeline) : état de blocage + compteur de fenêtre,
+        # créé atomiquement AVEC son TTL (SET NX EX) puis incrémenté (INCR).
         block_key = f"{self.BLOCK_PREFIX}{client_id}:{endpoint}"
-        block_ttl = self.redis.ttl(block_key)
+        count_key = f"{self.COUNT_PREFIX}{client_id}:{endpoint}"
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.ttl(block_key)
+        pipe.set(count_key, 0, nx=True, ex=config["window"])
+        pipe.incr(count_key)
+        block_ttl, _, count = timed("rate_limit", pipe.execute)
         if block_ttl and block_ttl > 0:
+            # Client bloqué : la requête refusée ne compte pas dans la fenêtre
+            self.redis.decr(count_key)
+            RATE_LIMIT_DECISIONS.labels("blocked").inc()
             return False, {
                 "allowed": False,
                 "reason": "blocked",
                 "retry_after": int(block_ttl),
             }
 
-        # Compteur de fenêtre : création atomique AVEC TTL (SET NX EX) puis INCR.
-        count_key = f"{self.COUNT_PREFIX}{client_id}:{endpoint}"
-        self.redis.set(count_key, 0, nx=True, ex=config["window"])
-        count = self.redis.incr(count_key)
-
         if count > config["requests"]:
             # Bloquer le client (SET EX atomique)
             self.redis.set(block_key, 1, ex=config["block_duration"])
             logger.warning("Rate limit exceeded for %s on %s", client_id, endpoint)
+            RATE_LIMIT_DECISIONS.labels("exceeded").inc()
             return False, {
                 "allowed": False,
                 "reason": "rate_limit_exceeded",
@@ -179,6 +189,7 @@ class RateLimiter:
                 "retry_after": config["block_duration"],
             }
 
+        RATE_LIMIT_DECISIONS.labels("allowed").inc()
         return True, {
             "allowed": True,
             "remaining": max(0, config["requests"] - count),
@@ -223,7 +234,10 @@ def rate_limit_middleware(f):
 
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        allowed, info = current_app.rate_limiter.is_allowed(request)
+        with span("rate_limit") as span_:
+            allowed, info = current_app.rate_limiter.is_allowed(request)
+            if span_ is not None:
+                span_.set_attribute("rate_limit.allowed", allowed)
 
         if not allowed:
             response = jsonify(
@@ -120,10 +120,11 @@ def setup_security_headers(app: Flask):
     # Configuration HTTPS forcée pour la production
     @app.before_request
     def force_https():
-        """Forcer HTTPS en production (sauf /health, appelé en HTTP par le healthcheck)."""
+        """Forcer HTTPS en production (sauf /health et /metrics, appelés en HTTP
+        depuis le réseau interne : healthcheck, scraper Prometheus)."""
         from flask import request, redirect
 
-        if request.path == "/health":  # exclusion sur le chemin EXACT
+        if request.path in ("/health", "/metrics"):  # exclusion sur le chemin EXACT
             return None
         # Derrière Nginx (proxy HTTP), X-Forwarded-Proto=https compte comme sécurisé
         is_secure = (
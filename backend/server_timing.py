@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Décomposition de la latence par phase : en-tête `Server-Timing` et journal
+des requêtes lentes.
+
+Quand un login prend 900 ms en production, il faut savoir qui a consommé le
+temps. Chaque requête accumule la durée (et le nombre d'appels) de ses phases :
+
+- `argon2` : dérivations Argon2id (`EncryptionService.derive_kek`) ;
+- `db` : exécution SQL (événements du curseur SQLAlchemy) ;
+- `commit` : COMMIT de fin de requête (unité de travail, audit compris) ;
+- `redis` : allers-retours Redis (session, refresh, rate limiting) ;
+- `zxcvbn` : estimation de robustesse ;
+- `sanitize` : nettoyage bleach des entrées ;
+- `serialize` : sérialisation des réponses (JSON, MessagePack, CBOR) ;
+- `total` : durée de la requête jusqu'à l'en-tête.
+
+Les phases peuvent se recouvrir : le COMMIT inclut les INSERT de son flush,
+aussi comptés dans `db`.
+
+En-tête `Server-Timing` (`argon2;dur=152.3;desc="1x", db;dur=2.1;desc="3x"...`)
+seulement si SERVER_TIMING_ENABLED, ou si la requête présente l'en-tête
+`X-Server-Timing` égal à SERVER_TIMING_TOKEN (diagnostic ponctuel en
+production) : les durées par phase renseigneraient sinon un attaquant (ex.
+existence d'un compte). Le journal des requêtes lentes (au-delà de
+SLOW_REQUEST_MS, 0 = désactivé) est toujours actif.
+
+Coût : deux `perf_counter()` et une mise à jour de dictionnaire par phase.
+"""
+
+import hmac
+import logging
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+def _phases():
+    if has_request_context():
+        return g.get("_timing_phases")
+    return None
+
+
+def record(name, seconds):
+    """Ajouter `seconds` à la phase `name` de la requête courante (sans effet hors requête)."""
+    phases = _phases()
+    if phases is not None:
+        entry = phases.get(name)
+        if entry is None:
+            phases[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+
+@contextmanager
+def phase(name):
+    """Chronométrer le bloc dans la phase `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _sql_start(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_timing_sql", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _sql_end(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_timing_sql")
+    if starts:
+        record("db", time.perf_counter() - starts.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _sql_error(exception_context):
+    # Instruction en échec (IntegrityError...) : pas d'after_cursor_execute, le
+    # départ empilé fausserait la phase db de la requête suivante sur cette
+    # connexion du pool. Le temps passé compte quand même.
+    connection = exception_context.connection
+    starts = connection.info.get("_timing_sql") if connection is not None else None
+    if starts:
+        record("db", time.perf_counter() - starts.pop())
+
+
+def format_header(phases, total):
+    """Valeur de l'en-tête Server-Timing (durées en millisecondes)."""
+    metrics = [
+        f'{name};dur={seconds * 1000:.1f};desc="{count}x"'
+        for name, (seconds, count) in sorted(phases.items(), key=lambda item: -item[1][0])
+    ]
+    metrics.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(metrics)
+
+
+def _header_requested(app):
+    if app.config.get("SERVER_TIMING_ENABLED"):
+        return True
+    token = app.config.get("SERVER_TIMING_TOKEN")
+    supplied = request.headers.get("X-Server-Timing")
+    return bool(token and supplied) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def setup_server_timing(app):
+    """Configurer l'accumulation des phases, l'en-tête et le journal des lenteurs.
+
+    Les sous-requêtes d'un lot (/api/batch) sont dispatchées sans les hooks de
+    requête : leurs phases s'ajoutent à celles du lot.
+    """
+
+    @app.before_request
+    def start_server_timing():
+        g._timing_phases = {}
+        g._timing_start = time.perf_counter()
+
+    @app.after_request
+    def emit_server_timing(response):
+        start = g.pop("_timing_start", None)
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        phases = g.pop("_timing_phases", None) or {}
+
+        if _header_requested(app):
+            response.headers["Server-Timing"] = format_header(phases, total)
+
+        slow_ms = app.config.get("SLOW_REQUEST_MS", 0)
+        if slow_ms and total * 1000 >= slow_ms:
+            rule = request.url_rule
+            logger.warning(
+                "Requête lente %s %s → %s en %.1f ms (%s)",
+                request.method,
+                rule.rule if rule is not None else request.path,
+                response.status_code,
+                total * 1000,
+                ", ".join(
+                    f"{name}={seconds * 1000:.1f}ms/{count}"
+                    for name, (seconds, count) in phases.items()
+                )
+                or "aucune phase",
+            )
+        return response
+
+    return app
@@ -13,6 +13,8 @@ import importlib.util
 import os
 import sys
 
+import pytest
+
 # Paramètres Argon2id RÉDUITS pour la vitesse des tests UNIQUEMENT.
 # Cloisonnement : ces valeurs ne sont posées que par ce conftest (chargé par
 # pytest seulement) via setdefault. La production ne définit JAMAIS ces variables
@@ -31,3 +33,20 @@ _spec = importlib.util.spec_from_file_location(
 app_entry = importlib.util.module_from_spec(_spec)
 sys.modules["app_entry"] = app_entry
 _spec.loader.exec_module(app_entry)
+
+
+@pytest.fixture
+def count_queries(app):
+    """Compteur SQL + Redis lié à l'app du module de test (voir query_counter).
+
+        with count_queries() as counts:
+            client.get("/api/passwords/", headers=auth)
+        assert counts.sql <= 2
+    """
+    from extensions import db
+    from query_counter import count_queries as _count_queries
+
+    def factory():
+        return _count_queries(db.engine, app.redis)
+
+    return factory
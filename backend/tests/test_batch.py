@@ -0,0 +1,154 @@
+"""
+Multiplexeur /api/batch : authentification (JWT, session, utilisateur) une
+seule fois par lot, statut par sous-requête, coût de rate limiting égal à la
+somme des sous-requêtes, aucun état d'authentification qui survive au lot.
+"""
+
+import json
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from app.models import User
+from app.services.encryption_service import EncryptionService
+from app.services.jwt_service import JWTService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+DASHBOARD = [
+    {"id": "profile", "path": "/api/users/profile"},
+    {"id": "categories", "path": "/api/passwords/categories"},
+    {"id": "presets", "path": "/api/passwords/presets"},
+    {"id": "list", "path": "/api/passwords/?page=1&per_page=20"},
+    {"id": "stats", "path": "/api/passwords/stats"},
+]
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email="batch@example.com", username="batch")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": "batch@example.com", "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _batch(client, headers, requests):
+    return client.post(
+        "/api/batch",
+        headers=headers,
+        data=json.dumps({"requests": requests}),
+        content_type="application/json",
+    )
+
+
+class TestBatch:
+    def test_dashboard_in_one_call_with_single_auth(self, client, auth, monkeypatch):
+        decodes = []
+        original = JWTService.decode_token
+        monkeypatch.setattr(
+            JWTService,
+            "decode_token",
+            staticmethod(lambda token: decodes.append(token) or original(token)),
+        )
+
+        r = _batch(client, auth, DASHBOARD)
+        assert r.status_code == 200
+        responses = json.loads(r.data)["responses"]
+        assert [s["id"] for s in responses] == [s["id"] for s in DASHBOARD]
+        assert all(s["status"] == 200 for s in responses)
+        assert responses[0]["body"]["user"]["email"] == "batch@example.com"
+        assert "total" in responses[4]["body"]
+        assert len(decodes) == 1
+
+    def test_writes_and_per_sub_request_status(self, client, auth):
+        r = _batch(
+            client,
+            auth,
+            [
+                {
+                    "method": "POST",
+                    "path": "/api/passwords/",
+                    "body": {"site_name": "s", "username": "u", "password": "Xq9#Lm2$Tz7!"},
+                },
+                {"method": "POST", "path": "/api/passwords/", "body": {"site_name": "s"}},
+                {"path": "/api/passwords/does-not-exist-1234"},
+                {"path": "/api/nowhere"},
+                {"method": "POST", "path": "/api/auth/logout"},
+                {"method": "POST", "path": "/api/batch", "body": {"requests": []}},
+                {"path": "/api/passwords/stats"},
+            ],
+        )
+        statuses = [s["status"] for s in json.loads(r.data)["responses"]]
+        assert statuses == [201, 400, 404, 404, 400, 400, 200]
+        assert json.loads(r.data)["responses"][6]["body"]["total"] == 1
+
+    def test_rate_limit_cost_is_sum_of_parts(self, app, client, auth):
+        app.rate_limiter.limits["/api/passwords/*"] = {
+            "requests": 3,
+            "window": 60,
+            "block_duration": 30,
+        }
+        r = _batch(client, auth, [{"path": "/api/passwords/stats"}] * 4)
+        assert [s["status"] for s in json.loads(r.data)["responses"]] == [200, 200, 200, 429]
+        # Le quota consommé par le lot s'applique aux appels directs suivants
+        assert client.get("/api/passwords/stats", headers=auth).status_code == 429
+
+    def test_auth_required_and_not_leaked(self, client, auth):
+        assert _batch(client, {}, DASHBOARD).status_code == 401
+        assert _batch(client, auth, DASHBOARD).status_code == 200
+        assert client.get("/api/passwords/stats").status_code == 401
+
+    def test_limits(self, app, client, auth):
+        assert _batch(client, auth, []).status_code == 400
+        app.config["BATCH_MAX_REQUESTS"] = 2
+        assert _batch(client, auth, DASHBOARD).status_code == 400
+
+    def test_secret_sub_response_disables_compression(self, app, client, auth):
+        app.config["COMPRESSION_MIN_SIZE"] = 0
+        created = _batch(
+            client,
+            auth,
+            [{
+                "method": "POST",
+                "path": "/api/passwords/",
+                "body": {"site_name": "s", "username": "u", "password": "Xq9#Lm2$Tz7!"},
+            }],
+        )
+        eid = json.loads(created.data)["responses"][0]["body"]["password"]["id"]
+        headers = dict(auth, **{"Accept-Encoding": "gzip"})
+
+        r = _batch(client, headers, DASHBOARD)
+        assert r.headers.get("Content-Encoding") == "gzip"
+
+        r = _batch(client, headers, DASHBOARD + [{"id": "reveal", "path": f"/api/passwords/{eid}"}])
+        assert "Content-Encoding" not in r.headers
+        assert json.loads(r.data)["responses"][-1]["body"]["password"] == "Xq9#Lm2$Tz7!"
@@ -0,0 +1,47 @@
+"""
+Comparaison des microbenchmarks avec la baseline : seuil relatif, écart
+absolu minimal (bruit), benchmarks nouveaux ou disparus, code de sortie.
+"""
+
+import json
+
+import pytest
+
+from benchmarks.compare import compare, main
+
+US = 1e-6
+
+
+def _results(**timings):
+    return {
+        "benchmarks": [
+            {"name": name, "stats": {"min": seconds, "median": seconds * 1.1}}
+            for name, seconds in timings.items()
+        ]
+    }
+
+
+def test_flags_regressions_beyond_threshold():
+    baseline = {"encrypt": 20 * US, "touch": 50 * US, "normalize": 2 * US, "gone": 1 * US}
+    current = {"encrypt": 30 * US, "touch": 40 * US, "normalize": 2.9 * US, "new": 1 * US}
+    rows, regressions = compare(baseline, current, threshold=0.25, min_delta=1 * US)
+    status = {row[0]: row[4] for row in rows}
+    assert regressions == ["encrypt"]
+    # +45 % mais moins d'une microseconde d'écart : bruit
+    assert status["normalize"] == "ok"
+    assert status["touch"] == "ok"
+    assert (status["new"], status["gone"]) == ("nouveau", "absent")
+
+
+def test_save_then_compare(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    first = tmp_path / "first.json"
+    first.write_text(json.dumps(_results(encrypt=20 * US, touch=50 * US)))
+    assert main([str(first), "--baseline", str(baseline), "--save"]) == 0
+    assert json.loads(baseline.read_text())["median_seconds"]["touch"] == pytest.approx(55 * US)
+
+    slower = tmp_path / "slower.json"
+    slower.write_text(json.dumps(_results(encrypt=40 * US, touch=50 * US)))
+    assert main([str(first), "--baseline", str(baseline)]) == 0
+    assert main([str(slower), "--baseline", str(baseline)]) == 1
+    assert main([str(slower), "--baseline", str(tmp_path / "missing.json")]) == 2
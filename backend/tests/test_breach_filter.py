@@ -0,0 +1,150 @@
+"""
+Filtre de Bloom hors ligne des mots de passe compromis : format mmap, absence
+de faux négatifs, taux de faux positifs borné, et intégration au register, à
+l'évaluation de force et à l'audit du coffre (/api/passwords/breach-audit).
+"""
+
+import json
+import secrets
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from app.models import User
+from app.services import breach_filter
+from app.services.breach_filter import BreachFilter, optimal_parameters
+from app.services.encryption_service import EncryptionService
+from app.services.password_generator import PasswordGenerator
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+BREACHED = ["Tr0ub4dor&3-leaked", "Correct-Horse-99!", "Sommer2024!Berlin"]
+
+
+@pytest.fixture
+def bloom_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "breach.bloom")
+    corpus = BREACHED + [f"leaked-{i}" for i in range(5000)]
+    BreachFilter.build(iter(corpus), path, len(corpus), fp_rate=1e-3)
+    monkeypatch.setenv("BREACH_FILTER_PATH", path)
+    monkeypatch.setattr(breach_filter, "_filters", {})
+    return path
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email="breach@example.com", username="breach")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": "breach@example.com", "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+class TestBloomFilter:
+    def test_no_false_negatives_and_bounded_fp_rate(self, tmp_path):
+        path = str(tmp_path / "f.bloom")
+        members = [f"member-{i}" for i in range(20000)]
+        assert BreachFilter.build(iter(members), path, len(members), 1e-3) == 20000
+
+        bloom = BreachFilter(path)
+        try:
+            assert all(m in bloom for m in members)
+            probes = [secrets.token_hex(8) for _ in range(20000)]
+            measured = sum(p in bloom for p in probes) / len(probes)
+            assert measured < 5e-3
+            assert bloom.expected_fp_rate() == pytest.approx(1e-3, rel=0.2)
+        finally:
+            bloom.close()
+
+    def test_rejects_foreign_or_truncated_file(self, tmp_path):
+        bad = tmp_path / "bad.bloom"
+        bad.write_bytes(b"NOTBLOOM" + bytes(64))
+        with pytest.raises(ValueError):
+            BreachFilter(str(bad))
+
+        path = str(tmp_path / "trunc.bloom")
+        BreachFilter.build(iter(["a"]), path, 1000)
+        with open(path, "r+b") as fh:
+            fh.truncate(64)
+        with pytest.raises(ValueError):
+            BreachFilter(path)
+
+    def test_optimal_parameters(self):
+        num_bits, num_hashes = optimal_parameters(1_000_000, 1e-3)
+        assert 14_000_000 < num_bits < 14_500_000
+        assert num_hashes == 10
+
+    def test_disabled_without_path(self, monkeypatch):
+        monkeypatch.delenv("BREACH_FILTER_PATH", raising=False)
+        assert breach_filter.get_breach_filter() is None
+        assert breach_filter.is_breached(BREACHED[0]) is False
+
+
+class TestIntegration:
+    def test_strength_flags_breached(self, bloom_path):
+        result = PasswordGenerator.evaluate_strength(BREACHED[2])
+        assert result["breached"] is True
+        assert result["strength"] == 1
+        assert PasswordGenerator.evaluate_strength(STRONG_TEST_PASSWORD)["breached"] is False
+
+    def test_register_rejects_breached_master_password(self, bloom_path, client):
+        r = client.post(
+            "/api/auth/register",
+            data=json.dumps({"email": "new@example.com", "password": BREACHED[1]}),
+            content_type="application/json",
+        )
+        assert r.status_code == 400
+        assert "breached" in json.loads(r.data)["error"]
+
+    def test_breach_audit_reports_breached_entries(self, bloom_path, client, auth):
+        ids = []
+        for site, password in (("a.com", BREACHED[0]), ("b.com", STRONG_TEST_PASSWORD)):
+            r = client.post(
+                "/api/passwords/",
+                headers=auth,
+                data=json.dumps({"site_name": site, "username": "u", "password": password}),
+                content_type="application/json",
+            )
+            assert r.status_code == 201
+            ids.append(json.loads(r.data)["password"]["id"])
+
+        r = client.get("/api/passwords/breach-audit", headers=auth)
+        assert r.status_code == 200
+        audit = json.loads(r.data)
+        assert audit["checked"] == 2
+        assert audit["breached_count"] == 1
+        assert audit["breached"][0]["id"] == ids[0]
+
+    def test_breach_audit_disabled(self, client, auth, monkeypatch):
+        monkeypatch.delenv("BREACH_FILTER_PATH", raising=False)
+        r = client.get("/api/passwords/breach-audit", headers=auth)
+        assert r.status_code == 503
+        assert json.loads(r.data)["code"] == "breach_filter_disabled"
@@ -0,0 +1,197 @@
+"""
+Opérations groupées (PATCH / DELETE /api/passwords/bulk) : portée par ids ou
+filtre restreinte à l'utilisateur, instruction unique dans une transaction,
+un seul enregistrement d'audit récapitulatif, résultat par id.
+"""
+
+import json
+
+import fakeredis
+import pytest
+from sqlalchemy import event
+
+from app_entry import create_app, db
+from app.models import AuditLog, Password, PasswordTombstone, User
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        for name in ("bulk", "other"):
+            user = User(email=f"{name}@example.com", username=name)
+            user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+                STRONG_TEST_PASSWORD
+            )
+            db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _login(client, email):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": email, "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+@pytest.fixture
+def auth(client):
+    return _login(client, "bulk@example.com")
+
+
+def _create(client, auth, site, category=None):
+    body = {"site_name": site, "username": "u", "password": "Xq9#Lm2$Tz7!"}
+    if category:
+        body["category"] = category
+    r = client.post(
+        "/api/passwords/", headers=auth, data=json.dumps(body), content_type="application/json"
+    )
+    assert r.status_code == 201
+    return json.loads(r.data)["password"]["id"]
+
+
+def _bulk(client, auth, method, body):
+    return client.open(
+        "/api/passwords/bulk",
+        method=method,
+        headers=auth,
+        data=json.dumps(body),
+        content_type="application/json",
+    )
+
+
+class TestBulkUpdate:
+    def test_ids_with_per_id_results_and_single_audit(self, app, client, auth):
+        a = _create(client, auth, "a")
+        b = _create(client, auth, "b")
+        foreign = _create(client, _login(client, "other@example.com"), "theirs")
+
+        r = _bulk(
+            client, auth, "PATCH",
+            {"ids": [a, b, foreign, "missing"], "set": {"is_favorite": True, "priority": 2}},
+        )
+        assert r.status_code == 200
+        body = json.loads(r.data)
+        assert body["updated"] == 2
+        assert body["results"] == [
+            {"id": a, "status": "updated"},
+            {"id": b, "status": "updated"},
+            {"id": foreign, "status": "not_found"},
+            {"id": "missing", "status": "not_found"},
+        ]
+        with app.app_context():
+            assert Password.query.filter_by(is_favorite=True).count() == 2
+            assert not db.session.get(Password, foreign).is_favorite
+            audits = AuditLog.query.filter_by(action="BULK_UPDATE_PASSWORDS").all()
+            assert len(audits) == 1
+            assert json.loads(audits[0].details)["count"] == 2
+
+    def test_category_merge_by_filter(self, app, client, auth):
+        _create(client, auth, "a", "Travail")
+        _create(client, auth, "b", "Travail")
+        _create(client, auth, "c", "Pro")
+        _create(client, auth, "d", "Perso")
+
+        r = _bulk(
+            client, auth, "PATCH",
+            {"filter": {"category": "Travail"}, "set": {"category": "Pro"}},
+        )
+        assert json.loads(r.data)["updated"] == 2
+        r = client.get("/api/passwords/categories", headers=auth)
+        names = json.dumps(json.loads(r.data))
+        assert "Travail" not in names and "Pro" in names
+
+    def test_rejects_bad_scope_and_fields(self, client, auth):
+        a = _create(client, auth, "a")
+        for body in (
+            {"set": {"is_favorite": True}},  # ni ids ni filtre
+            {"ids": [a], "filter": {"category": "x"}, "set": {"is_favorite": True}},
+            {"ids": [a], "set": {"password": "x"}},
+            {"ids": [a], "set": {"priority": 9}},
+            {"filter": {"notes": "x"}, "set": {"is_favorite": True}},
+            {"ids": [], "set": {"is_favorite": True}},
+        ):
+            assert _bulk(client, auth, "PATCH", body).status_code == 400
+
+    def test_scope_limit(self, app, client, auth):
+        app.config["BULK_MAX_ITEMS"] = 2
+        for site in "abc":
+            _create(client, auth, site, "Travail")
+        r = _bulk(
+            client, auth, "PATCH",
+            {"filter": {"category": "Travail"}, "set": {"is_favorite": True}},
+        )
+        assert r.status_code == 400
+
+    def test_category_rename_is_one_uncapped_update(self, app, client, auth):
+        app.config["BULK_MAX_ITEMS"] = 2
+        for site in "abc":
+            _create(client, auth, site, "Travail")
+        other = _login(client, "other@example.com")
+        _create(client, other, "theirs", "Travail")
+
+        statements = []
+        with app.app_context():
+            engine = db.engine
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement.split()[0])
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            r = _bulk(
+                client, auth, "PATCH",
+                {"filter": {"category": "Travail"}, "set": {"category": "Pro"}},
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        assert r.status_code == 200
+        assert json.loads(r.data) == {"updated": 3, "results": []}
+        assert statements.count("UPDATE") == 1
+        with app.app_context():
+            assert Password.query.filter_by(category="Pro").count() == 3
+            assert Password.query.filter_by(category="Travail").count() == 1
+
+    def test_max_strength_rejects_boolean(self, client, auth):
+        _create(client, auth, "a")
+        r = _bulk(client, auth, "PATCH", {"filter": {"max_strength": True}, "set": {"priority": 1}})
+        assert r.status_code == 400
+
+
+class TestBulkDelete:
+    def test_delete_records_tombstones_in_same_transaction(self, app, client, auth):
+        a = _create(client, auth, "a", "Old")
+        b = _create(client, auth, "b", "Old")
+        keep = _create(client, auth, "c", "New")
+
+        r = _bulk(client, auth, "DELETE", {"filter": {"category": "Old"}})
+        assert r.status_code == 200
+        body = json.loads(r.data)
+        assert body["deleted"] == 2
+        assert {res["id"] for res in body["results"]} == {a, b}
+        with app.app_context():
+            assert [p.id for p in Password.query.all()] == [keep]
+            assert {t.id for t in PasswordTombstone.query.all()} == {a, b}
+            assert AuditLog.query.filter_by(action="BULK_DELETE_PASSWORDS").count() == 1
+
+        r = client.get("/api/passwords/changes", headers=auth)
+        assert {t["id"] for t in json.loads(r.data)["deleted"]} == {a, b}
@@ -0,0 +1,151 @@
+"""
+Compression des réponses : négociation Accept-Encoding, seuil minimal, mode
+flux (morceau par morceau), exclusion des routes qui renvoient des secrets.
+"""
+
+import gzip
+import json
+import zlib
+
+import fakeredis
+import pytest
+from flask import Response, stream_with_context
+from werkzeug.datastructures import Accept
+
+import compression
+from app_entry import create_app, db
+from app.models import User
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+GZIP = {"Accept-Encoding": "gzip, deflate"}
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+
+    @app.route("/_test/stream")
+    def stream():
+        def rows():
+            for i in range(50):
+                yield json.dumps({"row": i, "pad": "x" * 40}) + "\n"
+
+        return Response(stream_with_context(rows()), mimetype="application/x-ndjson")
+
+    with app.app_context():
+        db.create_all()
+        user = User(email="gz@example.com", username="gz")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": "gz@example.com", "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _create(client, auth, count):
+    for i in range(count):
+        r = client.post(
+            "/api/passwords/",
+            headers=auth,
+            data=json.dumps(
+                {"site_name": f"s{i}", "username": "u", "password": "Xq9#Lm2$Tz7!"}
+            ),
+            content_type="application/json",
+        )
+        assert r.status_code == 201
+    return json.loads(r.data)["password"]["id"]
+
+
+class TestNegotiation:
+    def test_best_match(self, monkeypatch):
+        assert compression.negotiate_encoding(Accept([("gzip", 1)])) == "gzip"
+        assert compression.negotiate_encoding(Accept([("*", 1)])) == "gzip"
+        assert compression.negotiate_encoding(Accept([("identity", 1)])) is None
+        assert compression.negotiate_encoding(Accept([("gzip", 0)])) is None
+        monkeypatch.setattr(compression, "brotli", object())
+        assert compression.negotiate_encoding(Accept([("gzip", 1), ("br", 1)])) == "br"
+        assert compression.negotiate_encoding(Accept([("gzip", 1), ("br", 0.5)])) == "gzip"
+
+
+class TestCompression:
+    def test_large_list_is_gzipped(self, client, auth):
+        _create(client, auth, 10)
+        plain = client.get("/api/passwords/", headers=auth)
+        r = client.get("/api/passwords/", headers={**auth, **GZIP})
+        assert "Content-Encoding" not in plain.headers
+        assert r.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in r.headers["Vary"]
+        assert int(r.headers["Content-Length"]) == len(r.data) < len(plain.data)
+        assert gzip.decompress(r.data) == plain.data
+
+    def test_below_threshold_untouched(self, app, client, auth):
+        r = client.get("/api/passwords/categories", headers={**auth, **GZIP})
+        assert "Content-Encoding" not in r.headers
+        assert "Accept-Encoding" in r.headers["Vary"]
+        app.config["COMPRESSION_MIN_SIZE"] = 0
+        r = client.get("/api/passwords/categories", headers={**auth, **GZIP})
+        assert r.headers["Content-Encoding"] == "gzip"
+
+    def test_streamed_response_compressed_per_chunk(self, client):
+        plain = client.get("/_test/stream")
+        r = client.get("/_test/stream", headers=GZIP)
+        assert r.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in r.headers
+        assert gzip.decompress(r.data) == plain.data
+
+        # Chaque morceau est décodable dès sa réception (flush par morceau)
+        r = client.get("/_test/stream", headers=GZIP, buffered=False)
+        decoder = zlib.decompressobj(31)
+        first = decoder.decompress(next(iter(r.response)))
+        r.close()
+        assert json.loads(first.decode().splitlines()[0])["row"] == 0
+
+    def test_secret_routes_opted_out(self, app, client, auth):
+        app.config["COMPRESSION_MIN_SIZE"] = 0
+        entry_id = _create(client, auth, 1)
+        login = client.post(
+            "/api/auth/login",
+            headers=GZIP,
+            data=json.dumps({"email": "gz@example.com", "password": STRONG_TEST_PASSWORD}),
+            content_type="application/json",
+        )
+        entry = client.get(f"/api/passwords/{entry_id}", headers={**auth, **GZIP})
+        generated = client.post(
+            "/api/passwords/generate", headers={**auth, **GZIP}, json={"length": 20}
+        )
+        for r in (login, entry, generated):
+            assert r.status_code == 200
+            assert "Content-Encoding" not in r.headers
+
+    def test_disabled_by_config(self, monkeypatch):
+        from config import TestingConfig
+
+        monkeypatch.setattr(TestingConfig, "COMPRESSION_ENABLED", False)
+        app = create_app("testing")
+        hooks = [f.__name__ for f in app.after_request_funcs[None]]
+        assert "compress_after_request" not in hooks
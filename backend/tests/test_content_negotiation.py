@@ -0,0 +1,164 @@
+"""
+Négociation MessagePack/CBOR : même document que le JSON (horodatages natifs
+en binaire), mise en page colonnaire, transmission au multiplexeur /api/batch,
+JSON par défaut.
+"""
+
+import json
+from datetime import datetime, timezone
+
+import fakeredis
+import pytest
+from werkzeug.datastructures import MIMEAccept
+
+import content_negotiation
+from app_entry import create_app, db
+from app.models import User
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from content_negotiation import CBOR, JSON, MSGPACK, decode, negotiate_format
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email="bin@example.com", username="bin")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": "bin@example.com", "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _create(client, auth, site, **extra):
+    body = dict(site_name=site, username="u", password="Xq9#Lm2$Tz7!", **extra)
+    r = client.post(
+        "/api/passwords/", headers=auth, data=json.dumps(body), content_type="application/json"
+    )
+    assert r.status_code == 201
+    return json.loads(r.data)["password"]["id"]
+
+
+def _to_iso(value):
+    """Horodatage binaire (datetime UTC) → forme ISO naïve du JSON."""
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+    return value
+
+
+def _same_document(binary_rows, json_rows):
+    return [{k: _to_iso(v) for k, v in row.items()} for row in binary_rows] == json_rows
+
+
+class TestNegotiation:
+    def test_negotiate_format(self):
+        assert negotiate_format(MIMEAccept()) == JSON
+        assert negotiate_format(MIMEAccept([("*/*", 1)])) == JSON
+        assert negotiate_format(MIMEAccept([(MSGPACK, 1)])) == MSGPACK
+        assert negotiate_format(MIMEAccept([("application/x-msgpack", 1)])) == MSGPACK
+        assert negotiate_format(MIMEAccept([(CBOR, 1), (JSON, 0.5)])) == CBOR
+        assert negotiate_format(MIMEAccept([("text/html", 1)])) == JSON
+
+    def test_json_fallback_without_module(self, monkeypatch):
+        monkeypatch.setattr(content_negotiation, "msgpack", None)
+        assert negotiate_format(MIMEAccept([(MSGPACK, 1)])) == JSON
+
+
+class TestBinaryEndpoints:
+    @pytest.mark.parametrize("mimetype", [MSGPACK, CBOR])
+    def test_list_matches_json(self, client, auth, mimetype):
+        _create(client, auth, "a", tags=["x"], expires_at="2030-01-01T00:00:00")
+        _create(client, auth, "b")
+        expected = json.loads(client.get("/api/passwords/", headers=auth).data)
+
+        r = client.get("/api/passwords/", headers={**auth, "Accept": mimetype})
+        assert r.status_code == 200 and r.mimetype == mimetype
+        assert "Accept" in r.headers["Vary"]
+        body = decode(r.data, mimetype)
+        assert isinstance(body["passwords"][0]["created_at"], datetime)
+        assert _same_document(body["passwords"], expected["passwords"])
+        assert body["pagination"] == expected["pagination"]
+        assert len(r.data) < len(json.dumps(expected))
+
+    def test_columnar_layout(self, client, auth):
+        for site in "abc":
+            _create(client, auth, site)
+        rows = json.loads(
+            client.get("/api/passwords/?sort=site_name&order=asc", headers=auth).data
+        )["passwords"]
+
+        url = "/api/passwords/?sort=site_name&order=asc&fields=site_name,tags&layout=columnar"
+        columns = json.loads(client.get(url, headers=auth).data)["passwords"]
+        assert columns == {
+            "id": [row["id"] for row in rows],
+            "site_name": ["a", "b", "c"],
+            "tags": [[], [], []],
+        }
+        r = client.get(url, headers={**auth, "Accept": MSGPACK})
+        assert decode(r.data, MSGPACK)["passwords"] == columns
+        assert client.get("/api/passwords/?layout=diagonal", headers=auth).status_code == 400
+
+    def test_changes(self, client, auth):
+        keep = _create(client, auth, "keep")
+        gone = _create(client, auth, "gone")
+        client.delete(f"/api/passwords/{gone}", headers=auth)
+        expected = json.loads(client.get("/api/passwords/changes", headers=auth).data)
+
+        r = client.get("/api/passwords/changes", headers={**auth, "Accept": CBOR})
+        body = decode(r.data, CBOR)
+        assert _same_document(body["updated"], expected["updated"])
+        assert _same_document(body["deleted"], expected["deleted"])
+        assert body["has_more"] is expected["has_more"] is False
+        assert body["sync_token"]
+
+        r = client.get("/api/passwords/changes?layout=columnar", headers=auth)
+        body = json.loads(r.data)
+        assert body["updated"]["id"] == [keep] and body["deleted"]["id"] == [gone]
+
+    def test_batch(self, client, auth):
+        _create(client, auth, "a")
+        r = client.post(
+            "/api/batch",
+            headers={**auth, "Accept": MSGPACK},
+            data=json.dumps(
+                {
+                    "requests": [
+                        {"path": "/api/passwords/?layout=columnar"},
+                        {"path": "/api/passwords/stats"},
+                    ]
+                }
+            ),
+            content_type="application/json",
+        )
+        assert r.mimetype == MSGPACK
+        listing, stats = decode(r.data, MSGPACK)["responses"]
+        assert listing["status"] == 200
+        assert listing["body"]["passwords"]["site_name"] == ["a"]
+        assert isinstance(listing["body"]["passwords"]["created_at"][0], datetime)
+        assert stats["body"]["total"] == 1
@@ -116,6 +116,20 @@ class TestCryptoPrimitives:
         assert len(wraps) == 5
         assert len(entries) == 5
 
+    def test_encrypt_entries_batch(self):
+        """Chemin par lot : format v1, nonces distincts, AAD de chaque entrée liée."""
+        vmk = E.generate_vmk()
+        items = [(f"secret-{i}", f"user-A:entry-{i}".encode()) for i in range(20)]
+        tokens = E.encrypt_entries(items, vmk)
+        assert len({self._nonce(t) for t in tokens}) == 20
+        for token, (plaintext, aad) in zip(tokens, items):
+            assert not E.is_legacy_entry(token)
+            assert E.decrypt_entry(token, vmk, aad) == plaintext
+        with pytest.raises(ValueError):
+            E.decrypt_entry(tokens[0], vmk, items[1][1])  # AAD d'une autre entrée
+        with pytest.raises(ValueError):
+            E.encrypt_entries([("", None)], vmk)
+
 
 import json
 import time
@@ -0,0 +1,188 @@
+"""
+Autofill par domaine (/api/passwords/match) : domaine enregistrable dérivé de
+site_url à l'écriture via la Public Suffix List embarquée, lookup indexé sur
+(user_id, site_domain) et classement par spécificité d'hôte puis de chemin.
+"""
+
+import json
+import time
+import uuid
+from datetime import datetime
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from app.models import User, Password
+from app.services.domain_service import (
+    backfill_site_domains,
+    registrable_domain,
+    site_domain,
+)
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email="match@example.com", username="match")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": "match@example.com", "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _create(client, auth, site, url):
+    r = client.post(
+        "/api/passwords/",
+        headers=auth,
+        data=json.dumps(
+            {"site_name": site, "site_url": url, "username": "u", "password": "Xq9#Lm2$Tz7!"}
+        ),
+        content_type="application/json",
+    )
+    assert r.status_code == 201
+    return json.loads(r.data)["password"]["id"]
+
+
+def _match(client, auth, url):
+    r = client.get("/api/passwords/match", headers=auth, query_string={"url": url})
+    assert r.status_code == 200
+    return json.loads(r.data)
+
+
+class TestRegistrableDomain:
+    @pytest.mark.parametrize(
+        "host,expected",
+        [
+            ("www.example.com", "example.com"),
+            ("login.example.co.uk", "example.co.uk"),
+            ("alice.github.io", "alice.github.io"),
+            ("a.b.kawasaki.jp", "a.b.kawasaki.jp"),  # règle joker *.kawasaki.jp
+            ("city.kawasaki.jp", "city.kawasaki.jp"),  # exception !city.kawasaki.jp
+            ("co.uk", None),
+            ("192.168.1.10", "192.168.1.10"),
+            ("nas", "nas"),
+        ],
+    )
+    def test_psl_rules(self, host, expected):
+        assert registrable_domain(host) == expected
+
+    def test_site_domain_normalizes_url(self):
+        assert site_domain("https://Login.Example.COM:8443/path?q=1") == "example.com"
+        assert site_domain("https://bücher.de/") == "xn--bcher-kva.de"
+        assert site_domain(None) is None
+
+
+class TestMatchEndpoint:
+    def test_ranked_by_host_then_path_specificity(self, client, auth):
+        apex = _create(client, auth, "apex", "https://example.com")
+        exact = _create(client, auth, "exact", "https://www.login.example.com")
+        admin = _create(client, auth, "admin", "https://login.example.com/admin")
+        other = _create(client, auth, "other", "https://mail.example.com")
+        _create(client, auth, "unrelated", "https://example.org")
+
+        result = _match(client, auth, "https://login.example.com/admin/users")
+        assert result["domain"] == "example.com"
+        ids = [m["id"] for m in result["matches"]]
+        assert ids == [admin, exact, apex, other]
+        assert [m["match"] for m in result["matches"]] == [
+            "exact", "exact", "parent", "domain"
+        ]
+
+    def test_update_moves_entry_to_new_domain(self, client, auth):
+        eid = _create(client, auth, "site", "https://old.example.com")
+        r = client.put(
+            f"/api/passwords/{eid}",
+            headers=auth,
+            data=json.dumps({"site_url": "https://new.example.net"}),
+            content_type="application/json",
+        )
+        assert r.status_code == 200
+        assert _match(client, auth, "https://example.com")["matches"] == []
+        assert [m["id"] for m in _match(client, auth, "https://example.net")["matches"]] == [eid]
+
+    def test_invalid_url(self, client, auth):
+        r = client.get("/api/passwords/match", headers=auth, query_string={"url": ""})
+        assert r.status_code == 400
+
+    def test_backfill_keeps_updated_at_and_skips_unresolvable(self, app):
+        old = datetime(2024, 1, 1)
+        with app.app_context():
+            user_id = User.query.filter_by(email="match@example.com").one().id
+            db.session.bulk_insert_mappings(
+                Password,
+                [
+                    {
+                        "id": entry_id,
+                        "user_id": user_id,
+                        "site_name": entry_id,
+                        "site_url": url,
+                        "username": "u",
+                        "encrypted_password": "x",
+                        "updated_at": old,
+                    }
+                    for entry_id, url in (("a", "https://co.uk"), ("b", "https://shop.example.org"))
+                ],
+            )
+            db.session.commit()
+            assert backfill_site_domains(batch_size=1) == 1
+            entries = {p.id: p for p in Password.query.all()}
+            assert entries["a"].site_domain is None
+            assert entries["b"].site_domain == "example.org"
+            assert {p.updated_at for p in entries.values()} == {old}
+
+    def test_backfill_and_large_vault_latency(self, app, client, auth):
+        with app.app_context():
+            user_id = User.query.filter_by(email="match@example.com").one().id
+            db.session.bulk_insert_mappings(
+                Password,
+                [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "user_id": user_id,
+                        "site_name": f"site{i}",
+                        "site_url": f"https://app.site{i}.com/login",
+                        "username": "u",
+                        "encrypted_password": "x",
+                    }
+                    for i in range(20000)
+                ],
+            )
+            db.session.commit()
+            assert backfill_site_domains() == 20000
+
+        _match(client, auth, "https://app.site1.com")  # chauffe
+        start = time.perf_counter()
+        result = _match(client, auth, "https://www.app.site19999.com/login")
+        elapsed = time.perf_counter() - start
+        assert [m["match"] for m in result["matches"]] == ["exact"]
+        assert elapsed < 0.25  # lookup indexé : pas de parcours du coffre
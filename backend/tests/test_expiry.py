@@ -0,0 +1,179 @@
+"""
+Rappels d'expiration (/api/passwords/expiring) : scan ensembliste sur l'index
+partiel `expires_at IS NOT NULL`, listes dues publiées par utilisateur dans
+Redis, lecture en cache et invalidation à l'écriture.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from app.models import User
+from app.services.encryption_service import EncryptionService
+from app.services.expiry_service import (
+    EXPIRING_PREFIX,
+    _item,
+    compute_due_lists,
+    get_expiring,
+    scan_expiring,
+)
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email="expiry@example.com", username="expiry")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": "expiry@example.com", "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _create(client, auth, site, expires_in_days=None, remind=None):
+    body = {"site_name": site, "username": "u", "password": "Xq9#Lm2$Tz7!"}
+    if expires_in_days is not None:
+        body["expires_at"] = (datetime.utcnow() + timedelta(days=expires_in_days)).isoformat()
+    if remind is not None:
+        body["remind_before_expiry"] = remind
+    r = client.post(
+        "/api/passwords/", headers=auth, data=json.dumps(body), content_type="application/json"
+    )
+    assert r.status_code == 201, r.data
+    return json.loads(r.data)["password"]["id"]
+
+
+def _expiring(client, auth):
+    r = client.get("/api/passwords/expiring", headers=auth)
+    assert r.status_code == 200
+    return json.loads(r.data)
+
+
+class TestExpiryScan:
+    def test_due_set_respects_per_entry_reminder(self, app, client, auth):
+        expired = _create(client, auth, "expired", expires_in_days=-2)
+        soon = _create(client, auth, "soon", expires_in_days=10)  # rappel 30 j par défaut
+        _create(client, auth, "later", expires_in_days=10, remind=5)
+        _create(client, auth, "far", expires_in_days=200)
+        _create(client, auth, "never")
+
+        with app.app_context():
+            due = compute_due_lists()
+        (items,) = due.values()
+        assert [i["id"] for i in items] == [expired, soon]
+
+    def test_scan_publishes_lists_read_by_endpoint(self, app, client, auth):
+        eid = _create(client, auth, "soon", expires_in_days=3)
+        with app.app_context():
+            assert scan_expiring() == (1, 1)
+            keys = app.redis.keys(f"{EXPIRING_PREFIX}*")
+            assert len(keys) == 1
+
+        result = _expiring(client, auth)
+        assert result["count"] == 1
+        item = result["expiring"][0]
+        assert item["id"] == eid
+        assert item["days_left"] == 2
+        assert item["expired"] is False
+
+    def test_served_from_cache_then_invalidated_on_write(self, app, client, auth):
+        eid = _create(client, auth, "soon", expires_in_days=3)
+        assert _expiring(client, auth)["count"] == 1
+        # Cache : une modification SQL directe n'est pas vue...
+        with app.app_context():
+            db.session.execute(db.text("UPDATE passwords SET expires_at = NULL"))
+            db.session.commit()
+        assert _expiring(client, auth)["count"] == 1
+        # ...mais une écriture via l'API invalide la liste
+        r = client.put(
+            f"/api/passwords/{eid}",
+            headers=auth,
+            data=json.dumps({"expires_at": None}),
+            content_type="application/json",
+        )
+        assert r.status_code == 200
+        assert _expiring(client, auth)["count"] == 0
+
+    def test_invalid_expiry_fields(self, client, auth):
+        for body in ({"expires_at": "next week"}, {"remind_before_expiry": 1000}):
+            body.update(site_name="s", username="u", password="Xq9#Lm2$Tz7!")
+            r = client.post(
+                "/api/passwords/",
+                headers=auth,
+                data=json.dumps(body),
+                content_type="application/json",
+            )
+            assert r.status_code == 400
+
+    def test_expiry_set_after_empty_list_was_cached(self, app, client, auth):
+        eid = _create(client, auth, "later")
+        assert _expiring(client, auth)["count"] == 0  # [] en cache
+        r = client.put(
+            f"/api/passwords/{eid}",
+            headers=auth,
+            data=json.dumps({"expires_at": (datetime.utcnow() + timedelta(days=3)).isoformat()}),
+            content_type="application/json",
+        )
+        assert r.status_code == 200
+        assert _expiring(client, auth)["count"] == 1
+
+    def test_cache_ttl_capped_at_next_reminder(self, app, client, auth):
+        # Rappel dû dans ~2 jours (expiration à 32 j, rappel 30 j), TTL configuré 7 j
+        _create(client, auth, "soon-due", expires_in_days=32)
+        app.config["EXPIRY_CACHE_TTL_SECONDS"] = 7 * 86400
+        assert _expiring(client, auth)["count"] == 0
+        with app.app_context():
+            (key,) = app.redis.keys(f"{EXPIRING_PREFIX}*")
+            assert 86400 < app.redis.ttl(key) <= 2 * 86400
+
+
+class TestTimezoneAwareExpiry:
+    """PostgreSQL : `expires_at` TIMESTAMP WITH TIME ZONE → datetime aware."""
+
+    def test_item_normalized_to_naive_utc(self):
+        row = SimpleNamespace(
+            id="p1",
+            site_name="bank",
+            expires_at=datetime(2030, 1, 1, 2, 0, tzinfo=timezone(timedelta(hours=2))),
+        )
+        assert _item(row)["expires_at"] == "2030-01-01T00:00:00"
+
+    def test_aware_cached_value_does_not_break_endpoint(self, app):
+        expires = datetime.now(timezone.utc) + timedelta(days=3, hours=1)
+        cached = [{"id": "p1", "site_name": "bank", "expires_at": expires.isoformat()}]
+        with app.app_context():
+            app.redis.set(EXPIRING_PREFIX + "u1", json.dumps(cached))
+            (item,) = get_expiring("u1")
+        assert item["days_left"] == 3
+        assert item["expired"] is False
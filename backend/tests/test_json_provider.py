@@ -0,0 +1,149 @@
+"""
+Fournisseur JSON orjson et cache des fragments de liste : sortie équivalente au
+fournisseur stdlib, fragments indexés par (id, updated_at) jamais périmés.
+"""
+
+import datetime
+import decimal
+import json
+import uuid
+
+import fakeredis
+import pytest
+from flask import jsonify
+
+from app_entry import create_app, db
+from app.models import User
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from json_provider import OrjsonProvider, RowFragmentCache
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    app.row_fragment_cache = RowFragmentCache(100)
+    with app.app_context():
+        db.create_all()
+        user = User(email="json@example.com", username="json")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": "json@example.com", "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _create(client, auth, site):
+    r = client.post(
+        "/api/passwords/",
+        headers=auth,
+        data=json.dumps({"site_name": site, "username": "u", "password": "Xq9#Lm2$Tz7!"}),
+        content_type="application/json",
+    )
+    return json.loads(r.data)["password"]["id"]
+
+
+class TestOrjsonProvider:
+    def test_installed_and_native_types(self, app):
+        assert isinstance(app.json, OrjsonProvider)
+        with app.test_request_context():
+            ident = uuid.uuid4()
+            payload = jsonify(
+                at=datetime.datetime(2024, 5, 1, 12, 0, 0, 123),
+                id=ident,
+                amount=decimal.Decimal("1.50"),
+                text="é",
+            ).get_json()
+        assert payload == {
+            "at": "2024-05-01T12:00:00.000123",
+            "id": str(ident),
+            "amount": "1.50",
+            "text": "é",
+        }
+
+    def test_unsupported_type(self, app):
+        with app.test_request_context(), pytest.raises(TypeError):
+            jsonify(value=object())
+
+    def test_non_str_keys(self, app):
+        with app.test_request_context():
+            assert jsonify({1: "a", None: "b"}).get_json() == {"1": "a", "null": "b"}
+
+    def test_dumps_honours_kwargs(self, app):
+        obj = {"b": 1, "a": [1]}
+        assert app.json.dumps(obj, sort_keys=True) == '{"a":[1],"b":1}'
+        assert app.json.dumps(obj, sort_keys=True, indent=2) == json.dumps(obj, sort_keys=True, indent=2)
+        assert app.json.dumps(obj, indent=4) == json.dumps(obj, indent=4)
+        assert app.json.dumps(obj, separators=(",", ":")) == '{"b":1,"a":[1]}'
+
+    def test_disabled_by_config(self, monkeypatch):
+        from config import TestingConfig
+
+        monkeypatch.setattr(TestingConfig, "JSON_PROVIDER", "default", raising=False)
+        app = create_app("testing")
+        assert not isinstance(app.json, OrjsonProvider)
+        assert app.row_fragment_cache is None
+
+
+class TestRowFragmentCache:
+    def test_cached_list_matches_uncached_and_tracks_updates(self, app, client, auth):
+        eid = _create(client, auth, "a")
+        _create(client, auth, "b")
+
+        first = client.get("/api/passwords/", headers=auth)
+        assert len(app.row_fragment_cache) == 2
+        second = client.get("/api/passwords/", headers=auth)
+        assert second.data == first.data
+
+        client.put(
+            f"/api/passwords/{eid}",
+            headers=auth,
+            data=json.dumps({"site_name": "renamed"}),
+            content_type="application/json",
+        )
+        cached = json.loads(client.get("/api/passwords/", headers=auth).data)
+        assert "renamed" in {p["site_name"] for p in cached["passwords"]}
+
+        app.row_fragment_cache = None
+        uncached = json.loads(client.get("/api/passwords/", headers=auth).data)
+        assert cached == uncached
+
+    def test_reveal_refreshes_last_used(self, app, client, auth):
+        eid = _create(client, auth, "a")
+        before = json.loads(client.get("/api/passwords/", headers=auth).data)["passwords"][0]
+        assert before["last_used"] is None
+
+        assert client.get(f"/api/passwords/{eid}", headers=auth).status_code == 200
+        after = json.loads(client.get("/api/passwords/", headers=auth).data)["passwords"][0]
+        assert after["last_used"] is not None
+        assert after["updated_at"] == before["updated_at"]
+
+    def test_lru_bound(self):
+        cache = RowFragmentCache(2)
+        for key in "abc":
+            cache.put(key, key.encode())
+        assert len(cache) == 2 and cache.get("a") is None and cache.get("c") == b"c"
@@ -0,0 +1,110 @@
+"""
+Comptabilité mémoire par endpoint : pic tracemalloc et croissance du RSS par
+requête, agrégats et instantanés des plus gros allocateurs sur /debug/memory,
+désactivée par défaut.
+"""
+
+import json
+import tracemalloc
+
+import fakeredis
+import pytest
+
+import metrics
+from app_entry import create_app, db
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from config import TestingConfig
+from memory_accounting import MemoryLedger, rss_bytes
+from rate_limiter import RateLimiter
+
+
+def _make_app(monkeypatch, **overrides):
+    for name, value in overrides.items():
+        monkeypatch.setattr(TestingConfig, name, value, raising=False)
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+
+    @app.route("/_test/allocate")
+    def allocate_endpoint():
+        chunk = bytearray(4 * 1024 * 1024)
+        return {"size": len(chunk)}
+
+    return app
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = _make_app(monkeypatch, MEMORY_TRACKING_ENABLED=True)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+    tracemalloc.stop()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _report(client, **kwargs):
+    r = client.get("/debug/memory", **kwargs)
+    assert r.status_code == 200
+    return json.loads(r.data)
+
+
+class TestEndpoint:
+    def test_disabled_by_default(self, monkeypatch):
+        app = _make_app(monkeypatch)
+        assert app.test_client().get("/debug/memory").status_code == 404
+        assert not tracemalloc.is_tracing()
+
+    def test_peak_recorded_per_endpoint(self, client):
+        for _ in range(2):
+            assert client.get("/_test/allocate").status_code == 200
+        stats = _report(client)["endpoints"]["GET /_test/allocate"]
+        assert stats["requests"] == 2
+        assert stats["peak_max"] >= 4 * 1024 * 1024
+        assert stats["peak_avg"] >= 4 * 1024 * 1024
+
+    def test_token(self, app, client):
+        app.config["METRICS_TOKEN"] = "scrape-secret"
+        assert client.get("/debug/memory").status_code == 401
+        _report(client, headers={"Authorization": "Bearer scrape-secret"})
+
+    def test_snapshot_top_allocators(self, client):
+        client.get("/_test/allocate")
+        report = _report(client, query_string={"snapshot": "1"})
+        assert report["snapshot_at"] is not None
+        assert 0 < len(report["top_allocators"]) <= TestingConfig.MEMORY_SNAPSHOT_TOP
+        assert all(":" in entry["location"] for entry in report["top_allocators"])
+
+
+@pytest.mark.skipif(not metrics.available(), reason="prometheus_client non installé")
+def test_histogram_observed(client):
+    labels = {"method": "GET", "endpoint": "/_test/allocate"}
+    before = metrics.prometheus_client.REGISTRY.get_sample_value(
+        "http_request_memory_peak_bytes_count", labels
+    ) or 0
+    client.get("/_test/allocate")
+    after = metrics.prometheus_client.REGISTRY.get_sample_value(
+        "http_request_memory_peak_bytes_count", labels
+    )
+    assert after == before + 1
+
+
+def test_ledger_snapshot_interval():
+    ledger = MemoryLedger(top_n=5, snapshot_interval=300)
+    assert ledger.snapshot_due(now=1000)
+    ledger.snapshot_at = 1000
+    assert not ledger.snapshot_due(now=1299)
+    assert ledger.snapshot_due(now=1300)
+
+
+def test_rss_bytes():
+    rss = rss_bytes()
+    assert rss is None or rss > 0
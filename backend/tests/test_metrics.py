@@ -0,0 +1,148 @@
+"""
+Métriques Prometheus : exposition texte sur /metrics, minuteur par endpoint,
+compteurs et histogrammes des chemins chauds (Argon2id, AES-GCM, Redis,
+rate limiting, audit), jeton optionnel et agrégation multi-processus.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import fakeredis
+import pytest
+from prometheus_client import REGISTRY
+
+from app_entry import create_app, db
+from app.models import User
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+CREDENTIALS = {"email": "metrics@example.com", "password": STRONG_TEST_PASSWORD}
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email=CREDENTIALS["email"], username="metrics")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post("/api/auth/login", json=CREDENTIALS)
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestExposition:
+    def test_text_format(self, client, auth):
+        r = client.get("/metrics")
+        assert r.status_code == 200
+        assert r.content_type.startswith("text/plain; version=")
+        body = r.get_data(as_text=True)
+        for name in (
+            "http_request_duration_seconds_bucket",
+            "argon2_derive_seconds_count",
+            "aes_gcm_operations_total",
+            "redis_command_seconds_bucket",
+            "rate_limit_decisions_total",
+            "audit_write_seconds_count",
+        ):
+            assert name in body
+
+    def test_token_required_when_configured(self, app, client):
+        app.config["METRICS_TOKEN"] = "scrape-secret"
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 401
+        r = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+        assert r.status_code == 200
+
+
+class TestHotPaths:
+    def test_request_timer_per_route(self, client, auth):
+        labels = {"method": "GET", "endpoint": "/api/auth/me", "status": "200"}
+        before = _sample("http_request_duration_seconds_count", **labels)
+        client.get("/api/auth/me", headers=auth)
+        assert _sample("http_request_duration_seconds_count", **labels) == before + 1
+
+        unmatched = {"method": "GET", "endpoint": "<unmatched>", "status": "404"}
+        before = _sample("http_request_duration_seconds_count", **unmatched)
+        client.get("/nope/123")
+        assert _sample("http_request_duration_seconds_count", **unmatched) == before + 1
+
+    def test_login_path(self, client):
+        names = {
+            "argon2": ("argon2_derive_seconds_count", {}),
+            "allowed": ("rate_limit_decisions_total", {"decision": "allowed"}),
+            "rate_limit_redis": ("redis_command_seconds_count", {"operation": "rate_limit"}),
+            "session_setex": ("redis_command_seconds_count", {"operation": "session_setex"}),
+            "audit": ("audit_write_seconds_count", {"path": "unit"}),
+            "encrypt": ("aes_gcm_operations_total", {"operation": "encrypt"}),
+            "decrypt": ("aes_gcm_operations_total", {"operation": "decrypt"}),
+        }
+        before = {key: _sample(name, **labels) for key, (name, labels) in names.items()}
+        assert client.post("/api/auth/login", json=CREDENTIALS).status_code == 200
+        after = {key: _sample(name, **labels) for key, (name, labels) in names.items()}
+        assert after["argon2"] == before["argon2"] + 1
+        assert after["decrypt"] == before["decrypt"] + 1  # désenveloppement de la VMK
+        for key in ("allowed", "rate_limit_redis", "session_setex", "audit"):
+            assert after[key] == before[key] + 1, key
+        assert after["encrypt"] == before["encrypt"]
+
+    def test_rate_limit_decisions(self, app, client):
+        app.rate_limiter.limits["/api/auth/login"] = {
+            "requests": 1,
+            "window": 60,
+            "block_duration": 60,
+        }
+        before = {
+            d: _sample("rate_limit_decisions_total", decision=d) for d in ("exceeded", "blocked")
+        }
+        bad = dict(CREDENTIALS, password="wrong-password")
+        codes = [client.post("/api/auth/login", json=bad).status_code for _ in range(3)]
+        assert codes == [401, 429, 429]
+        assert _sample("rate_limit_decisions_total", decision="exceeded") == before["exceeded"] + 1
+        assert _sample("rate_limit_decisions_total", decision="blocked") == before["blocked"] + 1
+
+
+def test_multiprocess_aggregation(tmp_path):
+    # Chaque « worker » est un processus distinct qui écrit dans le répertoire
+    # partagé ; l'exposition agrège les deux.
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    worker = "import metrics; metrics.RATE_LIMIT_DECISIONS.labels('allowed').inc(3)"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], cwd=BACKEND_DIR, env=env, check=True)
+    out = subprocess.run(
+        [sys.executable, "-c", "import metrics; print(metrics.render()[0].decode())"],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert 'rate_limit_decisions_total{decision="allowed"} 6.0' in out
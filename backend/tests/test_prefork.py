@@ -0,0 +1,88 @@
+"""
+Workers gunicorn : configuration, pools propres au processus, threads de fond
+démarrés après le fork (prefork.py, gunicorn.conf.py).
+"""
+
+import os
+import runpy
+
+import fakeredis
+import pytest
+
+import prefork
+from app.services import expiry_service
+from app_entry import create_app, db
+
+_CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn.conf.py")
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def started(monkeypatch):
+    calls = []
+    monkeypatch.setattr(expiry_service, "start_expiry_scheduler", calls.append)
+    return calls
+
+
+def _load_conf(monkeypatch, **env):
+    for name in ("GUNICORN_WORKERS", "GUNICORN_THREADS", "GUNICORN_WORKER_CLASS", "GUNICORN_PRELOAD"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    monkeypatch.setenv(prefork.POST_FORK_HOOKS_ENV, "")  # restaurée après le test
+    return runpy.run_path(_CONF)
+
+
+class TestGunicornConfig:
+    def test_defaults(self, monkeypatch):
+        conf = _load_conf(monkeypatch)
+        assert (conf["workers"], conf["threads"], conf["worker_class"]) == (4, 1, "sync")
+        assert conf["preload_app"] is True
+        assert os.environ[prefork.POST_FORK_HOOKS_ENV] == "1"
+
+    def test_threads_select_gthread(self, monkeypatch):
+        conf = _load_conf(monkeypatch, GUNICORN_WORKERS="2", GUNICORN_THREADS="8", GUNICORN_PRELOAD="false")
+        assert (conf["workers"], conf["threads"], conf["worker_class"]) == (2, 8, "gthread")
+        assert conf["preload_app"] is False
+
+
+class TestWorkerThreads:
+    def test_create_app_defers_scheduler_under_gunicorn(self, monkeypatch, started):
+        monkeypatch.setenv(prefork.POST_FORK_HOOKS_ENV, "1")
+        app = create_app("testing")
+        app.config.update(TESTING=False, EXPIRY_SCAN_INTERVAL_SECONDS=60)
+        assert started == []
+
+        app.config["WARMUP_ON_START"] = False
+        prefork.worker_ready(app)
+        assert started == [app]
+
+    def test_disabled_interval_starts_nothing(self, app, started):
+        app.config.update(TESTING=False, EXPIRY_SCAN_INTERVAL_SECONDS=0, WARMUP_ON_START=False)
+        prefork.worker_ready(app)
+        assert started == []
+
+
+class TestResetConnections:
+    def test_fresh_pools_after_fork(self, app):
+        pool = app.redis.connection_pool
+        app.redis.ping()
+        inherited = pool._created_connections
+        engine_pool = db.engine.pool
+
+        prefork.reset_connections(app)
+
+        assert inherited == 1
+        assert pool._created_connections == 0
+        assert db.engine.pool is not engine_pool
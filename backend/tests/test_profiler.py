@@ -0,0 +1,124 @@
+"""
+Profilage échantillonné à la demande : en-tête X-Profile signé (HMAC,
+durée de validité), piles repliées écrites dans PROFILE_DIR, rotation des
+fichiers et budget de surcoût CPU.
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from config import TestingConfig
+from profiler import OverheadBudget, collapse, sign_token, verify_token, write_profile
+from rate_limiter import RateLimiter
+
+KEY = "profile-signing-key"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestingConfig, "PROFILING_ENABLED", True, raising=False)
+    monkeypatch.setattr(TestingConfig, "PROFILE_SIGNING_KEY", KEY, raising=False)
+    monkeypatch.setattr(TestingConfig, "PROFILE_DIR", str(tmp_path), raising=False)
+    monkeypatch.setattr(TestingConfig, "PROFILE_INTERVAL_MS", 1, raising=False)
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+
+    @app.route("/_test/busy")
+    def busy_endpoint():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return {"ok": True}
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _profiles(app):
+    names = os.listdir(app.config["PROFILE_DIR"])
+    return sorted(name for name in names if name.endswith(".folded"))
+
+
+class TestToken:
+    def test_roundtrip(self):
+        assert verify_token(KEY, sign_token(KEY), ttl=300)
+
+    def test_rejected(self):
+        token = sign_token(KEY, timestamp=1000)
+        assert not verify_token("other-key", token, ttl=300, now=1000)
+        assert not verify_token(KEY, token, ttl=300, now=1000 + 301)
+        assert not verify_token(KEY, "garbage", ttl=300)
+        assert not verify_token(None, token, ttl=300)
+
+
+class TestRequests:
+    def test_signed_header_writes_collapsed_stacks(self, app, client):
+        r = client.get("/_test/busy", headers={"X-Profile": sign_token(KEY)})
+        assert r.status_code == 200
+        name = r.headers["X-Profile-Id"]
+        assert _profiles(app) == [name] and name.endswith("-GET-test_busy.folded")
+
+        with open(f"{app.config['PROFILE_DIR']}/{name}", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) >= 1
+        assert "busy_endpoint (test_profiler.py:" in stack
+        assert stack.index("full_dispatch_request") < stack.index("busy_endpoint")
+
+    def test_not_sampled_by_default(self, app, client):
+        r = client.get("/_test/busy", headers={"X-Profile": "1.forged"})
+        assert "X-Profile-Id" not in r.headers
+        assert _profiles(app) == []
+
+    def test_sample_rate(self, app, client):
+        app.config["PROFILE_SAMPLE_RATE"] = 1.0
+        r = client.get("/_test/busy")
+        assert "X-Profile-Id" not in r.headers  # pas d'identifiant sans en-tête signé
+        assert len(_profiles(app)) == 1
+
+    def test_budget_exhausted(self, app, client):
+        app.profiling_budget.charge(app.profiling_budget.limit * app.profiling_budget.window)
+        r = client.get("/_test/busy", headers={"X-Profile": sign_token(KEY)})
+        assert r.status_code == 200 and "X-Profile-Id" not in r.headers
+        assert _profiles(app) == []
+
+
+def test_rotation(tmp_path):
+    for index in range(4):
+        write_profile(str(tmp_path), f"{index}.folded", Counter({"a;b": index + 1}), max_files=2)
+        time.sleep(0.01)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2.folded", "3.folded"]
+
+
+def test_overhead_budget_window():
+    budget = OverheadBudget(limit=0.01, window=60)
+    budget.charge(0.5, now=0)
+    assert budget.allows(now=1)
+    budget.charge(0.2, now=1)
+    assert not budget.allows(now=2)
+    assert budget.allows(now=62)
+
+
+def test_collapse_root_first():
+    frame = sys._getframe()
+    leaf = f"test_collapse_root_first (test_profiler.py:{frame.f_code.co_firstlineno})"
+    stack = collapse(frame).split(";")
+    assert stack[-1] == leaf and len(stack) > 1
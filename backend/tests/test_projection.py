@@ -0,0 +1,111 @@
+"""
+Liste projetée (GET /api/passwords/?fields=) : lecture Core des seules
+colonnes demandées, sérialisation par colonne identique à Password.to_dict(),
+pagination inchangée.
+"""
+
+import json
+from datetime import datetime
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from app.models import Password, User
+from app.services.encryption_service import EncryptionService
+from app.services.projection import (
+    LIST_FIELDS,
+    parse_fields,
+    projected_select,
+    serialize_rows,
+)
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email="proj@example.com", username="proj")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": "proj@example.com", "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _create(client, auth, site, **extra):
+    body = dict(site_name=site, username="u", password="Xq9#Lm2$Tz7!", **extra)
+    r = client.post(
+        "/api/passwords/", headers=auth, data=json.dumps(body), content_type="application/json"
+    )
+    assert r.status_code == 201
+
+
+class TestProjection:
+    def test_parse_fields(self):
+        assert parse_fields("") == LIST_FIELDS
+        assert parse_fields("site_name, username") == ("id", "site_name", "username")
+        with pytest.raises(ValueError):
+            parse_fields("site_name,encrypted_password")
+
+    def test_serialization_matches_to_dict(self, app, client, auth):
+        _create(
+            client, auth, "a", tags=["x", "y"], category="Pro", notes="n",
+            expires_at="2030-01-01T00:00:00",
+        )
+        _create(client, auth, "b")
+        with app.app_context():
+            Password.query.update({Password.last_used: datetime(2024, 5, 1, 12, 0)})
+            db.session.commit()
+            entries = Password.query.order_by(Password.site_name).all()
+            rows = db.session.execute(
+                projected_select(LIST_FIELDS).order_by(Password.site_name)
+            ).all()
+            assert serialize_rows(rows, LIST_FIELDS) == [e.to_dict() for e in entries]
+            assert serialize_rows([], LIST_FIELDS) == []
+
+    def test_sparse_fieldset_and_pagination(self, client, auth):
+        for site in "abcde":
+            _create(client, auth, site)
+        r = client.get(
+            "/api/passwords/?fields=site_name&sort=site_name&order=asc&per_page=2&page=2",
+            headers=auth,
+        )
+        assert r.status_code == 200
+        body = json.loads(r.data)
+        assert [sorted(p) for p in body["passwords"]] == [["id", "site_name"]] * 2
+        assert [p["site_name"] for p in body["passwords"]] == ["c", "d"]
+        assert body["pagination"] == {
+            "page": 2, "pages": 3, "per_page": 2, "total": 5,
+            "has_next": True, "has_prev": True,
+        }
+
+    def test_unknown_field_rejected(self, client, auth):
+        r = client.get("/api/passwords/?fields=encrypted_password", headers=auth)
+        assert r.status_code == 400
@@ -0,0 +1,148 @@
+"""
+Budgets de requêtes par endpoint : nombre maximal d'instructions SQL et
+d'allers-retours Redis (un pipeline = un aller-retour) sur les chemins chauds.
+Un N+1 ou un aller-retour de plus fait échouer la suite immédiatement.
+
+Budget dépassé : corriger la régression ; budget devenu trop large après une
+optimisation : le resserrer ici.
+"""
+
+import json
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from app.models import User
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+CREDENTIALS = {"email": "budget@example.com", "password": STRONG_TEST_PASSWORD}
+ENTRY = {
+    "site_name": "Example",
+    "site_url": "https://login.example.com",
+    "username": "u",
+    "password": "Xq9#Lm2$Tz7!",
+}
+
+# endpoint → (SQL max, Redis max)
+# Accès authentifié : SELECT de l'utilisateur + GETEX de la session ; routes
+# limitées : un pipeline de rate limiting ; lectures et écritures : INSERT d'audit.
+BUDGETS = {
+    "POST /api/auth/register": (3, 3),
+    "POST /api/auth/login": (3, 3),
+    "GET /api/auth/me": (1, 1),
+    "GET /api/users/profile": (1, 1),
+    "GET /api/passwords/": (3, 2),
+    "GET /api/passwords/changes": (4, 2),
+    "GET /api/passwords/match": (3, 2),
+    "GET /api/passwords/stats": (3, 4),
+    "GET /api/passwords/<id>": (4, 3),
+    "POST /api/passwords/": (3, 4),
+    "PUT /api/passwords/<id>": (4, 3),
+    "DELETE /api/passwords/<id>": (6, 2),
+}
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email=CREDENTIALS["email"], username="budget")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post("/api/auth/login", json=CREDENTIALS)
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+@pytest.fixture
+def entry_id(client, auth):
+    r = client.post("/api/passwords/", headers=auth, json=ENTRY)
+    return json.loads(r.data)["password"]["id"]
+
+
+def _call(endpoint, client, auth, entry_id):
+    method, path = endpoint.split(" ")
+    path = path.replace("<id>", entry_id)
+    options = {"headers": auth}
+    if endpoint == "POST /api/auth/register":
+        options = {
+            "json": {"email": "new@example.com", "username": "new", "password": STRONG_TEST_PASSWORD}
+        }
+    elif endpoint == "POST /api/auth/login":
+        options = {"json": CREDENTIALS}
+    elif endpoint == "GET /api/passwords/match":
+        path += "?url=https://login.example.com"
+    elif method in ("POST", "PUT"):
+        options["json"] = dict(ENTRY, site_name="Renamed")
+    return client.open(path, method=method, **options)
+
+
+@pytest.mark.parametrize("endpoint", sorted(BUDGETS))
+def test_endpoint_budget(endpoint, client, auth, entry_id, count_queries):
+    max_sql, max_redis = BUDGETS[endpoint]
+    with count_queries() as counts:
+        response = _call(endpoint, client, auth, entry_id)
+    assert response.status_code < 300, response.data
+    assert counts.sql <= max_sql, "\n".join(counts.statements)
+    assert counts.redis <= max_redis, counts.redis_commands
+
+
+class TestHotPaths:
+    def test_list_total_travels_with_page(self, client, auth, entry_id, count_queries):
+        with count_queries() as counts:
+            r = client.get("/api/passwords/?per_page=1", headers=auth)
+        assert json.loads(r.data)["pagination"]["total"] == 1
+        assert not any("count(*) AS" in s for s in counts.statements)
+
+        r = client.get("/api/passwords/?page=5", headers=auth)
+        assert json.loads(r.data)["pagination"]["total"] == 1
+
+    def test_register_conflicts_single_select(self, client, count_queries):
+        body = {"email": "budget@example.com", "username": "x", "password": STRONG_TEST_PASSWORD}
+        with count_queries() as counts:
+            r = client.post("/api/auth/register", json=body)
+        assert r.status_code == 409 and b"Email already registered" in r.data
+        assert sum(s.lstrip().startswith("SELECT") for s in counts.statements) == 1
+
+        body = dict(body, email="other@example.com", username="budget")
+        r = client.post("/api/auth/register", json=body)
+        assert r.status_code == 409 and b"Username already taken" in r.data
+
+    def test_session_touch_single_round_trip(self, app, client, auth, count_queries):
+        with count_queries() as counts:
+            client.get("/api/auth/me", headers=auth)
+        assert counts.redis_commands == ["GETEX"]
+
+    def test_pipeline_counts_as_one_round_trip(self, app, count_queries):
+        with count_queries() as counts:
+            pipe = app.redis.pipeline(transaction=False)
+            pipe.set("a", 1).incr("a")
+            pipe.execute()
+            app.redis.get("a")
+        assert counts.redis == 2
+        assert counts.redis_commands == ["SET", "INCRBY", "GET"]
+        app.redis.get("a")
+        assert counts.redis == 2
@@ -0,0 +1,118 @@
+"""
+Analyse des plans EXPLAIN (query_plans/explain.py) sur des plans PostgreSQL
+figés : détection des Seq Scan et recommandations d'index. La suite contre
+une vraie base (query_plans/) exige PLAN_DATABASE_URL.
+"""
+
+from sqlalchemy import create_engine, text
+
+from app.models import Password
+from query_plans.explain import (
+    analyze_plan,
+    capture_selects,
+    equality_columns,
+    is_covered,
+    sort_columns,
+    table_indexes,
+)
+
+USER_FILTER = "((user_id)::text = '4f1c2e8a-0b1c-4d2e-9f3a-4b5c6d7e8f90'::text)"
+INDEXES = {"passwords": table_indexes(Password.__table__)}
+
+
+def _list_plan(scan, sort_key):
+    """Limit → WindowAgg → Sort → scan : forme de la page projetée."""
+    return {
+        "Node Type": "Limit",
+        "Plans": [{
+            "Node Type": "WindowAgg",
+            "Plans": [{
+                "Node Type": "Sort",
+                "Sort Key": [sort_key],
+                "Plans": [scan],
+            }],
+        }],
+    }
+
+
+class TestConditions:
+    def test_equality_columns(self):
+        condition = (
+            f"({USER_FILTER} AND ((category)::text = 'Travail'::text) "
+            "AND ((category)::text <> ''::text) AND (priority >= 1))"
+        )
+        assert equality_columns(condition) == ["user_id", "category"]
+        assert equality_columns(None) == []
+
+    def test_sort_columns(self):
+        assert sort_columns(["passwords.updated_at DESC", "(site_name)::text NULLS FIRST"]) == [
+            "updated_at",
+            "site_name",
+        ]
+
+    def test_model_indexes_cover_list_shapes(self):
+        indexes = INDEXES["passwords"]
+        assert is_covered(("user_id", "category"), indexes)
+        assert is_covered(("user_id", "updated_at"), indexes)
+        assert is_covered(("user_id",), indexes)
+        assert not is_covered(("user_id", "created_at"), indexes)
+
+
+class TestAnalyzePlan:
+    def test_seq_scan_on_large_table_recommends_index(self):
+        scan = {
+            "Node Type": "Seq Scan",
+            "Relation Name": "passwords",
+            "Filter": USER_FILTER,
+            "Plan Rows": 80,
+        }
+        seq_scans, recommendations = analyze_plan(
+            _list_plan(scan, "passwords.created_at DESC"), {"passwords"}, INDEXES
+        )
+        assert seq_scans == ["passwords"]
+        assert recommendations[0].startswith("CREATE INDEX ON passwords (user_id, created_at);")
+
+    def test_seq_scan_on_small_table_is_tolerated(self):
+        scan = {"Node Type": "Seq Scan", "Relation Name": "users", "Filter": "(id = 'x')"}
+        assert analyze_plan(scan, {"passwords"}, INDEXES) == ([], [])
+
+    def test_index_scan_served_by_existing_index(self):
+        scan = {
+            "Node Type": "Index Scan",
+            "Relation Name": "passwords",
+            "Index Name": "idx_user_updated",
+            "Index Cond": USER_FILTER,
+            "Plan Rows": 5000,
+        }
+        plan = _list_plan(scan, "passwords.updated_at DESC")
+        assert analyze_plan(plan, {"passwords"}, INDEXES) == ([], [])
+
+    def test_large_in_memory_sort_recommends_index(self):
+        scan = {
+            "Node Type": "Bitmap Heap Scan",
+            "Relation Name": "passwords",
+            "Recheck Cond": USER_FILTER,
+            "Plan Rows": 5000,
+            "Plans": [{"Node Type": "Bitmap Index Scan", "Index Cond": USER_FILTER}],
+        }
+        plan = _list_plan(scan, "passwords.last_used DESC")
+        seq_scans, recommendations = analyze_plan(plan, {"passwords"}, INDEXES)
+        assert seq_scans == []
+        assert recommendations == [
+            "CREATE INDEX ON passwords (user_id, last_used);  "
+            "-- tri de ~5000 lignes (passwords.last_used DESC)"
+        ]
+        # Petit coffre : le tri en mémoire est attendu, pas de recommandation
+        scan["Plan Rows"] = 80
+        assert analyze_plan(plan, {"passwords"}, INDEXES) == ([], [])
+
+
+def test_capture_selects_only():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+        with capture_selects(engine) as statements:
+            connection.execute(text("INSERT INTO t VALUES (1)"))
+            connection.execute(text("SELECT x FROM t WHERE x = :x"), {"x": 1})
+        connection.execute(text("SELECT 1"))
+    assert [statement for statement, _ in statements] == ["SELECT x FROM t WHERE x = ?"]
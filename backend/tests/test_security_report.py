@@ -0,0 +1,155 @@
+"""
+Rapport de sécurité serveur (/api/passwords/security-report) : réutilisation
+détectée par empreintes HMAC à clé (dérivée de la VMK) maintenues à l'écriture,
+backfill en session, faiblesse et ancienneté lues sur les colonnes.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from app.models import User, Password
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email="report@example.com", username="report")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": "report@example.com", "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _create(client, auth, site, password):
+    r = client.post(
+        "/api/passwords/",
+        headers=auth,
+        data=json.dumps({"site_name": site, "username": "u", "password": password}),
+        content_type="application/json",
+    )
+    assert r.status_code == 201
+    return json.loads(r.data)["password"]["id"]
+
+
+def _report(client, auth):
+    r = client.get("/api/passwords/security-report", headers=auth)
+    assert r.status_code == 200
+    return json.loads(r.data)
+
+
+class TestFingerprintPrimitive:
+    def test_deterministic_per_vmk_and_isolated_between_users(self):
+        vmk_a, vmk_b = EncryptionService.generate_vmk(), EncryptionService.generate_vmk()
+        key_a = EncryptionService.derive_fingerprint_key(vmk_a)
+        fp = EncryptionService.fingerprint_entry("hunter2", key_a)
+        assert fp == EncryptionService.fingerprint_entry("hunter2", key_a)
+        assert len(fp) == 64
+        assert fp != EncryptionService.fingerprint_entry(
+            "hunter2", EncryptionService.derive_fingerprint_key(vmk_b)
+        )
+        assert key_a != vmk_a  # séparation de domaine : jamais la VMK elle-même
+
+
+class TestSecurityReport:
+    def test_reuse_detected_without_exposing_fingerprint(self, client, auth):
+        a = _create(client, auth, "a.com", "Shared-Secret-1!")
+        b = _create(client, auth, "b.com", "Shared-Secret-1!")
+        _create(client, auth, "c.com", "Unique-Secret-2!")
+
+        report = _report(client, auth)
+        assert report["reused_count"] == 2
+        assert len(report["reused"]) == 1
+        assert {e["id"] for e in report["reused"][0]["entries"]} == {a, b}
+        assert "password_fingerprint" not in json.dumps(report)
+        assert report["coverage"] == {"analyzed": 3, "pending": 0}
+
+    def test_update_recomputes_fingerprint(self, client, auth):
+        _create(client, auth, "a.com", "Shared-Secret-1!")
+        b = _create(client, auth, "b.com", "Shared-Secret-1!")
+        r = client.put(
+            f"/api/passwords/{b}",
+            headers=auth,
+            data=json.dumps({"password": "Now-Different-3!"}),
+            content_type="application/json",
+        )
+        assert r.status_code == 200
+        assert _report(client, auth)["reused"] == []
+
+    def test_backfill_of_legacy_entries_in_session(self, app, client, auth):
+        _create(client, auth, "a.com", "Shared-Secret-1!")
+        _create(client, auth, "b.com", "Shared-Secret-1!")
+        with app.app_context():
+            Password.query.update({Password.password_fingerprint: None})
+            db.session.commit()
+
+        report = _report(client, auth)
+        assert report["reused_count"] == 2
+        assert report["coverage"]["pending"] == 0
+        with app.app_context():
+            assert Password.query.filter(Password.password_fingerprint.is_(None)).count() == 0
+
+    def test_backfill_pages_past_undecryptable_entries(self, app, client, auth):
+        ids = sorted(_create(client, auth, f"{i}.com", "Shared-Secret-1!") for i in range(3))
+        app.config["FINGERPRINT_BACKFILL_BATCH"] = 2
+        with app.app_context():
+            foreign = db.session.get(Password, ids[2]).encrypted_password
+            Password.query.update({Password.password_fingerprint: None})
+            # Les deux premières par id deviennent indéchiffrables (AAD d'une autre entrée).
+            Password.query.filter(Password.id.in_(ids[:2])).update(
+                {Password.encrypted_password: foreign}, synchronize_session=False
+            )
+            db.session.commit()
+            before = db.session.get(Password, ids[2]).updated_at
+
+        report = _report(client, auth)
+        assert report["coverage"]["pending"] == 2
+        with app.app_context():
+            entry = db.session.get(Password, ids[2])
+            assert entry.password_fingerprint is not None
+            assert entry.updated_at == before
+
+    def test_weak_and_old_from_columns(self, app, client, auth):
+        weak = _create(client, auth, "weak.com", "123456")
+        old = _create(client, auth, "old.com", "X#9$mP2!vR8@nQ5z")
+        with app.app_context():
+            Password.query.filter_by(id=old).update(
+                {Password.password_changed_at: datetime.utcnow() - timedelta(days=200)}
+            )
+            db.session.commit()
+
+        report = _report(client, auth)
+        assert [e["id"] for e in report["weak"]] == [weak]
+        assert [e["id"] for e in report["old"]] == [old]
@@ -0,0 +1,124 @@
+"""
+En-tête Server-Timing (décomposition par phase : argon2, db, redis, commit,
+zxcvbn, sanitize, serialize) : activé par configuration ou par jeton
+d'administration, absent sinon ; journal des requêtes lentes.
+"""
+
+import json
+import logging
+
+import fakeredis
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app_entry import create_app, db
+from app.models import User
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from server_timing import format_header
+from tests.passwords import STRONG_TEST_PASSWORD
+
+CREDENTIALS = {"email": "timing@example.com", "password": STRONG_TEST_PASSWORD}
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email=CREDENTIALS["email"], username="timing")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _phases(response):
+    """{phase: (durée ms, nombre d'appels)} depuis l'en-tête."""
+    phases = {}
+    for metric in response.headers["Server-Timing"].split(", "):
+        name, *params = metric.split(";")
+        values = dict(param.split("=", 1) for param in params)
+        phases[name] = (float(values["dur"]), values.get("desc", '"1x"').strip('"x'))
+    return phases
+
+
+class TestHeader:
+    def test_absent_by_default(self, client):
+        r = client.post("/api/auth/login", json=CREDENTIALS)
+        assert r.status_code == 200
+        assert "Server-Timing" not in r.headers
+
+    def test_login_breakdown(self, app, client):
+        app.config["SERVER_TIMING_ENABLED"] = True
+        r = client.post("/api/auth/login", json=CREDENTIALS)
+        phases = _phases(r)
+        assert {"argon2", "db", "redis", "commit", "total"} <= set(phases)
+        assert phases["argon2"][1] == "1"
+        assert phases["total"][0] >= phases["argon2"][0]
+
+    def test_register_includes_zxcvbn_and_sanitize(self, app, client):
+        app.config["SERVER_TIMING_ENABLED"] = True
+        r = client.post(
+            "/api/auth/register",
+            json={"email": "new@example.com", "username": "new", "password": STRONG_TEST_PASSWORD},
+        )
+        assert r.status_code == 201
+        assert {"zxcvbn", "sanitize", "argon2"} <= set(_phases(r))
+
+    def test_admin_token(self, app, client):
+        app.config["SERVER_TIMING_TOKEN"] = "diag-secret"
+        r = client.get("/health", headers={"X-Server-Timing": "wrong"})
+        assert "Server-Timing" not in r.headers
+        r = client.get("/health", headers={"X-Server-Timing": "diag-secret"})
+        assert "db" in _phases(r)
+
+    def test_batch_sub_requests_fold_into_batch(self, app, client):
+        r = client.post("/api/auth/login", json=CREDENTIALS)
+        auth = {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+        app.config["SERVER_TIMING_ENABLED"] = True
+        r = client.post(
+            "/api/batch",
+            headers=auth,
+            json={"requests": [{"path": "/api/passwords/"}, {"path": "/api/users/profile"}]},
+        )
+        assert r.status_code == 200
+        # Une unité de travail par sous-requête + celle du lot
+        assert _phases(r)["commit"][1] == "3"
+
+
+def test_format_header():
+    header = format_header({"db": [0.002, 3], "argon2": [0.15, 1]}, 0.2)
+    assert header == 'argon2;dur=150.0;desc="1x", db;dur=2.0;desc="3x", total;dur=200.0'
+
+
+def test_slow_request_logged(app, client, caplog):
+    app.config["SLOW_REQUEST_MS"] = 0.001
+    with caplog.at_level(logging.WARNING, logger="server_timing"):
+        client.post("/api/auth/login", json=CREDENTIALS)
+    [message] = [r.getMessage() for r in caplog.records if r.name == "server_timing"]
+    assert message.startswith("Requête lente POST /api/auth/login → 200")
+    assert "argon2=" in message
+
+
+def test_failed_statement_leaves_no_pending_start(app):
+    with app.app_context(), db.engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        # Connexion rendue au pool : aucun départ orphelin pour la requête suivante
+        assert conn.info.get("_timing_sql") == []
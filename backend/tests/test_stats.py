@@ -0,0 +1,136 @@
+"""
+Statistiques du tableau de bord (/api/passwords/stats) : agrégats sur TOUT le
+coffre en une requête groupée, histogrammes d'âge et cache Redis invalidé à
+l'écriture.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+from sqlalchemy import event
+
+from app_entry import create_app, db
+from app.models import User, Password
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from app.services.stats_service import compute_vault_stats
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email="stats@example.com", username="stats")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": "stats@example.com", "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _seed(app, count, **fields):
+    with app.app_context():
+        uid = User.query.first().id
+        for i in range(count):
+            db.session.add(
+                Password(
+                    user_id=uid,
+                    site_name=f"site{i}",
+                    username="u",
+                    encrypted_password="x",
+                    **fields,
+                )
+            )
+        db.session.commit()
+        return uid
+
+
+class TestVaultStats:
+    def test_counts_whole_vault_not_first_page(self, app, client, auth):
+        _seed(app, 25, password_strength=5, category="work")
+        _seed(app, 3, password_strength=1, category="social", is_favorite=True)
+        _seed(app, 2, password_strength=3)
+
+        r = client.get("/api/passwords/stats", headers=auth)
+        assert r.status_code == 200
+        stats = json.loads(r.data)
+        assert stats["total"] == 30
+        assert (stats["weak"], stats["medium"], stats["strong"]) == (3, 2, 25)
+        assert stats["favorites"] == 3
+        assert stats["categories"] == 2
+        assert stats["category_counts"] == [
+            {"category": "work", "count": 25},
+            {"category": "social", "count": 3},
+        ]
+        assert stats["recently_added"] == 30
+
+    def test_age_histograms(self, app):
+        now = datetime.utcnow()
+        _seed(app, 2, password_changed_at=now - timedelta(days=10))
+        _seed(app, 1, password_changed_at=now - timedelta(days=100))
+        uid = _seed(app, 4, password_changed_at=now - timedelta(days=400))
+        with app.app_context():
+            stats = compute_vault_stats(uid, now=now)
+        assert stats["password_age"] == {
+            "0-30d": 2,
+            "30-90d": 0,
+            "90-180d": 1,
+            "180-365d": 0,
+            "365d+": 4,
+        }
+        assert stats["entry_age"]["0-30d"] == 7
+
+    def test_single_sql_query(self, app):
+        uid = _seed(app, 5, category="a")
+        _seed(app, 5, category="b")
+        statements = []
+        with app.app_context():
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, "before_cursor_execute", listener)
+            try:
+                compute_vault_stats(uid)
+            finally:
+                event.remove(db.engine, "before_cursor_execute", listener)
+        assert len(statements) == 1
+
+    def test_cached_then_invalidated_on_write(self, app, client, auth):
+        _seed(app, 2)
+        assert json.loads(client.get("/api/passwords/stats", headers=auth).data)["total"] == 2
+        assert app.redis.keys("stats:*")
+
+        r = client.post(
+            "/api/passwords/",
+            headers=auth,
+            data=json.dumps({"site_name": "n.com", "username": "u", "password": "S3cret!"}),
+            content_type="application/json",
+        )
+        assert r.status_code == 201
+        assert not app.redis.keys("stats:*")
+        assert json.loads(client.get("/api/passwords/stats", headers=auth).data)["total"] == 3
@@ -0,0 +1,205 @@
+"""
+Synchronisation delta (/api/passwords/changes) : jeton monotone, tombstones,
+pagination keyset sans perte et compaction.
+"""
+
+import base64
+import json
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from app.models import User, Password, PasswordTombstone
+from app.services import sync_service
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        db.create_all()
+        user = User(email="sync@example.com", username="sync")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post(
+        "/api/auth/login",
+        data=json.dumps({"email": "sync@example.com", "password": STRONG_TEST_PASSWORD}),
+        content_type="application/json",
+    )
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _create(client, auth, site):
+    r = client.post(
+        "/api/passwords/",
+        headers=auth,
+        data=json.dumps({"site_name": site, "username": "u", "password": "S3cret!"}),
+        content_type="application/json",
+    )
+    assert r.status_code == 201
+    return json.loads(r.data)["password"]["id"]
+
+
+def _changes(client, auth, since=None, limit=None):
+    params = {}
+    if since:
+        params["since"] = since
+    if limit:
+        params["limit"] = limit
+    r = client.get("/api/passwords/changes", headers=auth, query_string=params)
+    return r.status_code, json.loads(r.data)
+
+
+class TestDeltaSync:
+    def test_initial_sync_returns_whole_vault(self, client, auth):
+        ids = {_create(client, auth, f"site{i}.com") for i in range(3)}
+        status, body = _changes(client, auth)
+        assert status == 200
+        assert {e["id"] for e in body["updated"]} == ids
+        assert body["deleted"] == []
+        assert body["has_more"] is False
+        assert "password" not in body["updated"][0]  # jamais de secret en clair
+
+    def test_only_delta_after_token(self, client, auth):
+        _create(client, auth, "old.com")
+        _, body = _changes(client, auth)
+        token = body["sync_token"]
+
+        new_id = _create(client, auth, "new.com")
+        status, body = _changes(client, auth, since=token)
+        assert status == 200
+        assert [e["id"] for e in body["updated"]] == [new_id]
+
+        # Rien de neuf : delta vide, curseur avancé, jamais en arrière (monotone)
+        _, empty = _changes(client, auth, since=body["sync_token"])
+        assert empty["updated"] == [] and empty["deleted"] == []
+        before, _ = sync_service.decode_sync_token(body["sync_token"])
+        after, _ = sync_service.decode_sync_token(empty["sync_token"])
+        assert after[0] >= before[0]
+
+    def test_delete_produces_tombstone(self, client, auth):
+        pid = _create(client, auth, "gone.com")
+        _, body = _changes(client, auth)
+        token = body["sync_token"]
+
+        assert client.delete(f"/api/passwords/{pid}", headers=auth).status_code == 200
+        _, body = _changes(client, auth, since=token)
+        assert body["updated"] == []
+        assert [t["id"] for t in body["deleted"]] == [pid]
+
+    def test_reveal_is_not_a_content_change(self, app, client, auth):
+        pid = _create(client, auth, "seen.com")
+        _, body = _changes(client, auth)
+        token = body["sync_token"]
+
+        assert client.get(f"/api/passwords/{pid}", headers=auth).status_code == 200
+        _, body = _changes(client, auth, since=token)
+        assert body["updated"] == []
+        with app.app_context():
+            assert db.session.get(Password, pid).last_used is not None
+
+    def test_pagination_is_lossless_with_equal_timestamps(self, app, client, auth):
+        ids = [_create(client, auth, f"s{i}.com") for i in range(5)]
+        same = datetime.utcnow().replace(microsecond=0) - timedelta(hours=1)
+        with app.app_context():
+            Password.query.update({Password.updated_at: same})
+            db.session.commit()
+
+        seen, token = [], None
+        for _ in range(10):
+            _, body = _changes(client, auth, since=token, limit=2)
+            seen += [e["id"] for e in body["updated"]]
+            token = body["sync_token"]
+            if not body["has_more"]:
+                break
+        assert sorted(seen) == sorted(ids)
+        assert len(seen) == len(set(seen))
+
+    def test_cursor_without_id_does_not_compare_ids(self):
+        # `id > ''` est invalide pour une colonne UUID (PostgreSQL)
+        predicate = sync_service._after(
+            Password.updated_at, Password.id, sync_service.INITIAL_CURSOR
+        )
+        assert "passwords.id" not in str(predicate)
+
+    def test_invalid_token_400(self, client, auth):
+        status, body = _changes(client, auth, since="not-a-token")
+        assert status == 400
+
+    def test_token_older_than_retention_requires_full_resync(self, app, client, auth):
+        year_ago = datetime.utcnow() - timedelta(days=365)
+        stale = sync_service.encode_sync_token((year_ago, ""), year_ago)
+        status, body = _changes(client, auth, since=stale)
+        assert status == 410
+        assert body["code"] == "full_resync_required"
+
+    def test_idle_vault_older_than_retention_keeps_syncing(self, app, client, auth):
+        _create(client, auth, "a.com")
+        _create(client, auth, "b.com")
+        with app.app_context():
+            Password.query.update({Password.updated_at: datetime.utcnow() - timedelta(days=200)})
+            db.session.commit()
+
+        # Synchronisation complète paginée : la page 2 part d'un curseur ancien
+        status, body = _changes(client, auth, limit=1)
+        assert status == 200 and body["has_more"] is True
+        status, body = _changes(client, auth, since=body["sync_token"], limit=1)
+        assert status == 200 and body["has_more"] is False
+        for _ in range(2):
+            status, body = _changes(client, auth, since=body["sync_token"])
+            assert status == 200
+            assert body["updated"] == []
+        (cursor_ts, _), _ = sync_service.decode_sync_token(body["sync_token"])
+        assert cursor_ts > datetime.utcnow() - timedelta(minutes=1)
+
+    def test_legacy_v1_token_still_accepted(self, client, auth):
+        raw = f"v1:{10**15}:".encode()  # ~2001, antérieur à la rétention
+        legacy = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+        assert _changes(client, auth, since=legacy)[0] == 410
+
+
+class TestTombstoneCompaction:
+    def test_compaction_purges_only_expired(self, app):
+        with app.app_context():
+            uid = User.query.first().id
+            db.session.add_all(
+                [
+                    PasswordTombstone(
+                        id="old", user_id=uid, deleted_at=datetime.utcnow() - timedelta(days=200)
+                    ),
+                    PasswordTombstone(id="recent", user_id=uid),
+                ]
+            )
+            db.session.commit()
+
+            assert sync_service.compact_tombstones(90) == 1
+            assert [t.id for t in PasswordTombstone.query.all()] == ["recent"]
+
+    def test_cli_command(self, app):
+        result = app.test_cli_runner().invoke(args=["compact-tombstones"])
+        assert "0 tombstone(s) compacted" in result.output
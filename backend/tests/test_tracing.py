@@ -0,0 +1,174 @@
+"""
+X-Request-ID (repris ou généré, renvoyé, présent dans les logs et l'audit) et
+traces : spans imbriqués, échantillonnage en fin de requête, export OTLP JSON.
+"""
+
+import json
+import logging
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from app.models import AuditLog, User
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from config import TestingConfig
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+from tracing import JsonLinesExporter, Trace, to_otlp
+
+CREDENTIALS = {"email": "tracing@example.com", "password": STRONG_TEST_PASSWORD}
+
+
+class ListExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "TRACING_ENABLED", True, raising=False)
+    monkeypatch.setattr(TestingConfig, "TRACE_SAMPLE_RATE", 1.0, raising=False)
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    app.trace_exporter = ListExporter()
+
+    @app.route("/_test/log")
+    def log_endpoint():
+        logging.getLogger("tests.tracing").warning("dans la requête")
+        return {"ok": True}
+
+    @app.route("/_test/fail")
+    def fail_endpoint():
+        raise RuntimeError("boom")
+
+    with app.app_context():
+        db.create_all()
+        user = User(email=CREDENTIALS["email"], username="tracing")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _spans(trace):
+    return {span.name: span for span in trace.spans}
+
+
+class TestRequestId:
+    def test_generated_and_echoed(self, client):
+        request_id = client.get("/health").headers["X-Request-ID"]
+        assert len(request_id) == 32 and int(request_id, 16) >= 0
+
+    def test_incoming_kept_when_safe(self, client):
+        r = client.get("/health", headers={"X-Request-ID": "nginx-42.a:b"})
+        assert r.headers["X-Request-ID"] == "nginx-42.a:b"
+        r = client.get("/health", headers={"X-Request-ID": "<script>"})
+        assert r.headers["X-Request-ID"] != "<script>"
+
+    def test_in_log_records(self, client, caplog):
+        with caplog.at_level(logging.WARNING, logger="tests.tracing"):
+            r = client.get("/_test/log", headers={"X-Request-ID": "req-log-1"})
+        [record] = [r for r in caplog.records if r.name == "tests.tracing"]
+        assert record.request_id == "req-log-1"
+        assert r.headers["X-Request-ID"] == "req-log-1"
+
+    def test_in_audit_rows(self, app, client):
+        client.post("/api/auth/login", json=CREDENTIALS, headers={"X-Request-ID": "req-audit-1"})
+        entry = AuditLog.query.filter_by(action="LOGIN_SUCCESS").one()
+        assert entry.request_id == "req-audit-1"
+        assert entry.to_dict()["request_id"] == "req-audit-1"
+
+
+class TestSpans:
+    def test_login_spans_nested(self, app, client):
+        r = client.post("/api/auth/login", json=CREDENTIALS)
+        [trace] = app.trace_exporter.traces
+        assert trace.trace_id == r.headers["X-Request-ID"]
+        spans = _spans(trace)
+        root = trace.root
+        assert root.name == "POST /api/auth/login" and root.parent_id is None
+        assert root.attributes["http.status_code"] == 200
+        assert {"rate_limit", "crypto.argon2id", "db.query", "crypto.aes_gcm.decrypt"} <= set(spans)
+        assert any(name.startswith("redis.") for name in spans)
+        ids = {span.span_id for span in trace.spans}
+        assert all(span.parent_id in ids for span in trace.spans[1:])
+        assert all(span.end_ns >= span.start_ns for span in trace.spans)
+
+    def test_token_required_wraps_session_lookup(self, app, client):
+        r = client.post("/api/auth/login", json=CREDENTIALS)
+        token = json.loads(r.data)["tokens"]["access_token"]
+        client.get("/api/passwords/", headers={"Authorization": f"Bearer {token}"})
+        spans = _spans(app.trace_exporter.traces[-1])
+        auth = spans["auth.token_required"]
+        assert spans["redis.session_getex"].parent_id == auth.span_id
+
+    def test_span_cap(self, app, client):
+        app.config["TRACE_MAX_SPANS"] = 2
+        client.post("/api/auth/login", json=CREDENTIALS)
+        [trace] = app.trace_exporter.traces
+        assert len(trace.spans) == 2
+        assert trace.root.attributes["trace.dropped_spans"] == trace.dropped > 0
+
+
+class TestTailSampling:
+    def test_fast_success_dropped(self, app, client):
+        app.config["TRACE_SAMPLE_RATE"] = 0.0
+        client.get("/health")
+        assert app.trace_exporter.traces == []
+
+    def test_slow_kept(self, app, client):
+        app.config["TRACE_SAMPLE_RATE"] = 0.0
+        app.config["TRACE_SLOW_MS"] = 0.001
+        client.get("/health")
+        assert len(app.trace_exporter.traces) == 1
+
+    def test_error_kept(self, app, client):
+        app.config["TRACE_SAMPLE_RATE"] = 0.0
+        app.config["PROPAGATE_EXCEPTIONS"] = False
+        r = client.get("/_test/fail")
+        assert r.status_code == 500
+        [trace] = app.trace_exporter.traces
+        assert trace.root.error and trace.root.name == "GET /_test/fail"
+
+
+def test_disabled_by_default():
+    app = create_app("testing")
+    assert not hasattr(app, "trace_exporter")
+    r = app.test_client().get("/")
+    assert "X-Request-ID" in r.headers
+
+
+def test_json_lines_exporter(tmp_path):
+    trace = Trace("0" * 31 + "1", max_spans=10)
+    root = trace.start("GET /health", 2, {"http.status_code": 200})
+    trace.end(trace.start("db.query", 3, {"db.statement": "SELECT 1"}), error="OperationalError")
+    trace.end(root)
+    path = tmp_path / "traces" / "spans.jsonl"
+    JsonLinesExporter(str(path), "svc").export(trace)
+
+    [line] = path.read_text().splitlines()
+    document = json.loads(line)
+    assert document == to_otlp(trace, "svc")
+    [resource] = document["resourceSpans"]
+    assert {"key": "service.name", "value": {"stringValue": "svc"}} in resource["resource"]["attributes"]
+    root_span, child = resource["scopeSpans"][0]["spans"]
+    assert child["parentSpanId"] == root_span["spanId"] and "parentSpanId" not in root_span
+    assert child["status"] == {"code": 2, "message": "OperationalError"}
+    assert root_span["attributes"] == [{"key": "http.status_code", "value": {"intValue": "200"}}]
@@ -0,0 +1,175 @@
+"""
+Unité de travail par requête : un seul COMMIT par requête (métier + audit),
+effets de bord isolés (SAVEPOINT en écriture), audit conservé et métier annulé sur
+une réponse 5xx (ou 4xx d'une écriture), COMMIT final en échec = 500 pour une
+écriture uniquement.
+"""
+
+import json
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from app.models import AuditLog, Password, User
+from app.services.encryption_service import EncryptionService
+from app.services.session_key_store import SessionKeyStore
+from app.services.session_service import RefreshRegistry
+from rate_limiter import RateLimiter
+from tests.passwords import STRONG_TEST_PASSWORD
+from unit_of_work import side_effect
+
+CREDENTIALS = {"email": "uow@example.com", "password": STRONG_TEST_PASSWORD}
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.config["DB_COMMIT_HEADER"] = True
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+
+    @app.route("/_test/write-with-side-effect", methods=["POST"])
+    def write_with_side_effect():
+        user = User.query.filter_by(email="uow@example.com").one()
+        user.username = "renamed"
+        with side_effect("TEST"):
+            user.failed_login_attempts = 7
+            db.session.flush()
+            raise RuntimeError("side effect failure")
+        return {"ok": True}
+
+    with app.app_context():
+        db.create_all()
+        user = User(email="uow@example.com", username="uow")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(
+            STRONG_TEST_PASSWORD
+        )
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post("/api/auth/login", json=CREDENTIALS)
+    return {"Authorization": f"Bearer {json.loads(r.data)['tokens']['access_token']}"}
+
+
+def _create(client, auth):
+    return client.post(
+        "/api/passwords/",
+        headers=auth,
+        json={"site_name": "s", "username": "u", "password": "Xq9#Lm2$Tz7!"},
+    )
+
+
+def _audit(action):
+    db.session.expire_all()
+    return AuditLog.query.filter_by(action=action).all()
+
+
+class TestSingleCommit:
+    def test_one_commit_per_request(self, client, auth):
+        created = _create(client, auth)
+        entry_id = json.loads(created.data)["password"]["id"]
+        responses = {
+            "register": client.post(
+                "/api/auth/register",
+                json={"email": "new@example.com", "username": "new", "password": STRONG_TEST_PASSWORD},
+            ),
+            "login": client.post("/api/auth/login", json=CREDENTIALS),
+            "login_failed": client.post(
+                "/api/auth/login", json=dict(CREDENTIALS, password="wrong-password")
+            ),
+            "create": created,
+            "get": client.get(f"/api/passwords/{entry_id}", headers=auth),
+            "update": client.put(
+                f"/api/passwords/{entry_id}", headers=auth, json={"site_name": "r"}
+            ),
+            "delete": client.delete(f"/api/passwords/{entry_id}", headers=auth),
+        }
+        assert {name: r.headers["X-DB-Commits"] for name, r in responses.items()} == {
+            name: "1" for name in responses
+        }
+        assert responses["login_failed"].status_code == 401
+        assert User.query.filter_by(email="uow@example.com").one().failed_login_attempts == 1
+        assert len(_audit("VIEW_PASSWORD")) == 1
+
+    def test_cache_invalidated_after_commit(self, app, client, auth):
+        client.get("/api/passwords/stats", headers=auth)
+        assert app.redis.keys("stats:*")
+        assert _create(client, auth).status_code == 201
+        assert not app.redis.keys("stats:*")
+
+
+class TestFailures:
+    def test_side_effect_failure_on_read(self, client, auth, monkeypatch):
+        entry_id = json.loads(_create(client, auth).data)["password"]["id"]
+        Password.query.update({Password.password_fingerprint: None})
+        db.session.commit()
+
+        def boom(*args):
+            raise RuntimeError("fingerprint failure")
+
+        monkeypatch.setattr("app.routes.passwords.compute_fingerprint", boom)
+        r = client.get(f"/api/passwords/{entry_id}", headers=auth)
+        assert r.status_code == 200
+        assert json.loads(r.data)["password"] == "Xq9#Lm2$Tz7!"
+
+        db.session.expire_all()
+        entry = db.session.get(Password, entry_id)
+        assert entry.last_used is None and entry.password_fingerprint is None
+        assert len(_audit("VIEW_PASSWORD")) == 1
+
+    def test_side_effect_savepoint_on_write(self, client):
+        r = client.post("/_test/write-with-side-effect")
+        assert r.status_code == 200 and r.headers["X-DB-Commits"] == "1"
+        db.session.expire_all()
+        user = User.query.filter_by(email="uow@example.com").one()
+        assert user.username == "renamed" and user.failed_login_attempts == 0
+
+    def test_server_error_rolls_back_writes_but_keeps_audit(self, client, auth, monkeypatch):
+        def boom(self):
+            raise RuntimeError("serialization failure")
+
+        monkeypatch.setattr(Password, "to_dict", boom)
+        assert _create(client, auth).status_code == 500
+        monkeypatch.undo()
+
+        assert Password.query.count() == 0
+        assert [a.success for a in _audit("CREATE_PASSWORD")][-1] is False
+
+    def test_client_error_rolls_back_writes(self, client, auth):
+        r = client.put(
+            "/api/users/profile",
+            headers=auth,
+            json={"email": "new@example.com", "username": "x" * 150},
+        )
+        assert r.status_code == 400
+        db.session.expire_all()
+        assert User.query.filter_by(email="new@example.com").count() == 0
+        assert User.query.filter_by(email="uow@example.com").one().username == "uow"
+
+    def test_failed_final_commit(self, client, auth, monkeypatch):
+        entry_id = json.loads(_create(client, auth).data)["password"]["id"]
+
+        def boom():
+            raise RuntimeError("commit failure")
+
+        monkeypatch.setattr(db.session, "commit", boom)
+        write = _create(client, auth)
+        read = client.get(f"/api/passwords/{entry_id}", headers=auth)
+        monkeypatch.undo()
+
+        assert write.status_code == 500
+        assert read.status_code == 200
+        assert Password.query.count() == 1
@@ -0,0 +1,79 @@
+"""
+Démarrage : modules lourds chargés à la demande, préchauffage (warmup.py).
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import fakeredis
+import pytest
+
+from app_entry import create_app, db
+from warmup import warmup, warmup_connections, warmup_modules
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ("zxcvbn", "bleach", "flask_migrate", "alembic")
+
+# Interpréteur neuf : les autres tests ont déjà importé ces modules ici
+_PROBE = f"""
+import importlib.util, json, sys
+spec = importlib.util.spec_from_file_location("app_entry", "app.py")
+module = importlib.util.module_from_spec(spec)
+sys.modules["app_entry"] = module
+spec.loader.exec_module(module)
+app = module.create_app("testing")
+loaded = [name for name in {LAZY_MODULES!r} if name in sys.modules]
+if "--warmup" in sys.argv:
+    from warmup import warmup_modules
+    warmup_modules()
+print(json.dumps({{"before": loaded, "after": [n for n in {LAZY_MODULES!r} if n in sys.modules]}}))
+"""
+
+
+def _probe(*args):
+    env = {k: v for k, v in os.environ.items() if k != "FLASK_RUN_FROM_CLI"}
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE, *args],
+        cwd=_BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.redis = fakeredis.FakeStrictRedis()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+class TestLazyImports:
+    def test_heavy_modules_not_loaded_at_startup(self):
+        assert _probe()["before"] == []
+
+    def test_warmup_loads_zxcvbn_and_bleach(self):
+        assert _probe("--warmup")["after"] == ["zxcvbn", "bleach"]
+
+
+class TestWarmup:
+    def test_modules(self):
+        timings = warmup_modules()
+        assert set(timings) == {"zxcvbn", "bleach"}
+        assert all(seconds >= 0 for seconds in timings.values())
+
+    def test_connections(self, app):
+        assert set(warmup_connections(app)) == {"database", "redis"}
+
+    def test_unavailable_dependency_does_not_block_startup(self, app, monkeypatch):
+        def down():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(app.redis, "ping", down)
+        timings = warmup(app, connections=True)
+        assert "redis" not in timings
+        assert "zxcvbn" in timings
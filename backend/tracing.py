@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Identifiant de requête et traces (spans imbriqués) exportées au format OTLP JSON.
+
+Identifiant de requête (toujours actif) : l'en-tête `X-Request-ID` entrant est
+repris s'il est sûr (`[A-Za-z0-9._:-]`, 64 caractères au plus, ex. posé par
+Nginx), sinon un identifiant est généré. Il est renvoyé dans la réponse,
+ajouté à chaque enregistrement de log (`%(request_id)s`, voir LOG_FORMAT) et
+aux lignes d'audit (`audit_logs.request_id`).
+
+Traces (si TRACING_ENABLED) : un span racine par requête (`GET /api/...`) et
+des spans imbriqués pour `token_required`, le rate limiter, chaque requête SQL,
+chaque aller-retour Redis et les appels `EncryptionService` (Argon2id, AES-GCM).
+Les spans restent en mémoire pendant la requête ; l'échantillonnage se décide
+à la fin (« tail-based ») : la trace est conservée si la requête a échoué
+(5xx, exception, span en erreur), si elle a duré au moins TRACE_SLOW_MS, ou
+pour une fraction TRACE_SAMPLE_RATE des autres. Les traces conservées sont
+passées à `app.trace_exporter` (remplaçable ; par défaut une ligne JSON OTLP
+`resourceSpans` par trace, ajoutée à TRACE_EXPORT_PATH, lisible par le
+receiver `otlpjsonfile` de l'OpenTelemetry Collector).
+
+Avec un identifiant généré (32 hex), trace_id == request_id : un log se
+rattache directement à sa trace. Jamais de paramètres SQL ni de valeurs Redis
+dans les attributs : seulement le texte des requêtes et le nom des opérations.
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+_SAFE_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+_TRACE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# Types de span OTLP
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+_STATUS_ERROR = 2
+
+_STATEMENT_MAX_LENGTH = 1000
+
+
+def current_request_id():
+    """Identifiant de la requête courante (None hors requête)."""
+    if has_request_context():
+        return g.get("request_id")
+    return None
+
+
+def _install_log_record_factory():
+    """Ajouter `request_id` à chaque LogRecord ("-" hors requête), une seule fois."""
+    base_factory = logging.getLogRecordFactory()
+    if getattr(base_factory, "adds_request_id", False):
+        return
+
+    def factory(*args, **kwargs):
+        record = base_factory(*args, **kwargs)
+        record.request_id = current_request_id() or "-"
+        return record
+
+    factory.adds_request_id = True
+    logging.setLogRecordFactory(factory)
+
+
+_install_log_record_factory()
+
+
+class Span:
+    """Intervalle nommé d'une trace (horodatages en nanosecondes Unix)."""
+
+    __slots__ = (
+        "name", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes", "error"
+    )
+
+    def __init__(self, name, parent_id, kind, attributes):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_otlp(self, trace_id):
+        otlp = {
+            "traceId": trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+        }
+        if self.parent_id:
+            otlp["parentSpanId"] = self.parent_id
+        if self.error:
+            otlp["status"] = {"code": _STATUS_ERROR, "message": self.error}
+        return otlp
+
+
+class Trace:
+    """Spans d'une requête, avec la pile des spans ouverts (imbrication)."""
+
+    def __init__(self, trace_id, max_spans):
+        self.trace_id = trace_id
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self._open = []
+
+    @property
+    def root(self):
+        return self.spans[0] if self.spans else None
+
+    def start(self, name, kind=KIND_INTERNAL, attributes=None):
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return None
+        parent = self._open[-1].span_id if self._open else None
+        span_ = Span(name, parent, kind, attributes or {})
+        self.spans.append(span_)
+        self._open.append(span_)
+        return span_
+
+    def end(self, span_, error=None):
+        if span_ is None:
+            return
+        span_.end_ns = time.time_ns()
+        if error:
+            span_.error = error
+        if span_ in self._open:
+            # Fermer aussi les spans enfants restés ouverts (exception)
+            while self._open.pop() is not span_:
+                pass
+
+    @property
+    def has_error(self):
+        return any(span_.error for span_ in self.spans)
+
+
+def _trace():
+    if has_request_context():
+        return g.get("_trace")
+    return None
+
+
+@contextmanager
+def span(name, kind=KIND_INTERNAL, attributes=None):
+    """Span enfant du span ouvert courant (sans effet si la requête n'est pas tracée)."""
+    trace = _trace()
+    if trace is None:
+        yield None
+        return
+    span_ = trace.start(name, kind, attributes)
+    try:
+        yield span_
+    except Exception as e:
+        trace.end(span_, error=type(e).__name__)
+        raise
+    else:
+        trace.end(span_)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _sql_span_start(conn, cursor, statement, parameters, context, executemany):
+    trace = _trace()
+    if trace is not None:
+        span_ = trace.start(
+            "db.query",
+            KIND_CLIENT,
+            {"db.system": conn.dialect.name, "db.statement": statement[:_STATEMENT_MAX_LENGTH]},
+        )
+        conn.info.setdefault("_trace_sql", []).append(span_)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _sql_span_end(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("_trace_sql")
+    trace = _trace()
+    if spans and trace is not None:
+        trace.end(spans.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _sql_span_error(exception_context):
+    connection = exception_context.connection
+    spans = connection.info.get("_trace_sql") if connection is not None else None
+    trace = _trace()
+    if spans and trace is not None:
+        trace.end(spans.pop(), error=type(exception_context.original_exception).__name__)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(trace, service_name):
+    """Document OTLP JSON (`resourceSpans`) d'une trace."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": _otlp_attributes(
+                        {"service.name": service_name, "process.pid": os.getpid()}
+                    )
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [span_.to_otlp(trace.trace_id) for span_ in trace.spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class JsonLinesExporter:
+    """Exporteur par défaut : une ligne OTLP JSON par trace, en ajout."""
+
+    def __init__(self, path, service_name):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, trace):
+        line = json.dumps(to_otlp(trace, self.service_name), separators=(",", ":"))
+        directory = os.path.dirname(self.path)
+        with self._lock:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def _incoming_request_id():
+    supplied = request.headers.get(REQUEST_ID_HEADER)
+    if supplied and _SAFE_REQUEST_ID.match(supplied):
+        return supplied
+    return uuid.uuid4().hex
+
+
+def _keep(app, trace, status_code, duration_ms):
+    """Échantillonnage en fin de requête : erreurs et lenteurs toujours gardées."""
+    if status_code >= 500 or trace.has_error:
+        return True
+    slow_ms = app.config["TRACE_SLOW_MS"]
+    if slow_ms and duration_ms >= slow_ms:
+        return True
+    return random.random() < app.config["TRACE_SAMPLE_RATE"]
+
+
+def setup_tracing(app):
+    """Configurer l'identifiant de requête et, si TRACING_ENABLED, les traces.
+
+    À enregistrer AVANT les autres middlewares : l'identifiant existe dès le
+    premier log, et le span racine couvre aussi le COMMIT et la compression.
+    Les sous-requêtes d'un lot (/api/batch) partagent l'identifiant et la trace
+    du lot (dispatchées sans les hooks de requête).
+    """
+    tracing_enabled = app.config.get("TRACING_ENABLED")
+    if tracing_enabled and not hasattr(app, "trace_exporter"):
+        app.trace_exporter = JsonLinesExporter(
+            app.config["TRACE_EXPORT_PATH"], app.config["TRACE_SERVICE_NAME"]
+        )
+
+    @app.before_request
+    def start_request_trace():
+        g.request_id = _incoming_request_id()
+        if not tracing_enabled:
+            return
+        trace_id = g.request_id if _TRACE_ID.match(g.request_id) else uuid.uuid4().hex
+        trace = Trace(trace_id, app.config["TRACE_MAX_SPANS"])
+        trace.start(
+            request.method,
+            KIND_SERVER,
+            {"http.method": request.method, "http.request_id": g.request_id},
+        )
+        g._trace = trace
+
+    def _finish(status_code, error=None):
+        trace = g.pop("_trace", None)
+        if trace is None:
+            return
+        root = trace.root
+        rule = request.url_rule
+        route = rule.rule if rule is not None else "<unmatched>"
+        root.name = f"{request.method} {route}"
+        root.set_attribute("http.route", route)
+        root.set_attribute("http.status_code", status_code)
+        if trace.dropped:
+            root.set_attribute("trace.dropped_spans", trace.dropped)
+        trace.end(root, error=error or (f"HTTP {status_code}" if status_code >= 500 else None))
+        # Spans restés ouverts (ex. exception dans un décorateur) : bornés à la racine
+        for span_ in trace.spans:
+            if span_.end_ns is None:
+                span_.end_ns = root.end_ns
+
+        if not _keep(app, trace, status_code, (root.end_ns - root.start_ns) / 1e6):
+            return
+        try:
+            app.trace_exporter.export(trace)
+        except Exception as e:
+            logger.warning(f"Export de trace impossible: {e}")
+
+    @app.after_request
+    def finish_request_trace(response):
+        request_id = g.get("request_id")
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        _finish(response.status_code)
+        return response
+
+    @app.teardown_request
+    def abort_request_trace(exc):
+        # after_request non exécuté : exporter quand même la trace (en erreur)
+        _finish(500, error=type(exc).__name__ if exc is not None else None)
+
+    return app
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unité de travail par requête : un seul COMMIT en fin de requête.
+
+Avant, une lecture `GET /api/passwords/<id>` committait deux à trois fois
+(effet de bord last_used/backfill, puis l'audit, et un cycle rollback/commit
+en cas d'erreur) ; création, login et inscription suivaient le même schéma.
+Chaque COMMIT est un aller-retour PostgreSQL (et un fsync du WAL).
+
+- Les vues écrivent dans `db.session` sans committer (`flush()` si elles ont
+  besoin d'une contrainte ou d'un identifiant avant de répondre).
+- `stage_audit(entry)` : l'audit est mis de côté hors de la session ; il est
+  persisté en fin de requête même si les écritures métier sont annulées.
+- `stage_write(callback)` : écriture rejouée dans la transaction finale quel
+  que soit le statut (compteur d'échecs de login d'une réponse 401).
+- `side_effect(label)` : effet de bord opportuniste isolé (SAVEPOINT pour une
+  écriture) ; un échec est annulé seul et logué, la réponse n'en dépend jamais.
+- `after_commit(callback)` : action externe (invalidation de cache Redis...)
+  exécutée seulement une fois le COMMIT réussi.
+- Fin de requête : succès → COMMIT unique (métier + audit) ; écriture en
+  échec (statut >= 400), statut >= 500 ou exception → ROLLBACK du métier puis
+  COMMIT de l'audit seul. Une lecture (GET) en 4xx garde ses effets de bord.
+  Un COMMIT final en échec transforme la réponse d'une écriture en 500 ; une
+  lecture n'en dépend jamais.
+
+Le nombre de COMMIT de la requête est mesurable (`commit_count()`, en-tête
+`X-DB-Commits` si DB_COMMIT_HEADER est activé).
+"""
+
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from extensions import db
+from metrics import AUDIT_WRITE_SECONDS
+from server_timing import record
+
+logger = logging.getLogger(__name__)
+
+# Méthodes sans écriture métier : leurs écritures (audit, last_used...) sont
+# des effets de bord, un COMMIT final en échec ne change pas la réponse.
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_manual_transactions(dbapi_connection, connection_record):
+    # pysqlite ouvre ses transactions lui-même (et seulement avant un DML) :
+    # un SAVEPOINT émis hors transaction devient alors la transaction, et son
+    # RELEASE vaut COMMIT. Recette SQLAlchemy : désactiver la gestion du pilote
+    # et émettre BEGIN explicitement (SQLite de dev/test uniquement).
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.isolation_level = None
+
+
+@event.listens_for(Engine, "begin")
+def _sqlite_begin(connection):
+    if connection.dialect.name == "sqlite":
+        raw = connection.connection.driver_connection
+        # `:memory:` partage une connexion par thread entre engine et session
+        if not raw.in_transaction:
+            raw.execute("BEGIN")
+
+
+@event.listens_for(Engine, "commit")
+def _count_commit(connection):
+    # COMMIT réellement émis (le RELEASE d'un SAVEPOINT n'en est pas un)
+    if has_request_context():
+        g._uow_commits = g.get("_uow_commits", 0) + 1
+
+
+def _active():
+    return has_request_context() and "_uow_audit" in g
+
+
+def begin_unit():
+    """Ouvrir l'unité de travail de la requête courante."""
+    g._uow_audit = []
+    g._uow_writes = []
+    g._uow_callbacks = []
+
+
+def commit_count():
+    """Nombre de COMMIT émis depuis le début de la requête courante."""
+    return g.get("_uow_commits", 0)
+
+
+def stage_audit(entry):
+    """Persister une entrée d'audit avec l'unité de travail courante.
+
+    Hors requête (CLI, tâche de fond), l'entrée est committée immédiatement.
+    """
+    if _active():
+        g._uow_audit.append(entry)
+        return
+    db.session.add(entry)
+    db.session.commit()
+
+
+def stage_write(callback):
+    """Appliquer `callback` (écriture en session) dans la transaction finale.
+
+    Contrairement aux écritures directes de la vue, elle survit au ROLLBACK
+    d'une réponse en échec. Hors requête, elle est committée immédiatement.
+    """
+    if _active():
+        g._uow_writes.append(callback)
+        return
+    callback()
+    db.session.commit()
+
+
+def after_commit(callback):
+    """Exécuter `callback` après le COMMIT final (immédiatement hors requête)."""
+    if _active():
+        g._uow_callbacks.append(callback)
+    else:
+        callback()
+
+
+@contextmanager
+def side_effect(label):
+    """Isoler un effet de bord non bloquant.
+
+    Requête d'écriture : SAVEPOINT, un échec n'annule que l'effet de bord.
+    Lecture (GET) : la transaction ne contient que des effets de bord, un
+    échec l'annule entièrement ; on économise SAVEPOINT et RELEASE (deux
+    allers-retours). L'audit, gardé hors session, n'est jamais perdu.
+    Les exceptions sont avalées et loguées sans détail (le message peut
+    contenir des données de l'entrée).
+    """
+    savepoint = not (has_request_context() and request.method in SAFE_METHODS)
+    try:
+        if savepoint:
+            with db.session.begin_nested():
+                yield
+        else:
+            yield
+            db.session.flush()
+    except Exception as e:
+        if not savepoint:
+            db.session.rollback()
+        current_app.logger.warning(
+            "Effet de bord non bloquant échoué (%s): %s", label, type(e).__name__
+        )
+
+
+def complete_unit(status_code, method="GET"):
+    """Clore l'unité de travail : COMMIT unique, ou audit seul si échec.
+
+    Retourne False si le COMMIT a échoué pour une requête d'écriture (la
+    réponse déjà construite annoncerait à tort un succès).
+    """
+    audit = g.pop("_uow_audit", None)
+    writes = g.pop("_uow_writes", None) or []
+    callbacks = g.pop("_uow_callbacks", None) or []
+    if audit is None:
+        return True
+
+    failed = status_code >= 500 or (status_code >= 400 and method not in SAFE_METHODS)
+    committed = True
+    if not failed:
+        try:
+            for write in writes:
+                write()
+            db.session.add_all(audit)
+            start = time.perf_counter()
+            db.session.commit()
+            elapsed = time.perf_counter() - start
+            record("commit", elapsed)
+            if audit:
+                AUDIT_WRITE_SECONDS.labels("unit").observe(elapsed)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Échec du commit de fin de requête: {e}")
+            committed = False
+    else:
+        db.session.rollback()
+
+    if not committed or failed:
+        callbacks = []
+        if audit or writes:
+            try:
+                for write in writes:
+                    write()
+                db.session.add_all(audit)
+                start = time.perf_counter()
+                db.session.commit()
+                elapsed = time.perf_counter() - start
+                record("commit", elapsed)
+                AUDIT_WRITE_SECONDS.labels("audit_only").observe(elapsed)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Erreur lors de l'audit logging: {e}")
+
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.warning(f"Action post-commit échouée: {type(e).__name__}")
+    return committed or method in SAFE_METHODS
+
+
+def setup_unit_of_work(app):
+    """Configurer l'unité de travail par requête.
+
+    À appeler APRÈS les autres middlewares `after_request` : Flask les exécute
+    en ordre inverse, le COMMIT a donc lieu en premier et une réponse
+    remplacée (500) traverse encore les en-têtes de sécurité et la compression.
+    """
+
+    @app.before_request
+    def open_unit_of_work():
+        g._uow_commits = 0
+        begin_unit()
+
+    @app.after_request
+    def commit_unit_of_work(response):
+        if not complete_unit(response.status_code, request.method):
+            response = jsonify({"error": "Internal server error"})
+            response.status_code = 500
+        if app.config.get("DB_COMMIT_HEADER"):
+            response.headers["X-DB-Commits"] = str(commit_count())
+        return response
+
+    @app.teardown_request
+    def abort_unit_of_work(exc):
+        # Exception non gérée (after_request non exécuté) : audit seul
+        if exc is not None and "_uow_audit" in g:
+            complete_unit(500)
+
+    return app
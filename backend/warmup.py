@@ -0,0 +1,73 @@
+"""
+Préchauffage d'un worker : modules chargés à la demande, puis connexions.
+
+zxcvbn (dictionnaires de fréquence) et bleach ne sont importés qu'au premier
+usage : les tests, la CLI et les outils ne les paient plus au démarrage. En
+production, `wsgi.py` les précharge (WARMUP_ON_START) pour que la première
+inscription ne paie pas l'import :
+
+- avec `gunicorn --preload`, dans le maître avant le fork : les pages des
+  dictionnaires sont partagées en copy-on-write entre les workers ;
+- sans --preload, dans chaque worker à son démarrage.
+
+Les connexions (pool SQLAlchemy, Redis) ne se préchauffent qu'APRÈS le fork
+(`warmup_connections`, hook post_worker_init, voir prefork.py) : une socket
+ouverte dans le maître serait partagée par tous les workers.
+
+Mesures : `python3 tools/startup_profile.py --fast-kdf [--warmup]`.
+"""
+
+import logging
+import time
+
+from sqlalchemy import text
+
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+
+def warmup_modules():
+    """Importer et amorcer zxcvbn et bleach ; renvoie {module: secondes}."""
+    from app.services.password_generator import zxcvbn
+    from validators import SecurityValidator
+
+    timings = {}
+    start = time.perf_counter()
+    zxcvbn("warmup-Correct-Horse-42")
+    timings["zxcvbn"] = time.perf_counter() - start
+    start = time.perf_counter()
+    SecurityValidator.sanitize_html("<b>warmup</b>")
+    timings["bleach"] = time.perf_counter() - start
+    return timings
+
+
+def warmup_connections(app):
+    """Ouvrir une connexion du pool SQLAlchemy et une connexion Redis (après fork)."""
+    timings = {}
+    start = time.perf_counter()
+    with app.app_context():
+        db.session.execute(text("SELECT 1"))
+        db.session.remove()  # la connexion retourne au pool, ouverte
+    timings["database"] = time.perf_counter() - start
+    start = time.perf_counter()
+    app.redis.ping()
+    timings["redis"] = time.perf_counter() - start
+    return timings
+
+
+def warmup(app, connections=False):
+    """Préchauffage complet (connexions seulement si demandé) ; journalise les durées."""
+    timings = warmup_modules()
+    if connections:
+        try:
+            timings.update(warmup_connections(app))
+        except Exception as e:
+            # Dépendance indisponible au démarrage : le worker démarre quand même
+            # (la première requête réessaiera, /health le signale).
+            logger.warning("Préchauffage des connexions impossible : %s", e)
+    logger.info(
+        "Préchauffage : %s",
+        ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in timings.items()),
+    )
+    return timings
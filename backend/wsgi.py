@@ -10,6 +10,7 @@ sous le nom `app_entry` (via importlib) et on expose l'application WSGI `app` :
 """
 
 import importlib.util
+import logging
 import os
 
 _spec = importlib.util.spec_from_file_location(
@@ -18,6 +19,18 @@ _spec = importlib.util.spec_from_file_location(
 _app_entry = importlib.util.module_from_spec(_spec)
 _spec.loader.exec_module(_app_entry)
 
+# Logs applicatifs avec l'identifiant de requête (X-Request-ID)
+from tracing import LOG_FORMAT  # noqa: E402
+
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(), format=LOG_FORMAT)
+
 # Application WSGI servie par gunicorn. create_app() applique le fail-fast des
 # secrets (Lot 1) : gunicorn refuse de démarrer si un secret requis est absent.
 app = _app_entry.create_app()
+
+# Modules chargés à la demande (zxcvbn, bleach) : préchargés ici, dans le maître
+# si gunicorn --preload (partage copy-on-write), sinon dans chaque worker.
+if app.config["WARMUP_ON_START"]:
+    from warmup import warmup
+
+    warmup(app)
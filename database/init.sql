@@ -33,9 +33,11 @@ CREATE TABLE IF NOT EXISTS passwords (
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     site_name VARCHAR(255) NOT NULL,
     site_url VARCHAR(500),
+    site_domain VARCHAR(255),
     username VARCHAR(255) NOT NULL,
     email VARCHAR(255),
     encrypted_password TEXT NOT NULL,
+    password_fingerprint VARCHAR(64),
     category VARCHAR(100),
     tags VARCHAR(500),
     notes TEXT,
@@ -56,6 +58,24 @@ CREATE INDEX IF NOT EXISTS idx_passwords_user_id ON passwords(user_id);
 CREATE INDEX IF NOT EXISTS idx_passwords_site_name ON passwords(site_name);
 CREATE INDEX IF NOT EXISTS idx_passwords_user_category ON passwords(user_id, category);
 CREATE INDEX IF NOT EXISTS idx_passwords_user_favorite ON passwords(user_id, is_favorite);
+-- Synchronisation delta : (user_id, updated_at) parcouru dans l'ordre du curseur
+CREATE INDEX IF NOT EXISTS idx_user_updated ON passwords(user_id, updated_at);
+-- Détection de réutilisation : GROUP BY empreinte HMAC par utilisateur
+CREATE INDEX IF NOT EXISTS idx_user_fingerprint ON passwords(user_id, password_fingerprint);
+-- Autofill : recherche par domaine enregistrable (égalité, pas d'ILIKE)
+CREATE INDEX IF NOT EXISTS idx_user_domain ON passwords(user_id, site_domain);
+-- Rappels d'expiration : index partiel, seules les entrées datées y figurent
+CREATE INDEX IF NOT EXISTS idx_password_expiry ON passwords(expires_at) WHERE expires_at IS NOT NULL;
+
+-- Tombstones des entrées supprimées (synchronisation delta multi-appareils).
+-- Seul l'id de l'entrée est conservé ; compactés au-delà de la rétention.
+CREATE TABLE IF NOT EXISTS password_tombstones (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_tombstone_user_deleted ON password_tombstones(user_id, deleted_at);
 
 -- Créer la table des logs d'audit
 CREATE TABLE IF NOT EXISTS audit_logs (
@@ -68,6 +88,8 @@ CREATE TABLE IF NOT EXISTS audit_logs (
     user_agent TEXT,
     success BOOLEAN DEFAULT TRUE,
     error_message TEXT,
+    details TEXT,
+    request_id VARCHAR(64),
     timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -75,6 +97,7 @@ CREATE TABLE IF NOT EXISTS audit_logs (
 CREATE INDEX IF NOT EXISTS idx_audit_logs_user_id ON audit_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_audit_logs_timestamp ON audit_logs(timestamp);
 CREATE INDEX IF NOT EXISTS idx_audit_logs_action ON audit_logs(action);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_request_id ON audit_logs(request_id);
 
 -- Créer une fonction pour mettre à jour automatiquement updated_at
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -92,11 +115,37 @@ CREATE TRIGGER update_users_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- passwords.updated_at est le curseur de synchronisation delta : l'application
+-- le fixe elle-même, pour les seuls changements de contenu (une lecture qui met
+-- à jour last_used, un backfill d'empreinte ou de domaine le conservent). Le
+-- trigger ne l'écrase donc jamais ; il ne le renseigne que pour une écriture SQL
+-- directe qui modifie le contenu sans le toucher, à l'horloge réelle
+-- (clock_timestamp, pas le début de la transaction).
+CREATE OR REPLACE FUNCTION update_passwords_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at
+       AND (NEW.site_name, NEW.site_url, NEW.username, NEW.email, NEW.category,
+            NEW.tags, NEW.notes, NEW.is_favorite, NEW.priority, NEW.password_strength,
+            NEW.requires_2fa, NEW.password_changed_at, NEW.expires_at,
+            NEW.remind_before_expiry)
+           IS DISTINCT FROM
+           (OLD.site_name, OLD.site_url, OLD.username, OLD.email, OLD.category,
+            OLD.tags, OLD.notes, OLD.is_favorite, OLD.priority, OLD.password_strength,
+            OLD.requires_2fa, OLD.password_changed_at, OLD.expires_at,
+            OLD.remind_before_expiry)
+    THEN
+        NEW.updated_at = clock_timestamp();
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
 DROP TRIGGER IF EXISTS update_passwords_updated_at ON passwords;
 CREATE TRIGGER update_passwords_updated_at
     BEFORE UPDATE ON passwords
     FOR EACH ROW
-    EXECUTE FUNCTION update_updated_at_column();
+    EXECUTE FUNCTION update_passwords_updated_at_column();
 
 -- Insérer des données de test (optionnel, pour le développement)
 -- (aucune donnée de seed : auth zero-knowledge, pas de hash à insérer)
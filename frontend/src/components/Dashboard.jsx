@@ -58,16 +58,32 @@ const Dashboard = () => {
         return;
       }
 
-      const response = await passwordService.getPasswords();
+      const [response, statsResponse] = await Promise.all([
+        passwordService.getPasswords(),
+        passwordService.getStats(),
+      ]);
 
       if (response.success && response.data) {
         const passwordList = response.data.passwords || [];
 
         setPasswords(passwordList);
 
-        // Calculer les statistiques
-        const stats = calculatePasswordStats(passwordList);
-        setStats(stats);
+        // Statistiques calculées côté serveur sur TOUT le coffre ; repli local
+        // (première page seulement) si l'endpoint est indisponible
+        if (statsResponse.success && statsResponse.data) {
+          const s = statsResponse.data;
+          setStats({
+            total: s.total,
+            weak: s.weak,
+            medium: s.medium,
+            strong: s.strong,
+            categories: s.categories,
+            favorites: s.favorites,
+            recentlyAdded: s.recently_added,
+          });
+        } else {
+          setStats(calculatePasswordStats(passwordList));
+        }
 
         // Récentes activités
         const recent = getRecentPasswords(passwordList, 7); // Last 7 days
@@ -216,6 +216,43 @@ const passwordService = {
     }
   },
 
+  /**
+   * Récupérer les statistiques du tableau de bord (calculées côté serveur sur tout le coffre)
+   */
+  async getStats() {
+    try {
+      const response = await api.get("/passwords/stats");
+      return {
+        success: true,
+        data: response.data,
+      };
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.error || "Failed to fetch statistics",
+      };
+    }
+  },
+
+  /**
+   * Récupérer le rapport de sécurité (réutilisation, faiblesse, ancienneté)
+   * calculé côté serveur, sans déchiffrer les entrées une à une
+   */
+  async getSecurityReport() {
+    try {
+      const response = await api.get("/passwords/security-report");
+      return {
+        success: true,
+        data: response.data,
+      };
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.error || "Failed to fetch security report",
+      };
+    }
+  },
+
   /**
    * Récupérer les presets de génération de mots de passe
    */
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Construction hors ligne du filtre de Bloom des mots de passe compromis.
+
+Lit une ou plusieurs listes locales (un mot de passe par ligne, UTF-8, par ex.
+rockyou.txt ou une extraction d'une fuite publique), dimensionne le filtre pour
+le taux de faux positifs demandé et écrit le fichier binaire que le backend
+mappe en mémoire (BREACH_FILTER_PATH). Les listes sont lues en flux, deux
+passes (comptage puis insertion) : la mémoire utilisée est celle du filtre.
+
+Avec --measure, le filtre produit est rouvert comme en production et mesuré :
+taux de faux positifs réel (sondes aléatoires absentes de la liste), latence
+de consultation et impact RSS (pages mappées, partagées entre workers).
+
+Usage:
+    python3 tools/build_breach_filter.py rockyou.txt -o backend/data/breach.bloom --measure
+    BREACH_FILTER_PATH=/app/data/breach.bloom gunicorn ...
+"""
+import argparse
+import json
+import os
+import secrets
+import sys
+import time
+from array import array
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+)
+
+from app.services.breach_filter import BreachFilter  # noqa: E402
+
+
+def iter_passwords(paths):
+    """Mots de passe des listes, fin de ligne retirée, lignes vides ignorées."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+            for line in fh:
+                password = line.rstrip("\r\n")
+                if password:
+                    yield password
+
+
+def rss_kib():
+    """RSS courant du processus en KiB (Linux : /proc/self/status)."""
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def measure(path, probes):
+    """Mesurer le filtre tel que servi : faux positifs, latence, RSS."""
+    # Sondes et tampon de mesures alloués AVANT la référence RSS : seul le
+    # filtre doit apparaître dans le delta.
+    samples = [secrets.token_urlsafe(12) for _ in range(probes)]
+    timings = array("Q", bytes(8 * probes))
+    rss_before = rss_kib()
+    bloom = BreachFilter(path)
+    rss_opened = rss_kib()
+
+    false_positives = 0
+    for i, candidate in enumerate(samples):
+        start = time.perf_counter_ns()
+        hit = candidate in bloom
+        timings[i] = time.perf_counter_ns() - start
+        false_positives += hit
+    rss_probed = rss_kib()
+
+    timings = sorted(timings)
+    report = {
+        "file_bytes": bloom.size_bytes,
+        "items": bloom.num_items,
+        "num_bits": bloom.num_bits,
+        "num_hashes": bloom.num_hashes,
+        "expected_fp_rate": bloom.expected_fp_rate(),
+        "measured_fp_rate": false_positives / probes,
+        "probes": probes,
+        "lookup_us_p50": timings[len(timings) // 2] / 1000,
+        "lookup_us_p99": timings[int(len(timings) * 0.99)] / 1000,
+    }
+    if rss_before is not None:
+        # Pages du mmap : comptées dans le RSS quand touchées, mais adossées au
+        # cache de pages et PARTAGÉES entre workers (aucune copie par processus).
+        report["rss_kib_after_open"] = rss_opened - rss_before
+        report["rss_kib_after_probes"] = rss_probed - rss_before
+    bloom.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("lists", nargs="+", help="listes de mots de passe (un par ligne)")
+    parser.add_argument("-o", "--output", required=True, help="fichier filtre à écrire")
+    parser.add_argument(
+        "--fp-rate", type=float, default=1e-3, help="taux de faux positifs visé (défaut 1e-3)"
+    )
+    parser.add_argument(
+        "--measure", action="store_true", help="mesurer le filtre produit"
+    )
+    parser.add_argument(
+        "--probes", type=int, default=200000, help="sondes aléatoires pour --measure"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = sum(1 for _ in iter_passwords(args.lists))
+    inserted = BreachFilter.build(
+        iter_passwords(args.lists), args.output, count, args.fp_rate
+    )
+    print(
+        f"✅ {inserted} mots de passe → {args.output} "
+        f"({os.path.getsize(args.output) / 1024 / 1024:.1f} MiB, "
+        f"{time.perf_counter() - start:.1f} s)"
+    )
+
+    if args.measure:
+        print(json.dumps(measure(args.output, args.probes), indent=2))
+
+
+if __name__ == "__main__":
+    main()
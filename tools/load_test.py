@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Générateur de charge local : scénarios réalistes, percentiles par endpoint.
+
+Des utilisateurs virtuels (un thread et une session HTTP keep-alive chacun,
+un compte et un User-Agent distincts : le rate limiting les voit comme des
+clients différents) enchaînent des actions tirées selon un mélange pondéré :
+
+- login   : POST /api/auth/login (Argon2id, nouvelle session) ;
+- list    : GET /api/passwords/?page=N ;
+- search  : GET /api/passwords/?search=... ;
+- reveal  : GET /api/passwords/<id> (déchiffrement) ;
+- create  : POST /api/passwords/ ;
+- update  : PUT /api/passwords/<id> ;
+- refresh : POST /api/auth/refresh (rotation du refresh token).
+
+Mélanges prédéfinis (--mix) : mixed, login-storm, browse, write, ou une liste
+`action=poids,...`. La préparation (comptes, entrées initiales) n'est pas
+mesurée. Rapport : débit, p50/p95/p99, taux d'erreurs (5xx et exceptions) et
+de 429 par endpoint, en tableau et en JSON (--json).
+
+Cibles :
+- un serveur existant (--base-url), ex. gunicorn local avec PostgreSQL/Redis ;
+- --standalone : l'app servie dans ce processus (serveur werkzeug multi-thread,
+  SQLite dans un fichier temporaire, fakeredis). Pratique pour comparer deux
+  versions du code ; les chiffres absolus ne valent pas ceux de gunicorn +
+  PostgreSQL (SQLite : une requête traitée à la fois). --fast-kdf
+  y réduit Argon2id (8 Mio) comme la suite de tests ; --no-rate-limit lève les
+  limites par client (sinon les 429 dominent vite avec les limites de dev).
+
+Usage:
+    python3 tools/load_test.py --base-url http://localhost:5000 --users 20 --duration 60
+    python3 tools/load_test.py --standalone --fast-kdf --mix browse --json report.json
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+# Mot de passe maître des comptes de charge (doit passer le contrôle zxcvbn)
+DEFAULT_PASSWORD = "Charge-Orbitale-Vault-2026!"
+
+MIXES = {
+    "mixed": {"login": 1, "list": 10, "search": 4, "reveal": 4, "create": 1, "update": 1, "refresh": 1},
+    "login-storm": {"login": 1},
+    "browse": {"list": 6, "search": 3, "reveal": 3},
+    "write": {"create": 1, "update": 2, "reveal": 1},
+}
+SEARCH_TERMS = ("Site 1", "mail", "bank", "Site 4", "example")
+
+
+def parse_mix(value):
+    if value in MIXES:
+        return MIXES[value]
+    mix = {}
+    for item in value.split(","):
+        action, _, weight = item.partition("=")
+        if action not in MIXES["mixed"]:
+            raise argparse.ArgumentTypeError(f"action inconnue: {action}")
+        mix[action] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, fraction):
+    """Percentile au rang le plus proche (liste triée non vide)."""
+    index = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+class Recorder:
+    """Latences et statuts par endpoint, partagés entre threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, seconds, status):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.statuses[endpoint][status] += 1
+
+    def report(self, elapsed):
+        endpoints = {}
+        for endpoint in sorted(self.latencies):
+            endpoints[endpoint] = _summary(self.latencies[endpoint], self.statuses[endpoint], elapsed)
+        all_latencies = [s for values in self.latencies.values() for s in values]
+        all_statuses = defaultdict(int)
+        for statuses in self.statuses.values():
+            for status, count in statuses.items():
+                all_statuses[status] += count
+        total = _summary(all_latencies, all_statuses, elapsed) if all_latencies else {}
+        return {"elapsed_s": round(elapsed, 2), "total": total, "endpoints": endpoints}
+
+
+def _summary(latencies, statuses, elapsed):
+    values = sorted(latencies)
+    count = len(values)
+    errors = sum(n for status, n in statuses.items() if status == "error" or int(status) >= 500)
+    return {
+        "requests": count,
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2),
+        "error_rate": round(errors / count, 4),
+        "rate_limited_rate": round(statuses.get("429", 0) / count, 4),
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+class VirtualUser:
+    """Un client : compte, tokens, entrées connues, session HTTP."""
+
+    def __init__(self, index, base_url, password, recorder, entries):
+        self.index = index
+        self.base_url = base_url.rstrip("/")
+        self.email = f"load-{index}@load-test.example.com"
+        self.password = password
+        self.recorder = recorder
+        self.initial_entries = entries
+        self.http = requests.Session()
+        self.http.headers["User-Agent"] = f"load-test/{index}"
+        self.tokens = None
+        self.entry_ids = []
+        self.random = random.Random(index)
+
+    def call(self, method, path, endpoint, measured=True, **kwargs):
+        headers = kwargs.pop("headers", {})
+        if self.tokens:
+            headers.setdefault("Authorization", f"Bearer {self.tokens['access_token']}")
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, headers=headers, timeout=30, **kwargs)
+            status = str(response.status_code)
+        except requests.RequestException:
+            response, status = None, "error"
+        if measured:
+            self.recorder.record(endpoint, time.perf_counter() - start, status)
+        return response
+
+    # --- Préparation (non mesurée) ---
+
+    def prepare(self):
+        credentials = {"email": self.email, "password": self.password, "username": f"load{self.index}"}
+        r = self.call("POST", "/api/auth/register", "register", measured=False, json=credentials)
+        if r is None or r.status_code not in (201, 409):
+            raise RuntimeError(f"inscription impossible ({self.email}): {r.status_code if r else 'erreur'}")
+        if not self.login(measured=False):
+            raise RuntimeError(f"connexion impossible ({self.email})")
+        r = self.call("GET", "/api/passwords/?per_page=100&fields=id", "list", measured=False)
+        if r is not None and r.status_code == 200:
+            self.entry_ids = [entry["id"] for entry in r.json().get("passwords", [])]
+        while len(self.entry_ids) < self.initial_entries:
+            if not self.create(measured=False):
+                raise RuntimeError(f"création d'entrée impossible ({self.email})")
+
+    # --- Actions ---
+
+    def login(self, measured=True):
+        self.tokens = None
+        r = self.call(
+            "POST", "/api/auth/login", "POST /api/auth/login", measured,
+            json={"email": self.email, "password": self.password},
+        )
+        if r is not None and r.status_code == 200:
+            self.tokens = r.json()["tokens"]
+            return True
+        return False
+
+    def list(self):
+        page = self.random.randint(1, max(len(self.entry_ids) // 20, 1))
+        self.call("GET", f"/api/passwords/?page={page}", "GET /api/passwords/")
+
+    def search(self):
+        term = self.random.choice(SEARCH_TERMS)
+        self.call("GET", "/api/passwords/", "GET /api/passwords/?search", params={"search": term})
+
+    def reveal(self):
+        if self.entry_ids:
+            entry_id = self.random.choice(self.entry_ids)
+            self.call("GET", f"/api/passwords/{entry_id}", "GET /api/passwords/<id>")
+
+    def create(self, measured=True):
+        n = len(self.entry_ids)
+        r = self.call(
+            "POST", "/api/passwords/", "POST /api/passwords/", measured,
+            json={
+                "site_name": f"Site {n} {self.random.choice(('mail', 'bank', 'forum'))}",
+                "site_url": f"https://login.site{n}.example.com/signin",
+                "username": f"user{n}@example.com",
+                "password": f"Gen-{self.random.getrandbits(64):x}-Pw!",
+                "category": ("Pro", "Perso", "Social")[n % 3],
+                "notes": "Entrée générée par le test de charge.",
+            },
+        )
+        if r is not None and r.status_code == 201:
+            self.entry_ids.append(r.json()["password"]["id"])
+            return True
+        return False
+
+    def update(self):
+        if self.entry_ids:
+            entry_id = self.random.choice(self.entry_ids)
+            self.call(
+                "PUT", f"/api/passwords/{entry_id}", "PUT /api/passwords/<id>",
+                json={"notes": f"Mise à jour {time.time():.0f}", "is_favorite": self.random.random() < 0.2},
+            )
+
+    def refresh(self):
+        r = self.call(
+            "POST", "/api/auth/refresh", "POST /api/auth/refresh",
+            json={"refresh_token": self.tokens["refresh_token"]}, headers={"Authorization": ""},
+        )
+        if r is not None and r.status_code == 200:
+            self.tokens = r.json()["tokens"]
+
+    def run(self, mix, deadline, think_time):
+        actions, weights = zip(*mix.items())
+        while time.monotonic() < deadline:
+            if self.tokens is None and not self.login():
+                time.sleep(0.5)  # bloqué (429) ou serveur en erreur : ne pas boucler à vide
+                continue
+            getattr(self, self.random.choices(actions, weights)[0])()
+            if think_time:
+                time.sleep(self.random.uniform(0, 2 * think_time))
+
+
+class _SerializedApp:
+    """Une requête à la fois : SQLite n'a qu'un écrivain, et une transaction
+    lectrice qui veut écrire échoue aussitôt (« database is locked ») si une
+    autre écrit déjà. Le serveur reste multi-thread (keep-alive, E/S)."""
+
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self.lock:
+            # Réponse entièrement produite sous le verrou (corps JSON en mémoire)
+            return list(self.app(environ, start_response))
+
+
+def _enable_wal(engine):
+    """Journal WAL et attente des verrous pour les connexions SQLite."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+        dbapi_connection.execute("PRAGMA busy_timeout=30000")
+
+    engine.dispose()  # connexions déjà ouvertes : sans le réglage ci-dessus
+
+
+def start_standalone(fast_kdf, rate_limit):
+    """Servir l'app dans ce processus (SQLite fichier, fakeredis) ; renvoie l'URL."""
+    if fast_kdf:
+        os.environ.setdefault("ARGON2_MEMORY_KIB", "8192")
+        os.environ.setdefault("ARGON2_TIME_COST", "1")
+        os.environ.setdefault("ARGON2_PARALLELISM", "1")
+    sys.path.insert(0, BACKEND_DIR)
+    import fakeredis
+    from werkzeug.serving import make_server
+
+    spec = importlib.util.spec_from_file_location("app_entry", os.path.join(BACKEND_DIR, "app.py"))
+    app_entry = importlib.util.module_from_spec(spec)
+    sys.modules["app_entry"] = app_entry
+    spec.loader.exec_module(app_entry)
+
+    from app.services.session_key_store import SessionKeyStore
+    from app.services.session_service import RefreshRegistry
+    from rate_limiter import RateLimiter
+
+    database = os.path.join(tempfile.mkdtemp(prefix="load-test-"), "vault.db")
+    testing = app_entry.config["testing"]
+    testing.SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+    testing.SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 30, "check_same_thread": False}}
+    app = app_entry.create_app("testing")
+    app.config["PROPAGATE_EXCEPTIONS"] = False
+    app.redis = fakeredis.FakeStrictRedis(server=fakeredis.FakeServer())
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    if not rate_limit:
+        for limit in app.rate_limiter.limits.values():
+            limit["requests"] = 10**9
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        _enable_wal(app_entry.db.engine)
+        app_entry.db.create_all()
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    server = make_server("127.0.0.1", 0, _SerializedApp(app), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serveur autonome : http://127.0.0.1:{server.server_port} (SQLite {database})")
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def print_table(report):
+    columns = ("requests", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "max_ms", "error_rate", "rate_limited_rate")
+    headers = ("req", "req/s", "p50 ms", "p95 ms", "p99 ms", "max ms", "err %", "429 %")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    width = max(len(name) for name, _ in rows)
+    print(f"\n{'endpoint':<{width}}  " + "  ".join(f"{h:>9}" for h in headers))
+    for name, stats in rows:
+        cells = []
+        for column in columns:
+            value = stats[column]
+            if column.endswith("rate") and column != "throughput_rps":
+                value = f"{value * 100:.1f}"
+            cells.append(f"{value:>9}")
+        print(f"{name:<{width}}  " + "  ".join(cells))
+    print(f"\nDurée mesurée : {report['elapsed_s']} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base-url", help="serveur cible, ex. http://localhost:5000")
+    target.add_argument("--standalone", action="store_true", help="servir l'app dans ce processus")
+    parser.add_argument("--fast-kdf", action="store_true", help="Argon2id réduit (--standalone)")
+    parser.add_argument(
+        "--no-rate-limit", action="store_true", help="lever les limites par client (--standalone)"
+    )
+    parser.add_argument("--users", type=int, default=8, help="utilisateurs virtuels (threads)")
+    parser.add_argument("--duration", type=float, default=30, help="durée de la mesure (s)")
+    parser.add_argument("--mix", type=parse_mix, default="mixed", help="mélange : " + ", ".join(MIXES))
+    parser.add_argument("--entries", type=int, default=40, help="entrées initiales par utilisateur")
+    parser.add_argument("--think-time", type=float, default=0.0, help="pause moyenne entre actions (s)")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="mot de passe maître des comptes")
+    parser.add_argument("--json", help="écrire le rapport JSON dans ce fichier (- : sortie standard)")
+    args = parser.parse_args()
+    mix = args.mix if isinstance(args.mix, dict) else parse_mix(args.mix)
+
+    base_url = start_standalone(args.fast_kdf, not args.no_rate_limit) if args.standalone else args.base_url
+    recorder = Recorder()
+    users = [VirtualUser(i, base_url, args.password, recorder, args.entries) for i in range(args.users)]
+
+    print(f"Préparation de {len(users)} comptes ({args.entries} entrées chacun)...")
+    for user in users:
+        user.prepare()
+
+    print(f"Charge : {args.duration:.0f} s, mélange {mix}")
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=user.run, args=(mix, deadline, args.think_time), daemon=True)
+        for user in users
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = recorder.report(time.monotonic() - started)
+    report["config"] = {
+        "base_url": base_url,
+        "users": args.users,
+        "duration_s": args.duration,
+        "mix": mix,
+        "think_time_s": args.think_time,
+    }
+
+    if not report["endpoints"]:
+        print("Aucune requête mesurée", file=sys.stderr)
+        return 1
+    print_table(report)
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Rapport JSON : {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
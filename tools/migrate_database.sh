@@ -71,12 +71,45 @@ migrate_schema() {
     execute_sql "ALTER TABLE passwords ADD COLUMN IF NOT EXISTS password_changed_at TIMESTAMP WITH TIME ZONE;" "Ajout colonne 'password_changed_at'"
     execute_sql "ALTER TABLE passwords ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP WITH TIME ZONE;" "Ajout colonne 'expires_at'"
     execute_sql "ALTER TABLE passwords ADD COLUMN IF NOT EXISTS remind_before_expiry INTEGER;" "Ajout colonne 'remind_before_expiry'"
+    execute_sql "ALTER TABLE passwords ADD COLUMN IF NOT EXISTS password_fingerprint VARCHAR(64);" "Ajout colonne 'password_fingerprint'"
+    execute_sql "ALTER TABLE passwords ADD COLUMN IF NOT EXISTS site_domain VARCHAR(255);" "Ajout colonne 'site_domain' (puis : flask backfill-site-domains)"
+    execute_sql "ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS details TEXT;" "Ajout colonne 'details' (audit des opérations groupées)"
+    execute_sql "ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS request_id VARCHAR(64);" "Ajout colonne 'request_id' (corrélation X-Request-ID)"
     
     # 2. Créer les index pour les performances
     execute_sql "CREATE INDEX IF NOT EXISTS idx_passwords_email ON passwords(email);" "Index sur 'email'"
     execute_sql "CREATE INDEX IF NOT EXISTS idx_passwords_category ON passwords(category);" "Index sur 'category'"
     execute_sql "CREATE INDEX IF NOT EXISTS idx_passwords_is_favorite ON passwords(is_favorite);" "Index sur 'is_favorite'"
     execute_sql "CREATE INDEX IF NOT EXISTS idx_passwords_priority ON passwords(priority);" "Index sur 'priority'"
+    execute_sql "CREATE INDEX IF NOT EXISTS idx_user_updated ON passwords(user_id, updated_at);" "Index (user_id, updated_at) pour la synchronisation delta"
+    execute_sql "CREATE INDEX IF NOT EXISTS idx_user_fingerprint ON passwords(user_id, password_fingerprint);" "Index (user_id, password_fingerprint) pour la réutilisation"
+    execute_sql "CREATE INDEX IF NOT EXISTS idx_user_domain ON passwords(user_id, site_domain);" "Index (user_id, site_domain) pour l'autofill"
+    execute_sql "CREATE INDEX IF NOT EXISTS idx_password_expiry ON passwords(expires_at) WHERE expires_at IS NOT NULL;" "Index partiel sur 'expires_at' (rappels d'expiration)"
+    execute_sql "CREATE TABLE IF NOT EXISTS password_tombstones (id UUID PRIMARY KEY, user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE, deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP);" "Table 'password_tombstones'"
+    execute_sql "CREATE INDEX IF NOT EXISTS idx_tombstone_user_deleted ON password_tombstones(user_id, deleted_at);" "Index sur les tombstones"
+    execute_sql "CREATE INDEX IF NOT EXISTS idx_audit_logs_request_id ON audit_logs(request_id);" "Index sur 'request_id' des audits"
+    # updated_at des mots de passe (curseur de synchronisation) : fixé par
+    # l'application, le trigger ne l'écrase plus (voir database/init.sql)
+    execute_sql 'CREATE OR REPLACE FUNCTION update_passwords_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at
+       AND (NEW.site_name, NEW.site_url, NEW.username, NEW.email, NEW.category,
+            NEW.tags, NEW.notes, NEW.is_favorite, NEW.priority, NEW.password_strength,
+            NEW.requires_2fa, NEW.password_changed_at, NEW.expires_at,
+            NEW.remind_before_expiry)
+           IS DISTINCT FROM
+           (OLD.site_name, OLD.site_url, OLD.username, OLD.email, OLD.category,
+            OLD.tags, OLD.notes, OLD.is_favorite, OLD.priority, OLD.password_strength,
+            OLD.requires_2fa, OLD.password_changed_at, OLD.expires_at,
+            OLD.remind_before_expiry)
+    THEN
+        NEW.updated_at = clock_timestamp();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;' "Fonction updated_at des mots de passe (contenu seulement)"
+    execute_sql "DROP TRIGGER IF EXISTS update_passwords_updated_at ON passwords; CREATE TRIGGER update_passwords_updated_at BEFORE UPDATE ON passwords FOR EACH ROW EXECUTE FUNCTION update_passwords_updated_at_column();" "Trigger updated_at des mots de passe"
     
     # 3. Mise à jour des valeurs par défaut pour les enregistrements existants
     execute_sql "UPDATE passwords SET password_changed_at = created_at WHERE password_changed_at IS NULL;" "Mise à jour des dates de changement"
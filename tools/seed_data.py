@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Génération de données synthétiques en volume : comptes, coffres, journal d'audit.
+
+Les questions de performance (recherche dans 100k entrées, pagination profonde
+de l'audit, statistiques de catégories d'un gros coffre) demandent du volume ;
+l'API est bridée par le rate limiting et Argon2id. Ce générateur écrit
+directement en base, avec des distributions réalistes :
+
+- entrées par compte : log-normale (médiane --entries, longue traîne bornée
+  par --max-entries) ; sites tirés selon une loi de Zipf (quelques sites très
+  fréquents, une longue traîne de sites uniques), catégories, tags, favoris,
+  expirations, ~15 % de mots de passe réutilisés dans un même coffre ;
+- audit : ~--audit-ratio événements par entrée, actions pondérées (listes et
+  consultations en tête), horodatages concentrés sur les dernières semaines.
+
+Les entrées sont VRAIMENT chiffrées (AES-256-GCM v1, AAD user_id:entry_id,
+empreintes HMAC) par lot (EncryptionService.encrypt_entries) sous des VMK
+connues : seed_vmk(seed, index) les redonne sans login. Tous les comptes
+partagent le mot de passe maître --password et un même sel (une seule
+dérivation Argon2id pour tout le lot) : exporter les mêmes ARGON2_* que le
+serveur, sinon le login échoue. Lignes générées en parallèle (--jobs
+processus), écrites par COPY sur PostgreSQL (INSERT par lots ailleurs, ex.
+SQLite pour essayer), puis ANALYZE. Ne jamais viser une base de production.
+
+Usage:
+    DATABASE_URL=postgresql://... python3 tools/seed_data.py --users 10000
+    python3 tools/seed_data.py --database-url sqlite:////tmp/seed.db --create-schema --users 200
+"""
+import argparse
+import csv
+import hashlib
+import io
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from multiprocessing import Pool
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+)
+
+from sqlalchemy import create_engine, select  # noqa: E402
+
+from app.models import AuditLog, Password, User  # noqa: E402
+from app.services.domain_service import site_domain  # noqa: E402
+from app.services.encryption_service import EncryptionService  # noqa: E402
+from extensions import db  # noqa: E402
+
+# Mot de passe maître de tous les comptes générés (doit passer le contrôle zxcvbn)
+DEFAULT_PASSWORD = "Semence-Volumineuse-Coffre-2026!"
+
+# Sites fréquents (poids de Zipf par rang) ; le reste : longue traîne unique
+POPULAR_SITES = (
+    ("Google", "https://accounts.google.com"), ("Facebook", "https://www.facebook.com"),
+    ("Amazon", "https://www.amazon.fr"), ("Netflix", "https://www.netflix.com"),
+    ("GitHub", "https://github.com/login"), ("LinkedIn", "https://www.linkedin.com"),
+    ("Twitter", "https://twitter.com"), ("Instagram", "https://www.instagram.com"),
+    ("Microsoft", "https://login.microsoftonline.com"), ("Apple", "https://appleid.apple.com"),
+    ("PayPal", "https://www.paypal.com"), ("Spotify", "https://accounts.spotify.com"),
+    ("Dropbox", "https://www.dropbox.com"), ("Slack", "https://slack.com/signin"),
+    ("Leboncoin", "https://auth.leboncoin.fr"), ("Impots", "https://cfspart.impots.gouv.fr"),
+    ("Ameli", "https://assure.ameli.fr"), ("SNCF", "https://www.sncf-connect.com"),
+    ("Orange", "https://login.orange.fr"), ("Free", "https://subscribe.free.fr"),
+    ("BNP Paribas", "https://mabanque.bnpparibas"), ("Credit Agricole", "https://www.credit-agricole.fr"),
+    ("Boursorama", "https://clients.boursorama.com"), ("Doctolib", "https://www.doctolib.fr"),
+    ("Steam", "https://store.steampowered.com"), ("Discord", "https://discord.com/login"),
+    ("Reddit", "https://www.reddit.com"), ("Zoom", "https://zoom.us/signin"),
+    ("Notion", "https://www.notion.so"), ("Atlassian", "https://id.atlassian.com"),
+)
+SITE_WEIGHTS = tuple(1 / rank**1.1 for rank in range(1, len(POPULAR_SITES) + 1))
+LONG_TAIL_RATE = 0.3
+
+CATEGORIES = ("Personnel", "Travail", "Social", "Finance", "Shopping", "Divertissement", None)
+CATEGORY_WEIGHTS = (30, 25, 12, 10, 10, 5, 8)
+TAGS = ("2fa", "partage", "famille", "pro", "ancien", "a-changer", "sso", "perso")
+WORDS = ("soleil", "chaton", "montagne", "bonjour", "azerty", "marseille", "papillon", "dragon")
+WEAK_PASSWORDS = ("azerty123", "password1", "123456789", "motdepasse", "loulou2010")
+
+# (action, poids, type de ressource)
+AUDIT_ACTIONS = (
+    ("LIST_PASSWORDS", 30, None), ("VIEW_PASSWORD", 25, "PASSWORD"),
+    ("LOGIN_SUCCESS", 12, "USER"), ("SYNC_PASSWORDS", 8, None),
+    ("UPDATE_PASSWORD", 5, "PASSWORD"), ("CREATE_PASSWORD", 4, "PASSWORD"),
+    ("GENERATE_PASSWORD", 4, None), ("VIEW_STATS", 3, None),
+    ("LOGIN_FAILED", 3, "USER"), ("LOGOUT_SUCCESS", 3, "USER"),
+    ("SECURITY_REPORT", 2, None), ("DELETE_PASSWORD", 1, "PASSWORD"),
+)
+AUDIT_WEIGHTS = tuple(weight for _, weight, _ in AUDIT_ACTIONS)
+USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/126.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) AppleWebKit/605.1.15 Version/17.5 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:127.0) Gecko/20100101 Firefox/127.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148",
+    "PasswordManager-Extension/2.3.1",
+)
+
+TABLES = (User.__table__, Password.__table__, AuditLog.__table__)
+
+
+def seed_vmk(seed, index):
+    """VMK (connue) du compte n° `index` d'un seeding : déchiffrement sans login."""
+    return hashlib.sha256(f"seed-vmk:{seed}:{index}".encode()).digest()
+
+
+def seed_email(seed, index):
+    return f"seed-{seed}-{index:07d}@example.com"
+
+
+def seed_salt(seed):
+    return hashlib.sha256(f"seed-salt:{seed}".encode()).digest()[:16]
+
+
+@lru_cache(maxsize=None)
+def _domain(url):
+    return site_domain(url)
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _plaintext(rng):
+    """(mot de passe, force 1-5) : générés, « humains » ou faibles."""
+    draw = rng.random()
+    if draw < 0.6:
+        alphabet = "abcdefghijkmnopqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789!@#$%&*-_"
+        return "".join(rng.choices(alphabet, k=rng.choice((16, 20, 24, 32)))), rng.choice((4, 5))
+    if draw < 0.9:
+        return f"{rng.choice(WORDS).capitalize()}{rng.randint(1, 9999)}{rng.choice('!?.#')}", rng.choice((2, 3))
+    return rng.choice(WEAK_PASSWORDS), 1
+
+
+def _entry_count(rng, settings):
+    count = rng.lognormvariate(math.log(settings["entries"]), settings["sigma"])
+    return min(settings["max_entries"], int(count))
+
+
+def generate_chunk(args):
+    """Lignes des comptes [start, stop) : {table: lignes (tuples, ordre des colonnes)}."""
+    start, stop, settings = args
+    seed, now = settings["seed"], settings["now"]
+    rng = random.Random(f"{seed}:{start}")
+    kek, salt = settings["kek"], seed_salt(seed)
+    users, passwords, audits = [], [], []
+
+    for index in range(start, stop):
+        user_id, vmk = _uuid(rng), seed_vmk(seed, index)
+        fingerprint_key = EncryptionService.derive_fingerprint_key(vmk)
+        user_created = now - timedelta(days=1095 * rng.random() ** 1.5)
+        account_age = (now - user_created).total_seconds()
+
+        entries, items, secrets_, ids = [], [], [], []
+        for _ in range(_entry_count(rng, settings)):
+            entry_id = _uuid(rng)
+            if secrets_ and rng.random() < 0.15:
+                plaintext, strength = rng.choice(secrets_)  # réutilisation
+            else:
+                plaintext, strength = _plaintext(rng)
+                secrets_.append((plaintext, strength))
+            if rng.random() < LONG_TAIL_RATE:
+                n = rng.randrange(10**6)
+                site_name, site_url, domain = f"Site {n}", f"https://login.site-{n}.com", f"site-{n}.com"
+            else:
+                site_name, site_url = rng.choices(POPULAR_SITES, SITE_WEIGHTS)[0]
+                domain = _domain(site_url)
+            created = user_created + timedelta(seconds=account_age * rng.random())
+            updated = created if rng.random() < 0.4 else created + (now - created) * rng.random()
+            expires = created + timedelta(days=rng.choice((90, 180, 365))) if rng.random() < 0.2 else None
+            tags = ",".join(rng.sample(TAGS, rng.randint(1, 3))) if rng.random() < 0.35 else None
+            entries.append({
+                "id": entry_id, "user_id": user_id, "site_name": site_name, "site_url": site_url,
+                "site_domain": domain, "username": f"user{index}",
+                "email": seed_email(seed, index) if rng.random() < 0.5 else None,
+                "password_fingerprint": EncryptionService.fingerprint_entry(plaintext, fingerprint_key),
+                "category": rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0], "tags": tags,
+                "notes": f"Note {rng.choice(WORDS)} n°{rng.randint(1, 999)}" if rng.random() < 0.2 else None,
+                "is_favorite": rng.random() < 0.1, "priority": rng.choices((0, 1, 2), (85, 12, 3))[0],
+                "password_strength": strength, "requires_2fa": rng.random() < 0.25,
+                "created_at": created, "updated_at": updated,
+                "last_used": created + (now - created) * rng.random() if rng.random() < 0.7 else None,
+                "password_changed_at": updated, "expires_at": expires, "remind_before_expiry": 30,
+            })
+            items.append((plaintext, f"{user_id}:{entry_id}".encode()))
+            ids.append(entry_id)
+        for entry, token in zip(entries, EncryptionService.encrypt_entries(items, vmk)):
+            entry["encrypted_password"] = token
+        passwords.extend(entries)
+
+        last_login = None
+        ips = [f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+               for _ in range(rng.randint(1, 4))]
+        agents = rng.sample(USER_AGENTS, rng.randint(1, 3))
+        for _ in range(int(max(1, len(entries)) * settings["audit_ratio"] * rng.uniform(0.5, 1.5))):
+            action, _, resource_type = rng.choices(AUDIT_ACTIONS, AUDIT_WEIGHTS)[0]
+            age = min(account_age, rng.expovariate(1 / (60 * 86400)))
+            timestamp = now - timedelta(seconds=age)
+            success = action != "LOGIN_FAILED" and rng.random() > 0.01
+            if action == "LOGIN_SUCCESS" and (last_login is None or timestamp > last_login):
+                last_login = timestamp
+            audits.append({
+                "id": _uuid(rng), "user_id": user_id, "action": action, "resource_type": resource_type,
+                "resource_id": (rng.choice(ids) if resource_type == "PASSWORD" and ids
+                                else user_id if resource_type == "USER" else None),
+                "ip_address": rng.choice(ips), "user_agent": rng.choice(agents), "success": success,
+                "error_message": None if success else "Invalid credentials",
+                "request_id": f"{rng.getrandbits(128):032x}", "timestamp": timestamp,
+            })
+
+        users.append({
+            "id": user_id, "email": seed_email(seed, index), "username": f"seed-{seed}-{index}",
+            "created_at": user_created, "updated_at": user_created, "is_active": True,
+            "failed_login_attempts": 0, "last_login": last_login, "kdf_salt": salt,
+            "wrapped_vault_key": EncryptionService.wrap_vmk(vmk, kek),
+        })
+
+    rows = {}
+    for table, dicts in zip(TABLES, (users, passwords, audits)):
+        columns = [column.name for column in table.columns]
+        rows[table.name] = [tuple(d.get(name) for name in columns) for d in dicts]
+        if settings["copy"]:
+            rows[table.name] = _to_csv(rows[table.name])
+    return stop - start, rows
+
+
+def _csv_value(value):
+    if value is None:
+        return None  # champ vide non quoté = NULL pour COPY ... (FORMAT csv)
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, bytes):
+        return "\\x" + value.hex()
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+def _to_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+    return buffer.getvalue()
+
+
+class Writer:
+    """Écriture d'un lot : COPY (PostgreSQL) ou INSERT multi-lignes (autres)."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.copy = engine.dialect.name == "postgresql"
+
+    def write(self, rows):
+        if self.copy:
+            connection = self.engine.raw_connection()
+            try:
+                with connection.cursor() as cursor:
+                    for table in TABLES:  # ordre des clés étrangères
+                        columns = ", ".join(column.name for column in table.columns)
+                        cursor.copy_expert(
+                            f"COPY {table.name} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                            io.StringIO(rows[table.name]),
+                        )
+                connection.commit()
+            finally:
+                connection.close()
+            return
+        with self.engine.begin() as connection:
+            for table in TABLES:
+                columns = [column.name for column in table.columns]
+                if rows[table.name]:
+                    connection.execute(
+                        table.insert(), [dict(zip(columns, row)) for row in rows[table.name]]
+                    )
+
+    def analyze(self):
+        with self.engine.begin() as connection:
+            for table in TABLES:
+                connection.exec_driver_sql(f"ANALYZE {table.name}")
+
+
+def verify(engine, seed, start, password):
+    """Contrôle de bout en bout : VMK connue ET mot de passe maître → même clair."""
+    with engine.connect() as connection:
+        user = connection.execute(
+            select(User.__table__).where(User.email == seed_email(seed, start))
+        ).one()
+        entry = connection.execute(
+            select(Password.__table__).where(Password.user_id == user.id).limit(1)
+        ).first()
+    vmk = EncryptionService.unlock_vault(user.kdf_salt, user.wrapped_vault_key, password)
+    assert vmk == seed_vmk(seed, start), "VMK désenveloppée inattendue"
+    if entry is not None:
+        EncryptionService.decrypt_entry(
+            entry.encrypted_password, vmk, f"{user.id}:{entry.id}".encode()
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--start", type=int, default=0, help="premier index de compte (compléter un seeding)")
+    parser.add_argument("--entries", type=float, default=80, help="médiane des entrées par compte")
+    parser.add_argument("--sigma", type=float, default=1.0, help="dispersion log-normale des entrées")
+    parser.add_argument("--max-entries", type=int, default=20000)
+    parser.add_argument("--audit-ratio", type=float, default=5.0, help="événements d'audit par entrée")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--batch-users", type=int, default=100, help="comptes par lot écrit")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--create-schema", action="store_true", help="créer les tables (hors init.sql)")
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("--database-url ou DATABASE_URL requis")
+
+    engine = create_engine(args.database_url)
+    if args.create_schema:
+        db.metadata.create_all(engine)
+    writer = Writer(engine)
+    settings = {
+        "seed": args.seed, "now": datetime.utcnow().replace(microsecond=0),
+        "kek": EncryptionService.derive_kek(args.password, seed_salt(args.seed)),
+        "entries": args.entries, "sigma": args.sigma, "max_entries": args.max_entries,
+        "audit_ratio": args.audit_ratio, "copy": writer.copy,
+    }
+    stop = args.start + args.users
+    chunks = [(lo, min(lo + args.batch_users, stop), settings)
+              for lo in range(args.start, stop, args.batch_users)]
+    print(f"{args.users} comptes en {len(chunks)} lots, {args.jobs} processus, "
+          f"{'COPY' if writer.copy else 'INSERT'} ({engine.dialect.name})")
+
+    started = time.perf_counter()
+    done = 0
+    with Pool(args.jobs) as pool:
+        for count, rows in pool.imap_unordered(generate_chunk, chunks):
+            writer.write(rows)
+            done += count
+            print(f"\r{done}/{args.users} comptes ({time.perf_counter() - started:.0f} s)",
+                  end="", flush=True)
+    print()
+    writer.analyze()
+    elapsed = time.perf_counter() - started
+
+    with engine.connect() as connection:
+        for table in TABLES:
+            total = connection.exec_driver_sql(f"SELECT count(*) FROM {table.name}").scalar()
+            print(f"{table.name:<12} {total:>12,} lignes")
+    verify(engine, args.seed, args.start, args.password)
+    print(f"Terminé en {elapsed:.1f} s ; mot de passe maître : {args.password}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Profil de démarrage d'un worker : temps d'import, cold start, premier login.
+
+Chaque mesure tourne dans un interpréteur neuf (comme un worker gunicorn sans
+--preload), --repeat fois ; le rapport donne la médiane de :
+
+- interpreter : `python -c pass` (plancher, hors application) ;
+- import      : exécution de app.py (modules importés au chargement) ;
+- create_app  : factory (blueprints, extensions, middlewares) ;
+- warmup      : préchargement (warmup.warmup_modules), si --warmup ;
+- first_login : premier POST /api/auth/login (SQLite en mémoire, fakeredis ;
+                compte créé avant la mesure) ;
+- cold_start  : interpréteur + import + create_app (+ warmup) ;
+- to_login    : cold_start + first_login.
+
+Puis les paquets les plus coûteux à l'import (`-X importtime`, cumul par
+paquet racine importé par app.py et create_app, hors démarrage de
+l'interpréteur). --fast-kdf réduit Argon2id (8 Mio) comme la suite de tests :
+sans lui, le premier login est dominé par la dérivation de clé (192 Mio).
+
+Usage:
+    python3 tools/startup_profile.py --fast-kdf
+    python3 tools/startup_profile.py --fast-kdf --warmup --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+# Exécuté dans un interpréteur neuf (cwd = backend/) ; imprime les temps en JSON
+CHILD = r"""
+import importlib.util, json, sys, time
+t0 = time.perf_counter()
+spec = importlib.util.spec_from_file_location("app_entry", "app.py")
+app_entry = importlib.util.module_from_spec(spec)
+sys.modules["app_entry"] = app_entry
+spec.loader.exec_module(app_entry)
+t1 = time.perf_counter()
+app = app_entry.create_app("testing")
+t2 = time.perf_counter()
+if WARMUP:
+    from warmup import warmup_modules
+    warmup_modules()
+t3 = time.perf_counter()
+if LOGIN:
+    import fakeredis
+    from app.models import User
+    from app.services.encryption_service import EncryptionService
+    from app.services.session_key_store import SessionKeyStore
+    from app.services.session_service import RefreshRegistry
+    from rate_limiter import RateLimiter
+    app.redis = fakeredis.FakeStrictRedis()
+    app.session_key_store = SessionKeyStore(client=app.redis)
+    app.rate_limiter = RateLimiter(app.redis)
+    app.refresh_registry = RefreshRegistry(app.redis)
+    with app.app_context():
+        app_entry.db.create_all()
+        user = User(email="startup@example.com", username="startup")
+        user.kdf_salt, user.wrapped_vault_key, _ = EncryptionService.provision_vault(PASSWORD)
+        app_entry.db.session.add(user)
+        app_entry.db.session.commit()
+        client = app.test_client()
+        t4 = time.perf_counter()
+        response = client.post("/api/auth/login", json={"email": "startup@example.com", "password": PASSWORD})
+        t5 = time.perf_counter()
+        assert response.status_code == 200, response.get_data(as_text=True)
+else:
+    t4 = t5 = t3
+print(json.dumps({"import": t1 - t0, "create_app": t2 - t1, "warmup": t3 - t2, "first_login": t5 - t4}))
+"""
+
+PASSWORD = "Demarrage-Froid-Coffre-2026!"
+
+
+def _env(fast_kdf):
+    env = dict(os.environ)
+    if fast_kdf:
+        env.update(ARGON2_MEMORY_KIB="8192", ARGON2_TIME_COST="1", ARGON2_PARALLELISM="1")
+    return env
+
+
+def _child(warmup, login):
+    return (
+        f"WARMUP = {warmup!r}\nLOGIN = {login!r}\nPASSWORD = {PASSWORD!r}\n" + CHILD
+    )
+
+
+def measure_once(fast_kdf, warmup):
+    """Un cold start complet : {phase: secondes}."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    interpreter = time.perf_counter() - start
+    output = subprocess.run(
+        [sys.executable, "-c", _child(warmup, True)],
+        cwd=BACKEND_DIR, env=_env(fast_kdf), check=True, capture_output=True, text=True,
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["interpreter"] = interpreter
+    timings["cold_start"] = interpreter + timings["import"] + timings["create_app"] + timings["warmup"]
+    timings["to_login"] = timings["cold_start"] + timings["first_login"]
+    return timings
+
+
+def _top_level_imports(code, fast_kdf):
+    """[(paquet racine, secondes cumulées)] des imports de premier niveau de `code`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=_env(fast_kdf), check=True, capture_output=True, text=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("  "):
+            continue  # sous-import : déjà compté dans le cumul de son parent
+        imports.append((name.strip().split(".")[0], int(cumulative) / 1e6))
+    return imports
+
+
+def import_profile(fast_kdf, top):
+    """Paquets racines les plus coûteux à l'import de l'app (secondes cumulées)."""
+    startup = {name for name, _ in _top_level_imports("pass", fast_kdf)}
+    totals = defaultdict(float)
+    for name, seconds in _top_level_imports(_child(False, False), fast_kdf):
+        if name not in startup:
+            totals[name] += seconds
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="paquets listés à l'import")
+    parser.add_argument("--fast-kdf", action="store_true", help="Argon2id réduit (8 Mio)")
+    parser.add_argument("--warmup", action="store_true", help="appeler warmup_modules() avant le login")
+    parser.add_argument("--json", help="écrire le rapport JSON dans ce fichier (- : stdout)")
+    args = parser.parse_args(argv)
+
+    runs = [measure_once(args.fast_kdf, args.warmup) for _ in range(args.repeat)]
+    phases = {
+        phase: round(statistics.median(run[phase] for run in runs) * 1000, 1)
+        for phase in ("interpreter", "import", "create_app", "warmup", "first_login",
+                      "cold_start", "to_login")
+    }
+    packages = [(name, round(seconds * 1000, 1)) for name, seconds in import_profile(args.fast_kdf, args.top)]
+    report = {"repeat": args.repeat, "fast_kdf": args.fast_kdf, "warmup": args.warmup,
+              "phases_ms": phases, "imports_ms": dict(packages)}
+
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"Médiane sur {args.repeat} démarrages (ms)")
+    for phase, value in phases.items():
+        print(f"  {phase:<12} {value:>9.1f}")
+    print("Imports de app.py et create_app par paquet (ms, cumul)")
+    for name, value in packages:
+        print(f"  {name:<28} {value:>9.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
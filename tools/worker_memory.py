@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Mémoire des workers gunicorn, avec et sans --preload.
+
+Lance `gunicorn wsgi:app` (config backend/gunicorn.conf.py, FLASK_ENV=testing :
+SQLite en mémoire, Redis facultatif) pour chaque mode, attend que les workers
+soient prêts et préchauffés, envoie --requests requêtes, puis lit
+/proc/<pid>/smaps_rollup du maître et de chaque worker :
+
+- rss : pages résidentes, partagées comprises (ce qu'affiche `ps`) ;
+- pss : part proportionnelle (une page partagée par N processus compte 1/N) ;
+- uss : pages privées (Private_Clean + Private_Dirty), libérées à l'arrêt du
+        worker : le coût réel d'un worker supplémentaire.
+
+Le total (maître + workers, somme des PSS) est l'empreinte réelle du service.
+Linux uniquement (smaps_rollup, noyau >= 4.14).
+
+Usage:
+    python3 tools/worker_memory.py --workers 4
+    python3 tools/worker_memory.py --workers 8 --json memory.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+FIELDS = ("Rss", "Pss", "Private_Clean", "Private_Dirty")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid):
+    """PIDs des processus enfants directs de `pid`."""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def memory(pid):
+    """{rss, pss, uss} en Kio d'après /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in FIELDS:
+                values[name] = int(rest.split()[0])
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def measure(preload, workers, requests, settle):
+    """Démarrer gunicorn dans un mode, mesurer, l'arrêter : {master, workers}."""
+    port = _free_port()
+    env = dict(
+        os.environ,
+        FLASK_ENV="testing",
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_PRELOAD="true" if preload else "false",
+    )
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "wsgi:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"gunicorn s'est arrêté (code {server.returncode})")
+            if time.monotonic() > deadline:
+                raise RuntimeError("workers non prêts après 60 s")
+            if len(_children(server.pid)) == workers:
+                try:
+                    urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5).read()
+                    break
+                except OSError:
+                    pass
+            time.sleep(0.2)
+        for _ in range(requests):
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5).read()
+        time.sleep(settle)  # préchauffage (post_worker_init) terminé dans tous les workers
+        return {
+            "master": memory(server.pid),
+            "workers": [memory(pid) for pid in sorted(_children(server.pid))],
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def summarize(sample):
+    """Médianes par worker et total du service (Kio)."""
+    per_worker = {
+        key: round(statistics.median(worker[key] for worker in sample["workers"]))
+        for key in ("rss", "pss", "uss")
+    }
+    total_pss = sample["master"]["pss"] + sum(worker["pss"] for worker in sample["workers"])
+    return {"worker_median_kib": per_worker, "master_kib": sample["master"], "total_pss_kib": total_pss}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50, help="requêtes servies avant la mesure")
+    parser.add_argument("--settle", type=float, default=2.0, help="attente avant la mesure (s)")
+    parser.add_argument("--json", help="écrire le rapport JSON dans ce fichier (- : stdout)")
+    args = parser.parse_args(argv)
+
+    report = {"workers": args.workers}
+    for label, preload in (("no_preload", False), ("preload", True)):
+        report[label] = summarize(measure(preload, args.workers, args.requests, args.settle))
+
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{f'{args.workers} workers (Mio)':<30} {'sans preload':>12} {'preload':>10}")
+    for key in ("rss", "pss", "uss"):
+        before = report["no_preload"]["worker_median_kib"][key] / 1024
+        after = report["preload"]["worker_median_kib"][key] / 1024
+        print(f"  {key.upper() + ' par worker':<28} {before:>12.1f} {after:>10.1f}")
+    before = report["no_preload"]["total_pss_kib"] / 1024
+    after = report["preload"]["total_pss_kib"] / 1024
+    print(f"  {'Total (PSS, maître compris)':<28} {before:>12.1f} {after:>10.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())